@@ -38,6 +38,16 @@ CREATE TABLE sections (
   UNIQUE(term_id, course_id, section_code)
 );
 
+-- Offering index: one row per (course, season), rebuilt at ingest by
+-- refresh_course_offerings() (bruintracks_server/tools/rpc_functions)
+CREATE TABLE course_offerings (
+  course_id INT REFERENCES courses(id) ON DELETE CASCADE,
+  season VARCHAR(10) NOT NULL,         -- e.g. "Fall", "Winter", "Spring"
+  years_offered INT NOT NULL,          -- distinct years with at least one section
+  last_year INT,                       -- most recent year with a section
+  PRIMARY KEY (course_id, season)
+);
+
 -- Meeting times table
 CREATE TABLE meeting_times (
   id SERIAL PRIMARY KEY,
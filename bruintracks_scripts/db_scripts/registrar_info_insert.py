@@ -220,3 +220,9 @@ with open(CSV_PATH, newline='') as f:
                       on_conflict="section_id,instructor_id"
                   )
             )
+
+# ------- PASS 3: OFFERING INDEX -------
+# One row per (course, season) so the planner knows when a course is taught
+# without downloading its sections (tools/rpc_functions/refresh_course_offerings.sql)
+res = safe_execute(supabase.rpc("refresh_course_offerings"))
+print(f"course_offerings rebuilt: {res.data} rows")
@@ -0,0 +1,122 @@
+"""Asyncio orchestration for the planner's catalog reads.
+
+The Supabase reads themselves stay blocking calls on the process's one
+client (and go through the catalog cache as usual); this module only decides
+what may run at the same time, via asyncio.to_thread:
+
+  * independent reads run together, e.g. terms and subjects,
+  * dependent reads are pipelined: sections are read a few courses at a
+    time, and as soon as one chunk's sections arrive their meetings and
+    section_instructors are requested, and each batch of section_instructors
+    is followed by the instructors not asked for yet.
+
+Every call is timed into FetchTimings, whose report compares the wall time
+of each concurrent stage with the sum of the call times inside it, i.e.
+roughly what the same reads cost one after the other.
+"""
+import os
+import time
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Set, Tuple
+
+from catalog_cache import CatalogCache
+
+# ───── CONFIGURATION ─────
+# Courses per sections read in the pipeline; smaller chunks start the
+# meeting and instructor reads sooner at the price of more requests
+PIPELINE_COURSES = int(os.getenv("PIPELINE_COURSES", 25))
+
+
+class FetchTimings:
+    """Call and stage durations for one plan's concurrent reads."""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.wall_ms = 0.0
+
+    async def timed(self, phase: str, fn: Callable, *args):
+        started = time.perf_counter()
+        try:
+            return await asyncio.to_thread(fn, *args)
+        finally:
+            ended = time.perf_counter()
+            p = self.phases.setdefault(phase, {'calls': 0, 'busy_ms': 0.0,
+                                               'first': started, 'last': ended})
+            p['calls'] += 1
+            p['busy_ms'] += (ended - started) * 1000
+            p['first'], p['last'] = min(p['first'], started), max(p['last'], ended)
+
+    def run(self, coro: Awaitable):
+        """Run one concurrent stage to completion on a fresh event loop."""
+        started = time.perf_counter()
+        try:
+            return asyncio.run(coro)
+        finally:
+            self.wall_ms += (time.perf_counter() - started) * 1000
+
+    def report(self) -> Dict[str, object]:
+        serial = sum(p['busy_ms'] for p in self.phases.values())
+        return {
+            'wall_ms': round(self.wall_ms, 1),
+            'serial_ms': round(serial, 1),
+            'saved_ms': round(serial - self.wall_ms, 1),
+            'phases': {
+                name: {'calls': p['calls'], 'busy_ms': round(p['busy_ms'], 1),
+                       'span_ms': round((p['last'] - p['first']) * 1000, 1)}
+                for name, p in self.phases.items()
+            },
+        }
+
+
+async def concurrently(timings: FetchTimings, **calls: Callable) -> Dict[str, object]:
+    """Run independent zero-argument reads together; results keyed like `calls`."""
+    names = list(calls)
+    results = await asyncio.gather(*(timings.timed(n, calls[n]) for n in names))
+    return dict(zip(names, results))
+
+
+async def sections_pipeline(cache: CatalogCache, pairs: List[Tuple[int, int]],
+                            loaders: Dict[str, Callable], timings: FetchTimings,
+                            chunk: int = PIPELINE_COURSES
+                            ) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict]]:
+    """Sections, meetings, section_instructors and instructor rows for `pairs`.
+
+    `loaders` holds the CatalogCache.fetch loaders for "term_sections",
+    "meeting_times", "section_instructors" and "instructors". Rows come back
+    in the order one read per table would give: chunks follow the pairs.
+    """
+    by_course: Dict[int, List[Tuple[int, int]]] = {}
+    for pair in pairs:
+        by_course.setdefault(pair[0], []).append(pair)
+    courses = list(by_course)
+    chunks = [[p for c in courses[i:i + chunk] for p in by_course[c]]
+              for i in range(0, len(courses), chunk)]
+    secs: List[List[Dict]] = [[] for _ in chunks]
+    meetings: List[List[Dict]] = [[] for _ in chunks]
+    teaching: List[List[Dict]] = [[] for _ in chunks]
+    instructors: List[Dict] = []
+    asked: Set[int] = set()
+
+    async def read(table: str, keys: List) -> List[Dict]:
+        got = await timings.timed(table, cache.fetch, table, keys, loaders[table])
+        return [r for rows in got.values() for r in rows]
+
+    async def read_meetings(i: int, ids: List[int]):
+        meetings[i] = await read("meeting_times", ids)
+
+    async def read_teaching(i: int, ids: List[int]):
+        teaching[i] = await read("section_instructors", ids)
+        new = sorted({r['instructor_id'] for r in teaching[i]} - asked)
+        asked.update(new)
+        if new:
+            instructors.extend(await read("instructors", new))
+
+    async def read_sections(i: int):
+        secs[i] = await read("term_sections", chunks[i])
+        ids = [s['id'] for s in secs[i]]
+        if ids:
+            await asyncio.gather(read_meetings(i, ids), read_teaching(i, ids))
+
+    await asyncio.gather(*(read_sections(i) for i in range(len(chunks))))
+    flat = lambda parts: [r for part in parts for r in part]
+    return flat(secs), flat(meetings), flat(teaching), instructors
@@ -0,0 +1,131 @@
+"""Big in_() reads: one filter with every id vs bulk_fetch.select_in.
+
+    python3 bench_bulk_fetch.py [ids] [latency_ms]
+
+Starts a local stub of PostgREST's read API (in.() and order filters,
+offset/limit paging, a 1000-row cap like db-max-rows, `latency_ms` of delay
+per request plus a little per row returned) over a synthetic meeting_times
+table, then reads the meetings of `ids` sections (default 4000) through the
+real Supabase client:
+
+  * single_in   - one in_() with every id, as the planner used to
+  * select_in   - chunked and paged, with 1, 4 and 8 chunk workers
+
+Each row reports requests made, the longest request URL, rows returned vs
+expected and the wall time. single_in comes back short once the cap is hit.
+"""
+import sys
+import json
+import time
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qsl, urlsplit
+
+from bulk_fetch import select_in
+from catalog_cache import MEETING_COLUMNS
+from supabase_client import get_supabase
+
+MAX_ROWS = 1000
+ROW_COST_MS = 0.01
+STUB_KEY = "stub.stub.stub"
+
+
+def make_table(sections: int, seed: int = 0) -> List[Dict]:
+    rnd = random.Random(seed)
+    rows = []
+    for sid in range(1, sections + 1):
+        for _ in range(rnd.randint(1, 3)):
+            start = rnd.randrange(8, 18)
+            rows.append({
+                'id': len(rows) + 1, 'section_id': sid, 'days_of_week': rnd.choice(["MW", "TR", "F"]),
+                'start_time': f"{start:02d}:00:00", 'end_time': f"{start:02d}:50:00",
+                'building': "MS", 'room': str(rnd.randrange(1000, 9000)),
+            })
+    return rows
+
+
+def stub_server(tables: Dict[str, List[Dict]], latency_ms: float):
+    stats = {'requests': 0, 'max_url': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            rows = tables.get(url.path.rsplit("/", 1)[-1], [])
+            columns, order, offset, limit = None, [], 0, MAX_ROWS
+            for key, val in parse_qsl(url.query):
+                if key == "select":
+                    columns = val.split(",")
+                elif key == "order":
+                    order = [o.split(".")[0] for o in val.split(",")]
+                elif key == "offset":
+                    offset = int(val)
+                elif key == "limit":
+                    limit = int(val)
+                elif val.startswith("in.("):
+                    wanted = {v.strip('"') for v in val[4:-1].split(",")}
+                    rows = [r for r in rows if str(r[key]) in wanted]
+            if order:
+                rows = sorted(rows, key=lambda r: [r[c] for c in order])
+            rows = rows[offset:offset + min(limit, MAX_ROWS)]
+            if columns:
+                rows = [{c: r[c] for c in columns} for r in rows]
+            with lock:
+                stats['requests'] += 1
+                stats['max_url'] = max(stats['max_url'], len(self.path))
+            time.sleep((latency_ms + ROW_COST_MS * len(rows)) / 1000)
+            body = json.dumps(rows).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def main():
+    n_ids = int(sys.argv[1]) if len(sys.argv) > 1 else 4000
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 20
+    table = make_table(n_ids * 2)
+    ids = list(range(1, n_ids + 1))
+    expected = sum(1 for r in table if r['section_id'] <= n_ids)
+
+    server, stats = stub_server({"meeting_times": table}, latency_ms)
+    client = get_supabase(f"http://127.0.0.1:{server.server_port}", STUB_KEY)
+
+    def single_in():
+        return client.table("meeting_times").select(MEETING_COLUMNS).in_("section_id", ids).execute().data
+
+    modes = [("single_in", single_in)] + [
+        (f"select_in_{w}_workers",
+         lambda w=w: select_in(client, "meeting_times", MEETING_COLUMNS, "section_id", ids, workers=w))
+        for w in (1, 4, 8)
+    ]
+    runs = []
+    for label, run in modes:
+        stats.update(requests=0, max_url=0)
+        started = time.perf_counter()
+        rows = run()
+        wall = time.perf_counter() - started
+        runs.append({
+            "mode": label, "requests": stats['requests'], "max_url_chars": stats['max_url'],
+            "rows": len(rows), "complete": len(rows) == expected, "wall_ms": round(wall * 1000, 1),
+        })
+    server.shutdown()
+    print(json.dumps({"ids": n_ids, "expected_rows": expected, "latency_ms": latency_ms,
+                      "runs": runs}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Editor prerequisite checks: full revalidation vs prereq_index.
+
+    python3 bench_editor_prereqs.py [courses_per_term] [edits]
+
+Builds a synthetic 12-term plan (default 5 courses a term, each needing up to
+three earlier courses) and replays the same random swaps through
+two editors. The old one rechecks every course of every term after each edit
+and rebuilds "taken before" by walking the earlier terms for each check; the
+new one keeps a PrereqIndex and rechecks only the moved courses and their
+direct dependents. Prerequisites are preloaded so neither touches the
+database, and the editor's debug output goes to /dev/null. Reports the mean
+time per edit and how many prerequisite checks each made.
+"""
+import os
+import sys
+import time
+import random
+import contextlib
+from typing import Dict, List, Set, Tuple
+
+from schedule_editor import ScheduleEditor
+
+TERMS = [f"{season} {year}" for year in (2024, 2025, 2026, 2027) for season in ("Fall", "Winter", "Spring")]
+
+
+class WalkIndex:
+    """What _meets_prerequisites did before prereq_index."""
+
+    def __init__(self, editor: ScheduleEditor):
+        self.editor = editor
+
+    def completed_before(self, term: str) -> Set[str]:
+        schedule = self.editor.schedule
+        taken = set(self.editor.transcript.keys())
+        for prev in list(schedule)[:list(schedule).index(term)]:
+            taken.update(c for c in schedule[prev] if c != "FILLER")
+        return taken
+
+
+class FullEditor(ScheduleEditor):
+    def _index(self):
+        return WalkIndex(self)
+
+    def _validate_prerequisites_for_edit(self, moved):
+        return self._validate_prerequisites_after_term(next(iter(self.schedule)))
+
+
+def make_plan(per_term: int, seed: int = 0) -> Tuple[Dict, Dict]:
+    rnd = random.Random(seed)
+    schedule, prereqs, placed = {}, {}, []
+    for term in TERMS:
+        schedule[term] = {}
+        for k in range(per_term):
+            course = f"SUBJ|{len(placed) + k}"
+            needs = [(p, 'prerequisite', 'D-', 'R') for p in rnd.sample(placed, min(len(placed), rnd.randint(0, 3)))]
+            prereqs[course] = ([needs] if rnd.random() < 0.5 else [[n] for n in needs]) if needs else []
+            schedule[term][course] = {}
+        placed += list(schedule[term])
+    return schedule, prereqs
+
+
+def editor(cls, schedule: Dict, prereqs: Dict) -> ScheduleEditor:
+    with open(os.devnull, "w") as null, contextlib.redirect_stderr(null):
+        return cls({t: dict(v) for t, v in schedule.items()}, {}, {}, prerequisites=prereqs)
+
+
+def make_edits(n: int, seed: int = 1) -> List[Tuple[str, str, float]]:
+    """Swaps between two terms; a swap keeps every term's size, so the
+    same list replays on both editors whatever they accept."""
+    rnd = random.Random(seed)
+    return [(*rnd.sample(TERMS, 2), rnd.random()) for _ in range(n)]
+
+
+def replay(ed: ScheduleEditor, edits: List[Tuple]) -> Tuple[float, int, int]:
+    checks = 0
+    meets = ed._meets_prerequisites
+
+    def counted(course_id, term):
+        nonlocal checks
+        checks += 1
+        return meets(course_id, term)
+
+    ed._meets_prerequisites = counted
+    accepted = 0
+    with open(os.devnull, "w") as null, contextlib.redirect_stderr(null):
+        ed._index()  # the one-off build is not part of an edit
+        t0 = time.perf_counter()
+        for a, b, pick in edits:
+            c1 = sorted(ed.schedule[a])[int(pick * len(ed.schedule[a]))]
+            c2 = sorted(ed.schedule[b])[int(pick * len(ed.schedule[b]))]
+            accepted += ed.swap_courses(c1, a, c2, b)[0]
+        elapsed = time.perf_counter() - t0
+    return elapsed / len(edits) * 1000, checks, accepted
+
+
+def main():
+    per_term = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    schedule, prereqs = make_plan(per_term)
+    edits = make_edits(n)
+    print(f"{len(TERMS)} terms x {per_term} courses, {n} swaps")
+    results = {}
+    for label, cls in (("full revalidation", FullEditor), ("prereq_index", ScheduleEditor)):
+        ms, checks, accepted = replay(editor(cls, schedule, prereqs), edits)
+        results[label] = ms
+        print(f"{label:>18}: {ms:7.3f} ms/edit  {checks / n:6.1f} checks/edit  {accepted} accepted")
+    print(f"speedup: {results['full revalidation'] / results['prereq_index']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
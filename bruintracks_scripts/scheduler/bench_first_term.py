@@ -0,0 +1,96 @@
+"""First-term search: branch and bound vs the old exhaustive prefix enumeration.
+
+    python3 bench_first_term.py [k] [seed]
+
+Builds synthetic terms with n offered courses (one lecture + one discussion
+each, random weekly meetings and section scores), then times
+term_search.best_assignment (one section option per course) against enumerating every k-combination and checking
+each one for conflicts, as build_schedule used to. Both must agree on the
+optimal score; exhaustive runs are skipped once C(n, k) gets too large.
+"""
+import sys
+import json
+import math
+import time
+import random
+from itertools import combinations
+from typing import Dict, List, Optional
+
+from term_search import conflict_graph, best_assignment
+
+EXHAUSTIVE_LIMIT = 2_000_000  # combinations
+SIZES = [8, 12, 16, 20, 25, 30, 40, 60, 80, 120]
+DAYS = ["MW", "TR", "MWF", "F", "T", "R"]
+
+
+def meeting(rnd: random.Random, minutes: int) -> Dict:
+    start = rnd.randrange(8 * 60, 19 * 60, 30)
+    end = start + minutes
+    return {
+        'days_of_week': rnd.choice(DAYS),
+        'start_time': f"{start // 60:02d}:{start % 60:02d}",
+        'end_time': f"{end // 60:02d}:{end % 60:02d}",
+    }
+
+
+def make_term(n: int, rnd: random.Random):
+    sel, scores = {}, {}
+    for i in range(n):
+        course = f"SYN|{100 + i}"
+        sel[course] = {
+            'lecture': {'times': [meeting(rnd, 80)]},
+            'discussion': {'times': [meeting(rnd, 50)]} if rnd.random() < 0.8 else None,
+        }
+        scores[course] = rnd.randint(0, 24)
+    return sel, scores
+
+
+def exhaustive(courses: List[str], scores: Dict[str, int], k: int,
+               conflicts, blocked) -> Optional[int]:
+    best = None
+    for combo in combinations(courses, min(k, len(courses))):
+        if any(c in blocked for c in combo):
+            continue
+        if any(b in conflicts[a] for a, b in combinations(combo, 2)):
+            continue
+        sc = sum(scores[c] for c in combo)
+        if best is None or sc > best:
+            best = sc
+    return best
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    out = fn(*args)
+    return out, (time.perf_counter() - started) * 1000
+
+
+def main():
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    rnd = random.Random(seed)
+    rows = []
+    for n in SIZES:
+        sel, scores = make_term(n, rnd)
+        courses = sorted(sel)
+        conflicts, blocked = conflict_graph(sel, False, False)
+        options = {c: [(scores[c], sel[c])] for c in courses}
+        pick, bnb_ms = timed(best_assignment, courses, options, k, k)
+        row = {
+            "courses": n,
+            "combinations": math.comb(n, k),
+            "bnb_ms": round(bnb_ms, 2),
+            "bnb_score": sum(scores[c] for c in pick) if pick else None,
+        }
+        if math.comb(n, k) <= EXHAUSTIVE_LIMIT:
+            best, ex_ms = timed(exhaustive, courses, scores, k, conflicts, blocked)
+            if best != row["bnb_score"]:
+                raise AssertionError(f"n={n}: exhaustive {best} != branch and bound {row['bnb_score']}")
+            row["exhaustive_ms"] = round(ex_ms, 2)
+            row["speedup"] = round(ex_ms / max(bnb_ms, 1e-3), 1)
+        rows.append(row)
+    print(json.dumps({"k": k, "seed": seed, "runs": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
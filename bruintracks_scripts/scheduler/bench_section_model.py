@@ -0,0 +1,121 @@
+"""Section model: decorated row dicts vs section_model.SectionStore.
+
+    python3 bench_section_model.py [sections] [runs]
+
+Builds a synthetic full-term catalog (default 9000 sections, one to three
+meetings and up to two instructors each, as JSON rows the way the catalog
+cache hands them out) and compares the planner's old step 3a/3b, which
+parsed times with strptime and hung `times`/`instructors`/`occupancy` on
+each section dict, with SectionStore.build. For each it reports the build
+time (median of `runs`), the memory retained by the finished model and the
+peak while building it (tracemalloc), and how long pack_sections then takes.
+"""
+import sys
+import json
+import time
+import random
+import tracemalloc
+from datetime import datetime
+from statistics import median
+from typing import Callable, Dict, List, Tuple
+
+from occupancy import section_bits
+from section_model import SectionStore
+from section_scoring import pack_sections
+
+DAYS = ["MW", "TR", "MWF", "F", "T", "R", "MTWR"]
+
+
+def make_rows(n: int, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    sections, meetings, names = [], [], {}
+    instructors = [f"Instructor {i}" for i in range(n // 3)]
+    for sid in range(1, n + 1):
+        sections.append({
+            'id': sid, 'course_id': rnd.randrange(n // 4), 'term_id': 1,
+            'section_code': f"{rnd.randint(1, 3)}{rnd.choice(['', 'A', 'B'])}",
+            'is_primary': rnd.random() < 0.4, 'activity': rnd.choice(["Lecture", "Discussion", "Laboratory"]),
+            'enrollment_cap': 40, 'enrollment_total': rnd.randint(0, 40),
+            'waitlist_cap': 5, 'waitlist_total': rnd.randint(0, 5),
+        })
+        for _ in range(rnd.randint(1, 3)):
+            start = rnd.randrange(8 * 60, 19 * 60, 10)
+            meetings.append({
+                'section_id': sid, 'days_of_week': rnd.choice(DAYS),
+                'start_time': f"{start // 60:02d}:{start % 60:02d}:00",
+                'end_time': f"{(start + 50) // 60:02d}:{(start + 50) % 60:02d}:00",
+                'building': f"BLDG{rnd.randrange(150)}", 'room': str(rnd.randrange(1000, 9000)),
+            })
+        names[sid] = rnd.sample(instructors, rnd.randint(0, 2))
+    return json.dumps({'sections': sections, 'meetings': meetings, 'names': names})
+
+
+def load(raw: str) -> Tuple[List[Dict], List[Dict], Dict[int, List[str]]]:
+    data = json.loads(raw)
+    return data['sections'], data['meetings'], {int(k): v for k, v in data['names'].items()}
+
+
+def dict_model(secs: List[Dict], mt: List[Dict], si_map: Dict[int, List[str]]) -> Dict[int, List[Dict]]:
+    # The planner's step 3a/3b before SectionStore
+    mt_map: Dict[int, List[Dict]] = {}
+    for m in mt:
+        m['start_time'] = datetime.strptime(m['start_time'], "%H:%M:%S").time()
+        m['end_time'] = datetime.strptime(m['end_time'], "%H:%M:%S").time()
+        mt_map.setdefault(m['section_id'], []).append(m)
+    by_course: Dict[int, List[Dict]] = {}
+    for s in secs:
+        s['times'] = mt_map.get(s['id'], [])
+        s['instructors'] = si_map.get(s['id'], [])
+        s['occupancy'] = section_bits(s['times'])
+        by_course.setdefault(s['course_id'], []).append(s)
+    return by_course
+
+
+def store_model(secs: List[Dict], mt: List[Dict], si_map: Dict[int, List[str]]) -> Dict[int, List]:
+    store = SectionStore.build(secs, mt, si_map)
+    by_course: Dict[int, List] = {}
+    for s in store.sections:
+        by_course.setdefault(s.course_id, []).append(s)
+    return by_course
+
+
+def measure(raw: str, build: Callable, runs: int) -> Dict[str, float]:
+    times = []
+    for _ in range(runs):
+        rows = load(raw)
+        started = time.perf_counter()
+        build(*rows)
+        times.append((time.perf_counter() - started) * 1000)
+
+    # Memory: what stays alive once the model is built and the rows it was
+    # built from are dropped (the dict model *is* those rows)
+    tracemalloc.start()
+    rows = load(raw)
+    model = build(*rows)
+    del rows
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.perf_counter()
+    pack_sections(model)
+    pack_ms = (time.perf_counter() - started) * 1000
+    return {
+        "build_ms": round(median(times), 1),
+        "retained_mb": round(retained / 2**20, 2),
+        "peak_mb": round(peak / 2**20, 2),
+        "pack_ms": round(pack_ms, 1),
+    }
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    raw = make_rows(n)
+    _, mt, _ = load(raw)
+    models = {"dict_rows": measure(raw, dict_model, runs),
+              "section_store": measure(raw, store_model, runs)}
+    print(json.dumps({"sections": n, "meetings": len(mt), "runs": runs, "models": models}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Chunked, concurrent, paginated `in_()` reads against PostgREST.
+
+One in_() filter with every id turns into one very long URL and one large
+response, and PostgREST quietly stops at its row cap (1000 by default), so a
+big plan could lose sections without any error. select_in() instead:
+
+  * splits the id list into chunks of at most IN_CHUNK_SIZE ids,
+  * runs the chunks concurrently on a small shared thread pool, all through
+    the caller's client (get_supabase keeps one per process, so they share
+    its pooled HTTP connections),
+  * pages every chunk with a stable order until a short page comes back,
+  * and merges the rows in chunk order.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from catalog_cache import PAGE_SIZE
+
+# ───── CONFIGURATION ─────
+# Ids per in_() filter: keeps request URLs a few KB at most
+IN_CHUNK_SIZE = int(os.getenv("IN_CHUNK_SIZE", 200))
+# Chunk requests in flight at once, per process
+FETCH_WORKERS = int(os.getenv("FETCH_WORKERS", 4))
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS,
+                                           thread_name_prefix="bulk-fetch")
+    return _pool
+
+
+def chunked(values: Sequence, size: int) -> List[List]:
+    return [list(values[i:i + size]) for i in range(0, len(values), size)]
+
+
+def select_in(client, table: str, columns: str, column: str, values: Iterable,
+              where: Optional[Dict[str, List]] = None, order: Sequence[str] = ("id",),
+              execute: Callable = lambda req: req.execute(),
+              chunk_size: Optional[int] = None, page_size: int = PAGE_SIZE,
+              workers: Optional[int] = None) -> List[Dict]:
+    """Every row of `table` whose `column` is in `values`.
+
+    `where` adds further in_() filters that go unchanged on every chunk, e.g.
+    the term ids next to chunked course ids. `order` must make rows unique so
+    pages neither skip nor repeat rows; order columns the caller did not
+    select are added to the query and dropped from the result. `workers`
+    runs this call on its own pool of that size instead of the shared one.
+    """
+    values = sorted(set(values))
+    if not values:
+        return []
+    selected = columns.split(",")
+    extra = [c for c in order if c not in selected]
+    select = ",".join(selected + extra)
+
+    def load(chunk: List) -> List[Dict]:
+        rows: List[Dict] = []
+        while True:
+            req = client.table(table).select(select).in_(column, chunk)
+            for col, vals in (where or {}).items():
+                req = req.in_(col, vals)
+            for col in order:
+                req = req.order(col)
+            page = execute(req.range(len(rows), len(rows) + page_size - 1)).data
+            rows.extend(page)
+            if len(page) < page_size:
+                break
+        for r in rows:
+            for col in extra:
+                del r[col]
+        return rows
+
+    chunks = chunked(values, chunk_size or IN_CHUNK_SIZE)
+    if len(chunks) == 1 or workers == 1:
+        return [r for chunk in chunks for r in load(chunk)]
+    if workers:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            merged = list(pool.map(load, chunks))
+    else:
+        merged = list(_get_pool().map(load, chunks))
+    return [r for rows in merged for r in rows]
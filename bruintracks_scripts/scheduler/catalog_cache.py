@@ -0,0 +1,447 @@
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# ───── CONFIGURATION ─────
+# The catalog (terms, subjects, courses, sections, meetings, instructors) only
+# changes when the registrar scrape is re-ingested, so every planner script
+# reads it through this snapshot before going to Supabase.
+CACHE_DIR = os.getenv(
+    "BRUINTRACKS_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "bruintracks")
+)
+# Where catalog reads go: "supabase", or "csv" for the offline scrape
+# catalog (csv_catalog). Its ids are its own, so its snapshot entries are
+# kept under a version of their own too.
+CATALOG_BACKEND = os.getenv("CATALOG_BACKEND", "supabase")
+CATALOG_VERSION = os.getenv("CATALOG_VERSION", "1")
+if CATALOG_BACKEND != "supabase":
+    CATALOG_VERSION = f"{CATALOG_BACKEND}-{CATALOG_VERSION}"
+CATALOG_TTL = float(os.getenv("CATALOG_CACHE_TTL", 6 * 60 * 60))
+CATALOG_CACHE_ENABLED = os.getenv("CATALOG_CACHE", "1") != "0"
+# Snapshot entries kept on disk; past this the least recently used are
+# evicted down to 90% of it. 0 keeps everything.
+CATALOG_CACHE_MAX_ROWS = int(os.getenv("CATALOG_CACHE_MAX_ROWS", 500_000))
+
+# Columns every script caches for a course row, so one snapshot entry serves
+# the planner (requisites), the editor and the elective lookup (title).
+COURSE_COLUMNS = "id,subject_id,catalog_number,title,course_requisites"
+# Columns the planner reads for sections and their meetings
+SECTION_COLUMNS = ("id,course_id,term_id,section_code,is_primary,activity,"
+                   "enrollment_cap,enrollment_total,waitlist_cap,waitlist_total")
+MEETING_COLUMNS = "section_id,days_of_week,start_time,end_time,building,room"
+# Offering index rows (one per course and season, built at ingest)
+OFFERING_COLUMNS = "course_id,season,years_offered,last_year"
+
+# Rows per request when a whole table is paged in (PostgREST's default cap)
+PAGE_SIZE = 1000
+
+# Stay well under SQLite's bound-parameter limit on older builds
+_SQL_CHUNK = 500
+# put_many calls between full row counts of the file; in between, a
+# writer adds its own rows to the last count
+_RECOUNT_EVERY = 64
+_WHOLE_TABLE = "*"
+
+
+def group_rows(rows: List[Dict], col: str) -> Dict:
+    """Bucket query rows by one column, the shape CatalogCache.fetch loaders return."""
+    out: Dict = {}
+    for r in rows:
+        out.setdefault(r[col], []).append(r)
+    return out
+
+
+def term_season(term_name: str) -> str:
+    """'Fall 2024' -> 'Fall'."""
+    return term_name.split()[0]
+
+
+def term_year(term_name: str) -> int:
+    """'Fall 2024' -> 2024 (0 when the name carries no year)."""
+    m = re.search(r"\b(\d{4})\b", term_name)
+    return int(m.group(1)) if m else 0
+
+
+def subject_match_name(name: str) -> str:
+    """'Computer Science (COM SCI)' -> 'COMPUTER SCIENCE', the form requisite leaves use."""
+    return re.sub(r"\s*\(.*\)$", "", name).strip().upper()
+
+
+class CatalogCache:
+    """Versioned, TTL-bounded snapshot of catalog rows in a local SQLite file.
+
+    Rows are stored per (table, key), e.g. ("courses", "COM SCI|31") or
+    ("meeting_times", 1234), as JSON lists. An empty list is a cached negative
+    answer, so keys with no rows do not go back to the network either.
+
+    Entries read in this process are also kept in memory as their JSON text,
+    so a long-lived worker skips SQLite on repeat reads while every caller
+    still gets fresh objects it is free to mutate. That layer holds at most
+    `max_rows` entries too, dropping the least recently used.
+
+    The file is shared by every process on the machine (CLI runs, workers).
+    Each entry records when it was last used: set on write, and refreshed by
+    a read (from SQLite or memory) once it is more than ttl/10 old, so most
+    reads stay read-only and a worker's hottest keys are not the first to
+    leave the file. A write that takes the file past `max_rows` evicts the
+    least recently used entries inside the same transaction, so concurrent
+    writers never see a half-trimmed snapshot. The row count behind that is exact
+    only every _RECOUNT_EVERY writes (or when this writer's estimate crosses
+    the bound); other processes' rows can push the file over until then.
+    """
+
+    def __init__(self, path: Optional[str] = None,
+                 version: str = CATALOG_VERSION, ttl: float = CATALOG_TTL,
+                 max_rows: int = CATALOG_CACHE_MAX_ROWS):
+        if path is None:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            path = os.path.join(CACHE_DIR, "catalog.sqlite3")
+        self.path = path
+        self.version = str(version)
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self._rows: Optional[int] = None  # file row count as of the last count, plus own writes
+        self._puts = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # (table, key) -> (fetched_at, JSON rows, used_at last written), LRU order
+        self._memory: Dict[Tuple[str, str], Tuple[float, str, float]] = OrderedDict()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshot (
+                version    TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                key        TEXT NOT NULL,
+                rows       TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                used_at    REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (version, table_name, key)
+            )
+        """)
+        # Files written before LRU eviction lack used_at
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(snapshot)")}
+        if "used_at" not in columns:
+            try:
+                self._conn.execute("ALTER TABLE snapshot ADD COLUMN used_at REAL NOT NULL DEFAULT 0")
+            except sqlite3.OperationalError as e:
+                # Another process opening the same old file added it first
+                if "duplicate column" not in str(e):
+                    raise
+        self._conn.execute("CREATE INDEX IF NOT EXISTS snapshot_used_at ON snapshot (used_at)")
+        self._conn.commit()
+
+    # ───── low-level access ─────
+
+    def get_many(self, table: str, keys: Iterable) -> Dict[str, List[Dict]]:
+        """Return {str(key): rows} for every key with a fresh snapshot entry."""
+        found: Dict[str, List[Dict]] = {}
+        now = time.time()
+        cutoff = now - self.ttl
+        # Recently used entries are not touched again, so most reads write nothing
+        stale_use = now - self.ttl / 10
+        cold, touch = [], []
+        with self._lock:
+            for k in map(str, keys):
+                hit = self._memory.get((table, k))
+                if hit and hit[0] >= cutoff:
+                    found[k] = json.loads(hit[1])
+                    self._memory.move_to_end((table, k))
+                    if hit[2] < stale_use:
+                        touch.append(k)
+                        self._memory[(table, k)] = (hit[0], hit[1], now)
+                else:
+                    cold.append(k)
+            for i in range(0, len(cold), _SQL_CHUNK):
+                chunk = cold[i:i + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                cur = self._conn.execute(
+                    f"SELECT key, rows, fetched_at, used_at FROM snapshot "
+                    f"WHERE version = ? AND table_name = ? AND fetched_at >= ? AND key IN ({marks})",
+                    [self.version, table, cutoff, *chunk]
+                )
+                for key, rows, fetched_at, used_at in cur:
+                    found[key] = json.loads(rows)
+                    if used_at < stale_use:
+                        touch.append(key)
+                        used_at = now
+                    self._remember((table, key), (fetched_at, rows, used_at))
+            for i in range(0, len(touch), _SQL_CHUNK):
+                chunk = touch[i:i + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                self._conn.execute(
+                    f"UPDATE snapshot SET used_at = ? "
+                    f"WHERE version = ? AND table_name = ? AND key IN ({marks})",
+                    [now, self.version, table, *chunk]
+                )
+            if touch:
+                self._conn.commit()
+        return found
+
+    def put_many(self, table: str, rows_by_key: Dict) -> None:
+        now = time.time()
+        payload = [
+            (self.version, table, str(k), json.dumps(rows, default=str), now, now)
+            for k, rows in rows_by_key.items()
+        ]
+        with self._lock:
+            for _, _, k, rows, _, _ in payload:
+                self._remember((table, k), (now, rows, now))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO snapshot (version, table_name, key, rows, fetched_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                payload
+            )
+            self._evict(len(payload))
+            self._conn.commit()
+
+    def _remember(self, key: Tuple[str, str], entry: Tuple[float, str, float]) -> None:
+        """Keep `entry` in memory as most recently used, within max_rows
+        (caller holds self._lock)."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while self.max_rows and len(self._memory) > self.max_rows:
+            self._memory.popitem(last=False)
+
+    def _evict(self, written: int) -> None:
+        """Trim the file to 90% of max_rows, least recently used first, after
+        `written` rows went in. Runs inside the writer's transaction (caller
+        holds self._lock); counts the file only now and then (see class doc)."""
+        if not self.max_rows:
+            return
+        self._puts += 1
+        if (self._rows is not None and self._puts % _RECOUNT_EVERY
+                and self._rows + written <= self.max_rows):
+            # An upper bound for this writer: replaced keys were counted again
+            self._rows += written
+            return
+        (n,) = self._conn.execute("SELECT COUNT(*) FROM snapshot").fetchone()
+        if n > self.max_rows:
+            n -= self._conn.execute(
+                "DELETE FROM snapshot WHERE rowid IN "
+                "(SELECT rowid FROM snapshot ORDER BY used_at LIMIT ?)",
+                (n - int(self.max_rows * 0.9),)
+            ).rowcount
+        self._rows = n
+
+    # ───── read-through helpers ─────
+
+    def fetch(self, table: str, keys: Iterable,
+              loader: Callable[[List], Dict]) -> Dict:
+        """Read-through lookup for keyed rows.
+
+        `loader(missing_keys)` must return {key: [rows]} for the keys it was
+        given; keys it leaves out are cached as having no rows.
+        """
+        keys = list(dict.fromkeys(keys))
+        cached = self.get_many(table, keys)
+        out, missing = {}, []
+        for k in keys:
+            if str(k) in cached:
+                out[k] = cached[str(k)]
+            else:
+                missing.append(k)
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            loaded = loader(missing)
+            fresh = {k: loaded.get(k, []) for k in missing}
+            self.put_many(table, fresh)
+            out.update(fresh)
+        return out
+
+    def table(self, table: str, loader: Callable[[], List[Dict]]) -> List[Dict]:
+        """Read-through lookup for a small table that is always read whole."""
+        return self.fetch(table, [_WHOLE_TABLE], lambda _: {_WHOLE_TABLE: loader()})[_WHOLE_TABLE]
+
+    # ───── invalidation ─────
+
+    def invalidate(self, table: Optional[str] = None) -> int:
+        """Drop every cached row, or one table's rows plus anything left behind
+        by older catalog versions. Returns the number of rows deleted."""
+        with self._lock:
+            self._memory.clear()
+            self._rows = None
+            if table is None:
+                cur = self._conn.execute("DELETE FROM snapshot")
+            else:
+                cur = self._conn.execute(
+                    "DELETE FROM snapshot WHERE table_name = ? OR version != ?",
+                    (table, self.version)
+                )
+            self._conn.commit()
+            return cur.rowcount
+
+    def info(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT version, table_name, COUNT(*) FROM snapshot GROUP BY version, table_name"
+            )
+            out: Dict[str, Dict[str, int]] = {}
+            for version, table, n in cur:
+                out.setdefault(version, {})[table] = n
+        return out
+
+
+class _NullCache(CatalogCache):
+    """Pass-through used when CATALOG_CACHE=0; every read goes to the loader."""
+
+    def __init__(self):
+        self.version = CATALOG_VERSION
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, table, keys):
+        return {}
+
+    def put_many(self, table, rows_by_key):
+        pass
+
+    def invalidate(self, table=None):
+        return 0
+
+    def info(self):
+        return {}
+
+
+_default_cache: Optional[CatalogCache] = None
+_default_lock = threading.Lock()
+
+
+def cached_subjects(client, cache: Optional[CatalogCache] = None,
+                    execute: Callable = lambda req: req.execute()) -> List[Dict]:
+    """All subjects rows, each with a precomputed `match_name`."""
+    cache = cache or get_catalog_cache()
+    return cache.table("subjects", lambda: [
+        {**s, 'match_name': subject_match_name(s['name'])}
+        for s in execute(client.table("subjects").select("id,code,name")).data
+    ])
+
+
+def _select_all(client, table: str, columns: str, order: List[str],
+                execute: Callable, page_size: int) -> List[Dict]:
+    """Every row of a table, paged with a stable order so no row is skipped."""
+    rows: List[Dict] = []
+    while True:
+        req = client.table(table).select(columns)
+        for col in order:
+            req = req.order(col)
+        page = execute(req.range(len(rows), len(rows) + page_size - 1)).data
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+
+
+def load_snapshot(client, cache: Optional[CatalogCache] = None,
+                  execute: Callable = lambda req: req.execute(),
+                  page_size: int = PAGE_SIZE) -> Dict[str, int]:
+    """Page the whole planner catalog into the cache in one pass.
+
+    Stores rows under the same (table, key) entries the planner's read-through
+    fetches use, plus empty entries for courses without offerings or sections
+    and sections without meetings, so later plans never go to the network. Returns the
+    number of rows loaded per table.
+    """
+    cache = cache or get_catalog_cache()
+    subjects = [{**s, 'match_name': subject_match_name(s['name'])}
+                for s in execute(client.table("subjects").select("id,code,name")).data]
+    terms = execute(client.table("terms").select("term_name,id")).data
+    cache.put_many("subjects", {_WHOLE_TABLE: subjects})
+    cache.put_many("terms", {_WHOLE_TABLE: terms})
+    id2sub = {s['id']: s['code'] for s in subjects}
+
+    courses = _select_all(client, "courses", COURSE_COLUMNS, ["id"], execute, page_size)
+    offerings = _select_all(client, "course_offerings", OFFERING_COLUMNS,
+                            ["course_id", "season"], execute, page_size)
+    sections = _select_all(client, "sections", SECTION_COLUMNS, ["id"], execute, page_size)
+    meetings = _select_all(client, "meeting_times", "id," + MEETING_COLUMNS, ["id"], execute, page_size)
+    teaching = _select_all(client, "section_instructors", "section_id,instructor_id",
+                           ["section_id", "instructor_id"], execute, page_size)
+    instructors = _select_all(client, "instructors", "id,name", ["id"], execute, page_size)
+    for m in meetings:
+        del m['id']  # only selected for paging
+
+    by_course: Dict[str, List[Dict]] = {}
+    for c in courses:
+        if c['subject_id'] in id2sub:
+            by_course.setdefault(f"{id2sub[c['subject_id']]}|{c['catalog_number']}", []).append(c)
+    # Sections are read per (course, term) for every term of a season the
+    # course is offered in, or every term for a course the offering index
+    # has no row for, so exactly those pairs get entries
+    by_season: Dict[str, List[int]] = {}
+    for t in terms:
+        by_season.setdefault(term_season(t['term_name']), []).append(t['id'])
+    by_pair: Dict[Tuple[int, int], List[Dict]] = {
+        (o['course_id'], tid): [] for o in offerings for tid in by_season.get(o['season'], [])
+    }
+    indexed = {o['course_id'] for o in offerings}
+    by_pair.update({(c['id'], t['id']): [] for c in courses if c['id'] not in indexed for t in terms})
+    for sec in sections:
+        by_pair.setdefault((sec['course_id'], sec['term_id']), []).append(sec)
+
+    cache.put_many("courses", by_course)
+    cache.put_many("course_offerings", {c['id']: [] for c in courses} | group_rows(offerings, 'course_id'))
+    cache.put_many("term_sections", by_pair)
+    cache.put_many("meeting_times", {s['id']: [] for s in sections} | group_rows(meetings, 'section_id'))
+    cache.put_many("section_instructors",
+                   {s['id']: [] for s in sections} | group_rows(teaching, 'section_id'))
+    cache.put_many("instructors", group_rows(instructors, 'id'))
+    # The same pairs again in the joined shape get_planning_bundle answers with
+    times, id2name = group_rows(meetings, 'section_id'), {i['id']: i['name'] for i in instructors}
+    names: Dict[int, List[str]] = {}
+    for r in teaching:
+        names.setdefault(r['section_id'], []).append(id2name[r['instructor_id']])
+    cache.put_many("planning_bundle", {
+        pair: [{**sec, 'times': times.get(sec['id'], []), 'instructors': names.get(sec['id'], [])}
+               for sec in secs]
+        for pair, secs in by_pair.items()
+    })
+    return {
+        "courses": len(courses), "course_offerings": len(offerings),
+        "sections": len(sections), "meeting_times": len(meetings),
+        "section_instructors": len(teaching), "instructors": len(instructors),
+    }
+
+
+def set_catalog_cache(cache: Optional[CatalogCache]) -> Optional[CatalogCache]:
+    """Make `cache` the process-wide instance, e.g. a batch worker pointed
+    at the snapshot its parent loaded, and return the one it replaces.
+    None goes back to building one from the environment on next use."""
+    global _default_cache
+    with _default_lock:
+        previous, _default_cache = _default_cache, cache
+    return previous
+
+
+def get_catalog_cache() -> CatalogCache:
+    """Process-wide cache instance honouring the CATALOG_* environment settings."""
+    global _default_cache
+    if _default_cache is None:
+        with _default_lock:
+            # Threads planning concurrently must all share the one connection
+            if _default_cache is None:
+                _default_cache = CatalogCache() if CATALOG_CACHE_ENABLED else _NullCache()
+    return _default_cache
+
+
+# ───── CLI: inspect / invalidate the snapshot ─────
+# python catalog_cache.py info
+# python catalog_cache.py invalidate [table]
+if __name__ == "__main__":
+    cache = get_catalog_cache()
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "info"
+    if cmd == "invalidate":
+        n = cache.invalidate(sys.argv[2] if len(sys.argv) > 2 else None)
+        print(json.dumps({"deleted": n}))
+    else:
+        print(json.dumps({"path": getattr(cache, "path", None),
+                          "version": cache.version,
+                          "tables": cache.info()}, indent=2))
@@ -0,0 +1,413 @@
+"""Offline catalog backend built from the registrar scrape CSVs.
+
+With CATALOG_BACKEND=csv, get_supabase() hands out a CSVCatalog instead of a
+Supabase client. It answers the reads the planner and the editor make
+(table().select().in_/eq/ilike/order/range/limit().execute() and the
+get_planning_bundle RPC) from in-memory tables built once per process from
+bruintracks_server/data:
+
+  * {fall,winter,spring}_courses_with_logic.csv: one row per meeting of a
+    primary section, with instructors and a requisite tree,
+  * course_name_mapping.csv: course codes and their department names.
+
+The scrape has no ids, section codes or enrollment counts, so the load
+derives them the way registrar_info_insert.py and refresh_course_offerings
+would have:
+
+  * ids are assigned in file order; each CSV file is one term (CSV_TERMS),
+  * consecutive rows (by the scrape's `index`) of the same course with the
+    same instructors are one section meeting more than once; any other row
+    starts a new section, numbered 001, 002, ... per course and term,
+  * every section is a primary lecture with open seats (OPEN_SECTION),
+  * requisite trees become the course_requisites JSON the planner compiles:
+    {'and': [...]}/{'or': [...]} over leaves with the registrar defaults of
+    D- and severity R.
+
+Requisite leaves name subjects the way the registrar spells them ("Physics
+1A", "Atmospheric  Oceanic Sciences 1") while the scrape only carries
+department names ("Physics and Astronomy"). Each leaf subject is matched
+to the code whose department name it is, or whose letters it contains in
+order (STATS in "Statistics"), preferring the code with the most of the
+catalog numbers the leaves ask for; subjects are then named the way their
+leaves spell them (other codes of the same department by their code) and
+the leaves rewritten to match. Leaves that match no
+code ("Satisfaction of Entry-Level Writing Requirement") are kept as-is and
+skipped by the planner like any other unknown subject.
+
+Every table is indexed by column on first use, so an eq() or in_() on any
+column costs one dict lookup per value rather than a scan.
+"""
+import os
+import re
+import ast
+import csv
+import threading
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from catalog_cache import term_season, term_year, SECTION_COLUMNS, MEETING_COLUMNS
+from planning_bundle import BUNDLE_FUNCTION, rows_to_columns
+
+# ───── CONFIGURATION ─────
+DATA_DIR = os.getenv(
+    "CATALOG_CSV_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "bruintracks_server", "data")
+)
+NAME_MAPPING = "course_name_mapping.csv"
+# (term_code, term_name, file) per term, oldest first
+CSV_TERMS = [
+    ("24F", "Fall 2024", "fall_courses_with_logic.csv"),
+    ("25W", "Winter 2025", "winter_courses_with_logic.csv"),
+    ("25S", "Spring 2025", "spring_courses_with_logic.csv"),
+]
+# The scrape has no enrollment counts; every section is served as open
+OPEN_SECTION = {'enrollment_cap': 100, 'enrollment_total': 0, 'waitlist_cap': 0, 'waitlist_total': 0}
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+        self.count = None
+
+
+class Table:
+    """Rows of one table plus per-column hash indexes built on first use."""
+
+    def __init__(self, rows: List[Dict]):
+        self.rows = rows
+        self._indexes: Dict[str, Dict[str, List[int]]] = {}
+        self._lock = threading.Lock()
+
+    def index(self, column: str) -> Dict[str, List[int]]:
+        """str(value) -> positions of the rows holding it (PostgREST compares as text)."""
+        idx = self._indexes.get(column)
+        if idx is None:
+            with self._lock:
+                idx = self._indexes.get(column)
+                if idx is None:
+                    idx = {}
+                    for i, r in enumerate(self.rows):
+                        idx.setdefault(_text(r.get(column)), []).append(i)
+                    self._indexes[column] = idx
+        return idx
+
+    def lookup(self, column: str, values: Iterable) -> List[int]:
+        idx = self.index(column)
+        out: List[int] = []
+        for v in {_text(v) for v in values}:
+            out.extend(idx.get(v, ()))
+        return sorted(out)
+
+
+def _text(value) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _like(pattern: str) -> "re.Pattern":
+    """SQL ILIKE pattern ('%' any run, '_' any one character) as a regex."""
+    parts = [".*" if ch == "%" else "." if ch == "_" else re.escape(ch) for ch in pattern]
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+class Query:
+    """The subset of postgrest's request builder the planner scripts use."""
+
+    def __init__(self, table: Table):
+        self._table = table
+        self._columns: Optional[List[str]] = None
+        self._keys: List[Tuple[str, List]] = []   # eq/in_ filters, answered by index
+        self._preds: List[Callable[[Dict], bool]] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._range: Optional[Tuple[int, int]] = None
+
+    def select(self, columns: str = "*", **_) -> "Query":
+        self._columns = None if columns.strip() == "*" else [c.strip() for c in columns.split(",")]
+        return self
+
+    def eq(self, column: str, value) -> "Query":
+        self._keys.append((column, [value]))
+        return self
+
+    def in_(self, column: str, values: Iterable) -> "Query":
+        self._keys.append((column, list(values)))
+        return self
+
+    def ilike(self, column: str, pattern: str) -> "Query":
+        rx = _like(pattern)
+        self._preds.append(lambda r: r.get(column) is not None and rx.fullmatch(str(r[column])) is not None)
+        return self
+
+    def order(self, column: str, desc: bool = False, **_) -> "Query":
+        self._order.append((column, desc))
+        return self
+
+    def range(self, start: int, end: int) -> "Query":
+        self._range = (start, end)
+        return self
+
+    def limit(self, size: int, **_) -> "Query":
+        start = self._range[0] if self._range else 0
+        self._range = (start, start + size - 1)
+        return self
+
+    def execute(self) -> _Result:
+        rows = self._table.rows
+        if self._keys:
+            # Start from the most selective indexed filter, check the rest per row
+            hits = min((self._table.lookup(c, vs) for c, vs in self._keys), key=len)
+            others = [(c, {_text(v) for v in vs}) for c, vs in self._keys]
+            found = [rows[i] for i in hits if all(_text(rows[i].get(c)) in vs for c, vs in others)]
+        else:
+            found = list(rows)
+        found = [r for r in found if all(p(r) for p in self._preds)]
+        for column, desc in reversed(self._order):
+            # Postgres puts NULLs last ascending and first descending
+            found.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        if self._range:
+            found = found[self._range[0]:self._range[1] + 1]
+        cols = self._columns
+        return _Result([dict(r) if cols is None else {c: r.get(c) for c in cols} for r in found])
+
+
+class _Call:
+    def __init__(self, run: Callable[[], Dict]):
+        self._run = run
+
+    def execute(self) -> _Result:
+        return _Result(self._run())
+
+
+class CSVCatalog:
+    """Stand-in for the Supabase client over the scrape CSVs in `data_dir`."""
+
+    def __init__(self, tables: Dict[str, List[Dict]]):
+        self.tables = {name: Table(rows) for name, rows in tables.items()}
+
+    @classmethod
+    def load(cls, data_dir: str = DATA_DIR,
+             terms: Sequence[Tuple[str, str, str]] = tuple(CSV_TERMS)) -> "CSVCatalog":
+        return cls(_build_tables(data_dir, terms))
+
+    def table(self, name: str) -> Query:
+        if name not in self.tables:
+            raise ValueError(f"CSV catalog has no table {name}")
+        return Query(self.tables[name])
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> _Call:
+        if name != BUNDLE_FUNCTION:
+            raise ValueError(f"CSV catalog does not serve {name}")
+        params = params or {}
+        return _Call(lambda: self.planning_bundle(params.get('course_ids', []),
+                                                  params.get('term_ids', [])))
+
+    def planning_bundle(self, course_ids: List[int], term_ids: List[int]) -> Dict:
+        """get_planning_bundle's columnar reply (see tools/rpc_functions)."""
+        sec_t, mt_t = self.tables["sections"], self.tables["meeting_times"]
+        si_t, ins_t = self.tables["section_instructors"], self.tables["instructors"]
+        terms = {_text(t) for t in term_ids}
+        secs = [sec_t.rows[i] for i in sec_t.lookup("course_id", course_ids)
+                if _text(sec_t.rows[i]['term_id']) in terms]
+        sec_ids = [s['id'] for s in secs]
+        meetings = [mt_t.rows[i] for i in mt_t.lookup("section_id", sec_ids)]
+        teaching = sorted((si_t.rows[i] for i in si_t.lookup("section_id", sec_ids)),
+                          key=lambda r: (r['section_id'], r['instructor_id']))
+        name_of = ins_t.index("id")
+        names = [{'section_id': r['section_id'],
+                  'name': ins_t.rows[name_of[_text(r['instructor_id'])][0]]['name']} for r in teaching]
+        return {
+            'sections': rows_to_columns(sorted(secs, key=lambda s: s['id']), SECTION_COLUMNS.split(",")),
+            'meetings': rows_to_columns(sorted(meetings, key=lambda m: m['id']), MEETING_COLUMNS.split(",")),
+            'instructors': rows_to_columns(names, ["section_id", "name"]),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_csv_catalog(data_dir: str = DATA_DIR) -> CSVCatalog:
+    """One loaded catalog per data directory per process."""
+    return CSVCatalog.load(data_dir)
+
+
+# ───── LOADING ─────
+
+def _read(path: str) -> List[Dict[str, str]]:
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def _split_code(course_id: str, full_name: str) -> Tuple[str, str, str]:
+    """('COM SCI 31', 'Computer Science 31') -> ('COM SCI', '31', 'Computer Science')."""
+    code, num = course_id.strip().rsplit(' ', 1)
+    dept = full_name.strip()
+    if dept.endswith(' ' + num):
+        dept = dept[:-len(num) - 1]
+    return code, num.upper(), dept
+
+
+@lru_cache(maxsize=None)
+def _hhmmss(text: str) -> str:
+    """'02:00 pm' -> '14:00:00' (the scrape repeats a few hundred distinct times)."""
+    return datetime.strptime(text.strip(), "%I:%M %p").strftime("%H:%M:%S")
+
+
+def _norm(name: str) -> str:
+    """Subject name compared without case, punctuation or 'and'/'&'."""
+    words = re.sub(r"[^A-Z0-9]+", " ", name.upper()).split()
+    return " ".join(w for w in words if w != "AND")
+
+
+def _letters_in_order(code: str, name: str) -> bool:
+    it = iter(name.replace(" ", ""))
+    return all(ch in it for ch in re.sub(r"[^A-Z0-9]", "", code.upper()))
+
+
+def _leaves(node) -> Iterable[str]:
+    if isinstance(node, str):
+        yield node
+    elif isinstance(node, dict):
+        for child in node.get('conditions') or ():
+            yield from _leaves(child)
+
+
+def _subject_aliases(trees: Iterable[Dict], dept: Dict[str, str],
+                     numbers: Dict[str, Set[str]]) -> Dict[str, Tuple[str, str]]:
+    """Normalized leaf subject -> (code, leaf spelling) for leaves we can place."""
+    asked: Dict[str, Set[str]] = {}
+    spelled: Dict[str, Counter] = {}
+    for tree in trees:
+        for part in ('prerequisites', 'corequisites'):
+            for leaf in _leaves(tree.get(part)):
+                pieces = " ".join(leaf.split()).rsplit(' ', 1)
+                if len(pieces) != 2:
+                    continue
+                key = _norm(pieces[0])
+                asked.setdefault(key, set()).add(pieces[1].upper())
+                spelled.setdefault(key, Counter())[pieces[0]] += 1
+    by_dept: Dict[str, List[str]] = {}
+    for code, name in dept.items():
+        by_dept.setdefault(_norm(name), []).append(code)
+
+    aliases = {}
+    for key, nums in asked.items():
+        named = set(by_dept.get(key, ()))
+        ranked = sorted(((len(nums & numbers[c]), c in named, c)
+                         for c in named | {c for c in dept if _letters_in_order(c, key)}), reverse=True)
+        if not ranked or ranked[0][0] == 0 or (len(ranked) > 1 and ranked[1][:2] == ranked[0][:2]):
+            continue
+        aliases[key] = (ranked[0][2], spelled[key].most_common(1)[0][0])
+    return aliases
+
+
+def _requisites(tree: Dict, rename: Callable[[str], str]) -> Optional[Dict]:
+    """Scrape requisite tree -> course_requisites JSON."""
+    def convert(node, relation):
+        if isinstance(node, str):
+            return {'course': rename(node), 'min_grade': 'D-', 'severity': 'R', 'relation': relation}
+        children = [convert(c, relation) for c in node.get('conditions') or ()]
+        return {node.get('type', 'AND').lower(): children} if children else None
+
+    parts = [convert(tree[k], rel) for k, rel in (('prerequisites', 'prerequisite'),
+                                                  ('corequisites', 'corequisite')) if tree.get(k)]
+    parts = [p for p in parts if p]
+    if not parts:
+        return None
+    return parts[0] if len(parts) == 1 else {'and': parts}
+
+
+def _build_tables(data_dir: str, terms: Sequence[Tuple[str, str, str]]) -> Dict[str, List[Dict]]:
+    mapping = _read(os.path.join(data_dir, NAME_MAPPING))
+    term_rows = [(code, name, _read(os.path.join(data_dir, path))) for code, name, path in terms]
+
+    dept: Dict[str, str] = {}
+    numbers: Dict[str, Set[str]] = {}
+    course_keys: Dict[Tuple[str, str], None] = {}
+    trees: Dict[Tuple[str, str], Dict] = {}   # latest term's tree per course
+    for row in mapping + [r for _, _, rows in term_rows for r in rows]:
+        code, num, name = _split_code(row['course_id'], row['full_course_id'])
+        dept.setdefault(code, name)
+        numbers.setdefault(code, set()).add(num)
+        course_keys.setdefault((code, num))
+        if row.get('requisites_logic', '').strip():
+            trees[(code, num)] = ast.literal_eval(row['requisites_logic'])
+
+    aliases = _subject_aliases(trees.values(), dept, numbers)
+    display = {code: name for code, name in dept.items()}
+    for key, (code, spelling) in aliases.items():
+        if _norm(display[code]) != key:
+            display[code] = spelling
+    # A department shared by several codes names only the code its leaves
+    # point at; the others go by their code so no two subjects match alike
+    claimed = {_norm(display[code]): code for code, _ in aliases.values()}
+    for code in dept:
+        if claimed.get(_norm(display[code]), code) != code:
+            display[code] = code
+
+    def rename(leaf: str) -> str:
+        pieces = " ".join(leaf.split()).rsplit(' ', 1)
+        hit = aliases.get(_norm(pieces[0])) if len(pieces) == 2 else None
+        return f"{display[hit[0]]} {pieces[1]}" if hit else leaf
+
+    subjects = [{'id': i, 'code': code, 'name': f"{display[code]} ({code})"}
+                for i, code in enumerate(sorted(dept), 1)]
+    sub_id = {s['code']: s['id'] for s in subjects}
+    courses = []
+    course_id: Dict[Tuple[str, str], int] = {}
+    for i, (code, num) in enumerate(course_keys, 1):
+        course_id[(code, num)] = i
+        tree = trees.get((code, num))
+        courses.append({'id': i, 'subject_id': sub_id[code], 'catalog_number': num,
+                        'title': None, 'short_title': None,
+                        'course_requisites': _requisites(tree, rename) if tree else None})
+
+    terms_out, sections, meetings, teaching = [], [], [], []
+    instructor_id: Dict[str, int] = {}
+    for term_id, (term_code, term_name, rows) in enumerate(term_rows, 1):
+        terms_out.append({'id': term_id, 'term_code': term_code, 'term_name': term_name})
+        per_course: Counter = Counter()
+        prev, sec = None, None
+        for row in rows:
+            code, num, _ = _split_code(row['course_id'], row['full_course_id'])
+            cid = course_id[(code, num)]
+            same_section = (prev is not None and prev['course_id'] == row['course_id']
+                            and prev['instructors'] == row['instructors']
+                            and int(prev['index']) + 1 == int(row['index']))
+            if not same_section:
+                per_course[cid] += 1
+                sec = {'id': len(sections) + 1, 'course_id': cid, 'term_id': term_id,
+                       'class_number': str(len(sections) + 1), 'section_code': f"{per_course[cid]:03d}",
+                       'is_primary': True, 'activity': "Lecture", **OPEN_SECTION}
+                sections.append(sec)
+                for name in dict.fromkeys(n.strip() for n in row['instructors'].split(';') if n.strip()):
+                    iid = instructor_id.setdefault(name, len(instructor_id) + 1)
+                    teaching.append({'section_id': sec['id'], 'instructor_id': iid})
+            if row['meet_strt_tm'].strip():
+                meetings.append({'id': len(meetings) + 1, 'section_id': sec['id'],
+                                 'days_of_week': row['days_of_wk_cd'].strip(),
+                                 'start_time': _hhmmss(row['meet_strt_tm']),
+                                 'end_time': _hhmmss(row['meet_stop_tm']),
+                                 'building': row['meet_bldg_cd'].strip(),
+                                 'room': row['meet_room_cd'].strip()})
+            prev = row
+
+    # refresh_course_offerings: one row per course and season taught
+    season_years: Dict[Tuple[int, str], Set[int]] = {}
+    term_name = {t['id']: t['term_name'] for t in terms_out}
+    for s in sections:
+        name = term_name[s['term_id']]
+        season_years.setdefault((s['course_id'], term_season(name)), set()).add(term_year(name))
+    offerings = [{'course_id': cid, 'season': season, 'years_offered': len(years), 'last_year': max(years)}
+                 for (cid, season), years in sorted(season_years.items())]
+
+    return {
+        'terms': terms_out,
+        'subjects': subjects,
+        'courses': courses,
+        'course_offerings': offerings,
+        'sections': sections,
+        'meeting_times': meetings,
+        'instructors': [{'id': i, 'name': n} for n, i in instructor_id.items()],
+        'section_instructors': teaching,
+    }
@@ -4,55 +4,26 @@ import json
 from typing import Dict, List, Set, Optional, Any
 from datetime import datetime
 from dotenv import load_dotenv
-from supabase import create_client, Client
+from supabase import Client
+from catalog_cache import get_catalog_cache, cached_subjects
+from supabase_client import get_supabase
+from requisites import compile_requisites, requisites_met
 
 # Load environment variables
 load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 
-# Print environment variables for debugging
-print("Environment variables:")
-print("SUPABASE_URL:", SUPABASE_URL)
-print("SUPABASE_KEY:", SUPABASE_KEY)
-
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise RuntimeError("Missing SUPABASE_URL or SUPABASE_ANON_KEY in environment")
 
 try:
     # Initialize Supabase client
-    supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    supabase: Client = get_supabase(SUPABASE_URL, SUPABASE_KEY)
 except Exception as e:
     print("Error initializing Supabase client:", str(e))
     raise
 
-# Get schedule and transcript from environment
-schedule_json = os.getenv("SCHEDULE")
-transcript_json = os.getenv("TRANSCRIPT")
-
-if not schedule_json or not transcript_json:
-    raise RuntimeError("Missing SCHEDULE or TRANSCRIPT in environment")
-
-try:
-    schedule = json.loads(schedule_json)
-    transcript = json.loads(transcript_json)
-except json.JSONDecodeError as e:
-    raise RuntimeError(f"Failed to parse JSON from environment: {e}")
-
-def to_dnf(node: Dict) -> List[List[Dict]]:
-    """Convert a boolean expression tree to DNF (Disjunctive Normal Form)"""
-    if 'and' in node:
-        prods = to_dnf(node['and'][0])
-        for child in node['and'][1:]:
-            prods = [a + b for a in prods for b in to_dnf(child)]
-        return prods
-    if 'or' in node:
-        res: List[List[Dict]] = []
-        for child in node['or']:
-            res.extend(to_dnf(child))
-        return res
-    return [[node]]
-
 def meets_min_grade(obtained: str, required: str) -> bool:
     """Check if an obtained grade meets the minimum required grade"""
     GRADE_ORDER = ["A+","A","A-","B+","B","B-","C+","C","C-","D+","D","D-","F"]
@@ -147,15 +118,47 @@ def get_elective_options(schedule: Dict[str, Any], transcript: Dict[str, Optiona
         Dictionary mapping elective placeholders to lists of valid course options
     """
     # Get subject mappings
-    subs = supabase.table("subjects").select("id,code,name").execute().data
+    catalog = get_catalog_cache()
+    subs = cached_subjects(supabase, catalog)
     sub2id = {s['code']: s['id'] for s in subs}
     id2sub = {s['id']: s['code'] for s in subs}
-    name2sub = {re.sub(r"\s*\(.*\)$", "", s['name']).strip().upper(): s['code'] for s in subs}
+    name2sub = {s['match_name']: s['code'] for s in subs}
     
     # Get completed and scheduled courses
     completed = get_completed_courses(transcript, schedule)
     scheduled = get_all_scheduled_courses(schedule)
     
+    def leaf_met(leaf: Dict) -> bool:
+        """Whether one requisite leaf is satisfied; leaves that cannot be
+        resolved to a course, and warnings, do not block."""
+        if 'course' not in leaf:
+            return True
+        txt = leaf['course'].strip().rstrip(')')
+        parts = txt.rsplit(' ', 1)
+        if len(parts) != 2:
+            return True
+        dept, num = parts
+        code = name2sub.get(dept.upper())
+        if not code:
+            return True
+        prereq_key = f"{code}|{num.upper()}"
+        
+        if leaf['relation'] in ('prerequisite', 'corequisite'):
+            min_grade = leaf.get('min_grade', 'D-')
+            severity = leaf.get('severity', 'R')
+            
+            if severity == 'R' or (severity == 'W' and not True):  # allow_warnings hardcoded to True
+                # For prerequisites, we need:
+                # 1. The course to be in completed courses
+                # 2. If there's a grade requirement, it must be met
+                if prereq_key not in completed:
+                    return False
+                if min_grade != 'D-':  # If there's a specific grade requirement
+                    grade = transcript.get(prereq_key)
+                    if grade is None or not meets_min_grade(grade, min_grade):
+                        return False
+        return True
+    
     # Find terms with electives
     elective_options: Dict[str, List[str]] = {}
     
@@ -198,12 +201,14 @@ def get_elective_options(schedule: Dict[str, Any], transcript: Dict[str, Optiona
                 continue
                 
             # Get all courses for this subject
-            courses_response = supabase.table("courses").select(
-                "id,catalog_number,title,course_requisites"
-            ).eq("subject_id", subject_id).execute()
+            subject_courses = catalog.fetch("courses_by_subject", [subject_id], lambda ids: {
+                subject_id: supabase.table("courses").select(
+                    "id,catalog_number,title,course_requisites"
+                ).eq("subject_id", subject_id).execute().data
+            })[subject_id]
             
             valid_options = []
-            for c in courses_response.data:
+            for c in subject_courses:
                 course_key = f"{subject_code}|{c['catalog_number']}"
                 
                 # Skip if already completed or scheduled
@@ -218,44 +223,11 @@ def get_elective_options(schedule: Dict[str, Any], transcript: Dict[str, Optiona
                 prereqs_met = True
                 raw_reqs = c.get('course_requisites', {})
                 if raw_reqs:
-                    clauses = to_dnf(raw_reqs)
-                    prereqs_met = False
-                    
-                    for clause in clauses:
-                        clause_met = True
-                        for leaf in clause:
-                            if 'course' not in leaf:
-                                continue
-                            txt = leaf['course'].strip().rstrip(')')
-                            parts = txt.rsplit(' ', 1)
-                            if len(parts) != 2:
-                                continue
-                            dept, num = parts
-                            code = name2sub.get(dept.upper())
-                            if not code:
-                                continue
-                            prereq_key = f"{code}|{num.upper()}"
-                            
-                            if leaf['relation'] in ('prerequisite', 'corequisite'):
-                                min_grade = leaf.get('min_grade', 'D-')
-                                severity = leaf.get('severity', 'R')
-                                
-                                if severity == 'R' or (severity == 'W' and not True):  # allow_warnings hardcoded to True
-                                    # For prerequisites, we need:
-                                    # 1. The course to be in completed courses
-                                    # 2. If there's a grade requirement, it must be met
-                                    if prereq_key not in completed:
-                                        clause_met = False
-                                        break
-                                    if min_grade != 'D-':  # If there's a specific grade requirement
-                                        grade = transcript.get(prereq_key)
-                                        if grade is None or not meets_min_grade(grade, min_grade):
-                                            clause_met = False
-                                            break
-                        
-                        if clause_met:
-                            prereqs_met = True
-                            break
+                    clauses = compile_requisites(raw_reqs, course_key, catalog.version)
+                    prereqs_met = any(all(leaf_met(leaf) for leaf in clause) for clause in clauses)
+                    if not prereqs_met and clauses.truncated:
+                        # The clause this student meets may be one the cap dropped
+                        prereqs_met = requisites_met(raw_reqs, leaf_met)
                 
                 if prereqs_met:
                     valid_options.append(f"{subject_code} {c['catalog_number']} - {c['title']}")
@@ -344,6 +316,23 @@ def test_get_elective_options():
     result_2 = get_elective_options(test_schedule_2, test_transcript_2)
     print("Elective Options:", json.dumps(result_2, indent=2))
 
+def run(input_data: Dict) -> Dict[str, List[str]]:
+    """Elective options for one request body; used by python_worker."""
+    return get_elective_options(input_data.get('schedule', {}), input_data.get('transcript', {}))
+
 if __name__ == "__main__":
-    result = get_elective_options(schedule, transcript)
+    # Get schedule and transcript from environment
+    schedule_json = os.getenv("SCHEDULE")
+    transcript_json = os.getenv("TRANSCRIPT")
+
+    if not schedule_json or not transcript_json:
+        raise RuntimeError("Missing SCHEDULE or TRANSCRIPT in environment")
+
+    try:
+        schedule = json.loads(schedule_json)
+        transcript = json.loads(transcript_json)
+    except json.JSONDecodeError as e:
+        raise RuntimeError(f"Failed to parse JSON from environment: {e}")
+
+    result = run({'schedule': schedule, 'transcript': transcript})
     print(json.dumps(result, indent=2)) 
\ No newline at end of file
@@ -0,0 +1,118 @@
+import heapq
+import threading
+from datetime import time as dtime
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+# ───── CONFIGURATION ─────
+# A week is encoded as one int: day-major, SLOT_MINUTES per bit. Meetings are
+# widened to whole slots (start rounded down, end rounded up), so two meetings
+# that overlap always share a bit; ones that only touch (10:00-10:50 and
+# 10:50-11:40) never do as long as their times fall on slot boundaries.
+SLOT_MINUTES = 5
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+
+# Day letters used by the registrar; anything else gets its own day lazily so
+# two meetings on the same unknown letter still collide.
+DAY_INDEX: Dict[str, int] = {d: i for i, d in enumerate("MTWRFSU")}
+_day_lock = threading.Lock()  # concurrent plans may meet the same new letter
+
+# (lecture bits, discussion bits) of one course's chosen sections
+CourseBits = Tuple[int, int]
+
+
+def minutes(t: Union[dtime, str]) -> int:
+    """Minutes since midnight of a time or an 'HH:MM[:SS]' string."""
+    if isinstance(t, str):
+        hh, mm = t.split(':')[:2]
+        return int(hh) * 60 + int(mm)
+    return t.hour * 60 + t.minute
+
+
+@lru_cache(maxsize=4096)
+def meeting_bits(days: str, start_min: int, end_min: int) -> int:
+    lo = start_min // SLOT_MINUTES
+    hi = -(-end_min // SLOT_MINUTES)
+    if hi <= lo:
+        return 0
+    run = (1 << (hi - lo)) - 1
+    bits = 0
+    for d in days or "":
+        day = DAY_INDEX.get(d)
+        if day is None:
+            with _day_lock:
+                day = DAY_INDEX.setdefault(d, len(DAY_INDEX))
+        bits |= run << (day * SLOTS_PER_DAY + lo)
+    return bits
+
+
+def section_bits(times: Iterable[Dict], days_key: str = 'days_of_week',
+                 start_key: str = 'start_time', end_key: str = 'end_time') -> int:
+    """Weekly occupancy of a section's meetings.
+
+    Defaults read the planner's meeting rows; the editor's formatted
+    schedule uses days/start/end.
+    """
+    bits = 0
+    for m in times:
+        bits |= meeting_bits(m[days_key], minutes(m[start_key]), minutes(m[end_key]))
+    return bits
+
+
+def overlapping_pairs(meetings: Iterable[Tuple[Hashable, str, int, int]]) -> List[Tuple[Hashable, Hashable]]:
+    """Every pair of keys whose meetings overlap on some day.
+
+    `meetings` are (key, days, start_min, end_min); a key may have several.
+    Each day's meetings are swept in start order with a heap of the ones
+    still running, so the cost is O(n log n) plus one step per overlap, and
+    every clash is found rather than the first. Meetings that only touch
+    (10:00-10:50 and 10:50-11:40) do not overlap, and a key never clashes
+    with itself. Pairs come back once each, ordered by the keys' first
+    appearance in `meetings`.
+    """
+    order: Dict[Hashable, int] = {}
+    by_day: Dict[str, List[Tuple[int, int, Hashable]]] = {}
+    for key, days, start, end in meetings:
+        order.setdefault(key, len(order))
+        if end > start:
+            for d in set(days or ""):
+                by_day.setdefault(d, []).append((start, end, key))
+
+    pairs = set()
+    for spans in by_day.values():
+        spans.sort(key=lambda s: (s[0], s[1]))
+        running: List[Tuple[int, int, Hashable]] = []  # (end, tiebreak, key)
+        for i, (start, end, key) in enumerate(spans):
+            while running and running[0][0] <= start:
+                heapq.heappop(running)
+            for _, _, other in running:
+                if other != key:
+                    pairs.add((other, key) if order[other] < order[key] else (key, other))
+            heapq.heappush(running, (end, i, key))
+    return sorted(pairs, key=lambda p: (order[p[0]], order[p[1]]))
+
+
+def selection_bits(sel: Dict[str, Optional[Dict]]) -> CourseBits:
+    """(lecture, discussion) bits of a {'lecture', 'discussion'} selection,
+    using the section's precomputed `occupancy` when it has one."""
+    def bits(sec) -> int:
+        if not sec:
+            return 0
+        if not isinstance(sec, dict):
+            return sec.occupancy  # section_model.Section
+        if 'occupancy' in sec:
+            return sec['occupancy']
+        return section_bits(sec.get('times', []))
+    return bits(sel.get('lecture')), bits(sel.get('discussion'))
+
+
+def bits_conflict(a: CourseBits, b: CourseBits,
+                  allow_primary: bool = False, allow_secondary: bool = False) -> bool:
+    """Whether two courses' sections clash under the planner's conflict rules:
+    lecture/lecture is a primary conflict; discussion/discussion and
+    lecture/discussion are secondary ones."""
+    (la, da), (lb, db) = a, b
+    if not allow_primary and la & lb:
+        return True
+    return not allow_secondary and bool(da & db or la & db or da & lb)
+
@@ -0,0 +1,119 @@
+"""Where one plan spends its time: phases, database traffic, search, memory.
+
+A request with "profile": true gets a PlanProfile; every other request gets
+NULL_PROFILE, whose mark() does nothing and whose execute() hands back the
+caller's execute function unchanged, so an unprofiled plan pays for nothing
+but a few no-op calls.
+
+    prof.mark("sections")                        # time since the last mark
+    rows = select_in(..., execute=prof.execute("sections", safe_execute))
+
+Peak memory comes from tracemalloc, which is process-wide: tracing runs while
+at least one profiled plan is in flight, and concurrent profiled plans see
+each other's allocations. Tracing also slows allocation-heavy phases, so
+profiled phase times run somewhat higher than unprofiled ones. Callers
+close() a profile in a finally block, so a plan that raises does not leave
+a resident worker tracing every later request.
+"""
+import time
+import threading
+import tracemalloc
+from typing import Callable, Dict, Optional
+
+_trace_users = 0
+_trace_owned = False  # only stop tracing this module started
+_trace_lock = threading.Lock()
+
+
+def _row_count(data) -> int:
+    if isinstance(data, list):
+        return len(data)
+    if isinstance(data, dict):
+        # A columnar RPC reply (see planning_bundle): rows of every block
+        return sum(len(next(iter(block.values()), [])) for block in data.values()
+                   if isinstance(block, dict))
+    return 0
+
+
+class PlanProfile:
+    """Phase times, per-table round trips and rows, and peak traced memory."""
+
+    enabled = True
+
+    def __init__(self):
+        global _trace_users, _trace_owned
+        self.phases: Dict[str, float] = {}
+        self.db: Dict[str, Dict[str, int]] = {}
+        self.search: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        with _trace_lock:
+            if _trace_users == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _trace_owned = True
+            _trace_users += 1
+        self._started = self._last = time.perf_counter()
+
+    def mark(self, phase: str) -> None:
+        """Charge the time since the previous mark to `phase`."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def execute(self, table: str, execute: Callable) -> Callable:
+        """`execute` that also counts round trips and rows under `table`."""
+        def counted(req):
+            resp = execute(req)
+            with self._lock:
+                t = self.db.setdefault(table, {'round_trips': 0, 'rows': 0})
+                t['round_trips'] += 1
+                t['rows'] += _row_count(resp.data)
+            return resp
+        return counted
+
+    def close(self) -> None:
+        """Stop this plan's memory tracing; later calls do nothing."""
+        global _trace_users, _trace_owned
+        with _trace_lock:
+            if self._closed:
+                return
+            self._closed = True
+            _trace_users -= 1
+            if _trace_users == 0 and _trace_owned:
+                tracemalloc.stop()
+                _trace_owned = False
+
+    def stats(self) -> Dict[str, object]:
+        """The output `stats` block; closes the profile."""
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() and not self._closed else 0
+        self.close()
+        return {
+            'total_ms': round((time.perf_counter() - self._started) * 1000, 1),
+            'phases_ms': {p: round(ms, 1) for p, ms in self.phases.items()},
+            'db': {
+                'round_trips': sum(t['round_trips'] for t in self.db.values()),
+                'rows': sum(t['rows'] for t in self.db.values()),
+                'tables': self.db,
+            },
+            'search': self.search,
+            'peak_traced_mb': round(peak / 2**20, 2),
+        }
+
+
+class _NullProfile:
+    enabled = False
+
+    def mark(self, phase: str) -> None:
+        pass
+
+    def execute(self, table: str, execute: Callable) -> Callable:
+        return execute
+
+    def close(self) -> None:
+        pass
+
+    def stats(self) -> Optional[Dict[str, object]]:
+        return None
+
+
+NULL_PROFILE = _NullProfile()
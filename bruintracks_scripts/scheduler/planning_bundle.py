@@ -0,0 +1,150 @@
+"""One-call section fetch for the planner: sections, meetings and instructors.
+
+get_planning_bundle() (bruintracks_server/tools/rpc_functions) joins the
+three tables server side and answers in a columnar shape, one array per
+column, so the four dependent round trips of the planner's section step
+collapse into one:
+
+    {"sections":    {"id": [...], "course_id": [...], ...SECTION_COLUMNS},
+     "meetings":    {"section_id": [...], ...MEETING_COLUMNS},
+     "instructors": {"section_id": [...], "name": [...]}}
+
+load_bundle() turns that back into per-(course_id, term_id) section rows with
+their meetings under 'times' and instructor names under 'instructors', the
+shape CatalogCache.fetch stores. SQLiteRPC answers the same call from a
+local database built with db.sql, so the path can be exercised offline.
+"""
+import os
+import sqlite3
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from catalog_cache import SECTION_COLUMNS, MEETING_COLUMNS
+
+BUNDLE_FUNCTION = "get_planning_bundle"
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "..", "db_scripts", "db.sql")
+
+
+def columns_to_rows(cols: Dict[str, List]) -> List[Dict]:
+    """{'a': [1, 2], 'b': [3, 4]} -> [{'a': 1, 'b': 3}, {'a': 2, 'b': 4}]."""
+    names = list(cols)
+    return [dict(zip(names, values)) for values in zip(*(cols[n] for n in names))]
+
+
+def rows_to_columns(rows: Iterable[Dict], names: List[str]) -> Dict[str, List]:
+    out: Dict[str, List] = {n: [] for n in names}
+    for r in rows:
+        for n in names:
+            out[n].append(r[n])
+    return out
+
+
+def load_bundle(client, pairs: List[Tuple[int, int]],
+                execute: Callable = lambda q: q.execute()) -> Dict[Tuple[int, int], List[Dict]]:
+    """Sections for every (course_id, term_id) pair, meetings and names attached.
+
+    The function matches the cross product of the course and term ids, so
+    rows for pairs nobody asked about are dropped here.
+    """
+    wanted = set(pairs)
+    bundle = execute(client.rpc(BUNDLE_FUNCTION, {
+        "course_ids": sorted({cid for cid, _ in pairs}),
+        "term_ids": sorted({tid for _, tid in pairs}),
+    })).data
+
+    times: Dict[int, List[Dict]] = {}
+    for m in columns_to_rows(bundle['meetings']):
+        times.setdefault(m['section_id'], []).append(m)
+    names: Dict[int, List[str]] = {}
+    for r in columns_to_rows(bundle['instructors']):
+        names.setdefault(r['section_id'], []).append(r['name'])
+
+    found: Dict[Tuple[int, int], List[Dict]] = {}
+    for s in columns_to_rows(bundle['sections']):
+        if (s['course_id'], s['term_id']) not in wanted:
+            continue
+        s['times'] = times.get(s['id'], [])
+        s['instructors'] = names.get(s['id'], [])
+        found.setdefault((s['course_id'], s['term_id']), []).append(s)
+    return found
+
+
+def unbundle(entries: Dict[Tuple[int, int], List[Dict]]) -> Tuple[List[Dict], List[Dict], Dict[int, List[str]]]:
+    """Split bundle rows into the (sections, meetings, section -> names) the planner builds."""
+    secs, meetings, si_map = [], [], {}
+    for rows in entries.values():
+        for s in rows:
+            meetings.extend(s.pop('times'))
+            si_map[s['id']] = s.pop('instructors')
+            secs.append(s)
+    return secs, meetings, si_map
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Call:
+    def __init__(self, run: Callable[[], Dict]):
+        self._run = run
+
+    def execute(self) -> _Result:
+        return _Result(self._run())
+
+
+class SQLiteRPC:
+    """Stand-in for the Supabase client's rpc() backed by a db.sql SQLite file.
+
+    Only get_planning_bundle is served. Times are kept as the 'HH:MM:SS'
+    text Postgres sends and is_primary comes back as a bool.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.conn.row_factory = sqlite3.Row
+
+    @classmethod
+    def create(cls, path: str = ":memory:", schema: Optional[str] = SCHEMA_PATH) -> "SQLiteRPC":
+        conn = sqlite3.connect(path, check_same_thread=False)
+        if schema:
+            with open(schema) as f:
+                conn.executescript(f.read())
+        return cls(conn)
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> _Call:
+        if name != BUNDLE_FUNCTION:
+            raise ValueError(f"SQLiteRPC does not serve {name}")
+        params = params or {}
+        return _Call(lambda: self.planning_bundle(params.get('course_ids', []),
+                                                  params.get('term_ids', [])))
+
+    def _select(self, sql: str, args: List) -> List[Dict]:
+        return [dict(r) for r in self.conn.execute(sql, args).fetchall()]
+
+    def planning_bundle(self, course_ids: List[int], term_ids: List[int]) -> Dict:
+        sec_cols = SECTION_COLUMNS.split(",")
+        mt_cols = MEETING_COLUMNS.split(",")
+        if not course_ids or not term_ids:
+            return {'sections': rows_to_columns([], sec_cols),
+                    'meetings': rows_to_columns([], mt_cols),
+                    'instructors': rows_to_columns([], ["section_id", "name"])}
+
+        in_sec = (f"SELECT id FROM sections WHERE course_id IN ({','.join('?' * len(course_ids))})"
+                  f" AND term_id IN ({','.join('?' * len(term_ids))})")
+        args = list(course_ids) + list(term_ids)
+        sections = self._select(
+            f"SELECT {','.join(sec_cols)} FROM sections WHERE id IN ({in_sec}) ORDER BY id", args)
+        for s in sections:
+            s['is_primary'] = bool(s['is_primary'])
+        meetings = self._select(
+            f"SELECT {','.join(mt_cols)} FROM meeting_times WHERE section_id IN ({in_sec}) "
+            f"ORDER BY id", args)
+        instructors = self._select(
+            "SELECT si.section_id, i.name FROM section_instructors si "
+            "JOIN instructors i ON i.id = si.instructor_id "
+            f"WHERE si.section_id IN ({in_sec}) ORDER BY si.section_id, si.instructor_id", args)
+        return {'sections': rows_to_columns(sections, sec_cols),
+                'meetings': rows_to_columns(meetings, mt_cols),
+                'instructors': rows_to_columns(instructors, ["section_id", "name"])}
@@ -0,0 +1,83 @@
+"""What each term of an edited plan has completed, and who depends on whom.
+
+The editor used to check every course of every term after each move, and
+each check rebuilt the set of courses taken before its term by walking all
+earlier terms. PrereqIndex keeps, for one schedule:
+
+  * `completed[i]`: the transcript plus every course of the terms before
+    term i (FILLER excluded), so "taken before" is one set lookup,
+  * `terms_of[c]`: the terms course c sits in,
+  * `dependents[p]`: the scheduled courses whose requisite clauses mention p.
+
+A move or swap changes two terms, so only the prefix sets between them are
+rebuilt (refresh), and only the moved courses and their direct dependents
+can change whether their prerequisites are met (affected). Other courses
+keep the standing they had before the edit.
+"""
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+# One DNF clause per list, leaves as (course, relation, min_grade, severity)
+Clauses = List[List[Tuple[str, str, str, str]]]
+
+
+def term_courses(term) -> List[str]:
+    """Course ids of one term in either schedule format (dict or list), FILLER excluded."""
+    return [c for c in term if c != "FILLER"]
+
+
+class PrereqIndex:
+    """Prefix-completion sets and a reverse requisite map for one schedule."""
+
+    def __init__(self, schedule: Dict, transcript: Iterable[str], prereqs: Callable[[str], Clauses]):
+        self.terms = list(schedule)
+        self.position = {t: i for i, t in enumerate(self.terms)}
+        self.transcript = set(transcript)
+        self.terms_of: Dict[str, Set[int]] = {}
+        self.completed: List[Set[str]] = []
+        self.dependents: Dict[str, Set[str]] = {}
+        self._prereqs = prereqs
+        self._indexed: Set[str] = set()
+        self.refresh(schedule, self.terms)
+
+    def refresh(self, schedule: Dict, changed: Iterable[str]) -> None:
+        """Bring the index up to date after `changed` terms were edited."""
+        changed = {self.position[t] for t in changed}
+        if not changed:
+            return
+        for course, where in list(self.terms_of.items()):
+            where -= changed
+            if not where:
+                del self.terms_of[course]
+        for i in changed:
+            for course in term_courses(schedule[self.terms[i]]):
+                self.terms_of.setdefault(course, set()).add(i)
+                self._index_dependents(course)
+
+        # completed[i] only depends on terms before i
+        first = min(changed)
+        del self.completed[first + 1:]
+        if not self.completed:
+            self.completed.append(set(self.transcript))
+        for i in range(len(self.completed), len(self.terms)):
+            self.completed.append(self.completed[i - 1] | set(term_courses(schedule[self.terms[i - 1]])))
+
+    def _index_dependents(self, course: str) -> None:
+        if course in self._indexed:
+            return
+        self._indexed.add(course)
+        for clause in self._prereqs(course):
+            for leaf in clause:
+                self.dependents.setdefault(leaf[0], set()).add(course)
+
+    def completed_before(self, term: str) -> Set[str]:
+        return self.completed[self.position[term]]
+
+    def affected(self, courses: Iterable[str]) -> List[Tuple[str, str]]:
+        """(course, term) placements to recheck after `courses` moved: the
+        courses themselves and every scheduled course depending on them,
+        in term order."""
+        courses = set(courses)
+        for c in list(courses):
+            courses |= self.dependents.get(c, set())
+        return sorted(((c, self.terms[i]) for c in courses for i in self.terms_of.get(c, ())),
+                      key=lambda p: (self.position[p[1]], p[0]))
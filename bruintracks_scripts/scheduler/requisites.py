@@ -0,0 +1,137 @@
+import os
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from catalog_cache import CATALOG_VERSION
+
+# ───── CONFIGURATION ─────
+# Upper bound on clauses kept for one requisite tree. AND-of-ORs expands
+# multiplicatively ("one of A/B/C and one of D/E/F and one of G/H" is already
+# 18 clauses), so every intermediate product is pruned and capped too.
+MAX_CLAUSES = int(os.getenv("REQUISITE_MAX_CLAUSES", 64))
+# Compiled requisite trees kept per process, least recently used dropped first
+MEMO_SIZE = int(os.getenv("REQUISITE_MEMO_SIZE", 4096))
+
+# A clause is the set of leaf keys (for subsumption tests) plus the leaves
+# themselves in their original order.
+_Clause = Tuple[FrozenSet[str], List[Dict]]
+
+# (course key, catalog version) -> (the tree as JSON, its compiled clauses)
+_compiled: Dict[Tuple[str, str], Tuple[str, "Clauses"]] = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+class Clauses(list):
+    """Compiled DNF clauses. `truncated` is set when MAX_CLAUSES dropped
+    some: a student can then meet the requisites through a clause that is
+    not listed, so an unmet result should be rechecked with requisites_met."""
+
+    truncated = False
+
+
+def _leaf_key(leaf: Dict) -> str:
+    return json.dumps(leaf, sort_keys=True, default=str)
+
+
+def _minimize(clauses: List[_Clause], cap: int, cut: List[bool]) -> List[_Clause]:
+    """Drop duplicate and subsumed clauses, then keep at most `cap` of them.
+
+    In DNF a clause that is a superset of another can never be the only one
+    satisfied, so it is redundant. Smaller clauses are preferred when the cap
+    bites (and cut[0] is set); survivors keep their original relative order.
+    """
+    order = sorted(range(len(clauses)), key=lambda i: len(clauses[i][0]))
+    kept: List[int] = []
+    for i in order:
+        keys = clauses[i][0]
+        if any(clauses[j][0] <= keys for j in kept):
+            continue
+        if len(kept) == cap:
+            cut[0] = True
+            break
+        kept.append(i)
+    return [clauses[i] for i in sorted(kept)]
+
+
+def _compile(node: Dict, cap: int, cut: List[bool]) -> List[_Clause]:
+    if 'and' in node:
+        prods: List[_Clause] = [(frozenset(), [])]
+        for child in node['and']:
+            rhs = _compile(child, cap, cut)
+            prods = _minimize([
+                (a_keys | b_keys, a_leaves + [l for l in b_leaves if _leaf_key(l) not in a_keys])
+                for a_keys, a_leaves in prods
+                for b_keys, b_leaves in rhs
+            ], cap, cut)
+        return prods
+    if 'or' in node:
+        res: List[_Clause] = []
+        for child in node['or']:
+            res.extend(_compile(child, cap, cut))
+        return _minimize(res, cap, cut)
+    return [(frozenset([_leaf_key(node)]), [node])]
+
+
+def compile_requisites(node: Optional[Dict], course_key: Optional[str] = None,
+                       version: str = CATALOG_VERSION,
+                       cap: Optional[int] = None) -> Clauses:
+    """Compile a `course_requisites` tree into a compact DNF clause list.
+
+    Same shape the old per-script `to_dnf` returned (a list of clauses, each a
+    list of leaf dicts), minus duplicate and subsumed clauses and bounded by
+    `cap` (MAX_CLAUSES by default; see Clauses.truncated). When `course_key` (the course's SUBJ|NUM)
+    is given the result is memoized per catalog version, and reused only
+    while the course's tree is unchanged, so a warm process compiles each
+    course's requisites once and a refreshed catalog is never served stale
+    clauses. Callers must treat the returned lists as read-only.
+    """
+    memo_key = (course_key, str(version)) if course_key is not None else None
+    tree = json.dumps(node, sort_keys=True, default=str) if memo_key is not None else None
+    if memo_key is not None:
+        with _compiled_lock:
+            hit = _compiled.get(memo_key)
+            if hit and hit[0] == tree:
+                _compiled.move_to_end(memo_key)
+                return hit[1]
+    cut = [False]
+    cap = MAX_CLAUSES if cap is None else cap
+    clauses = Clauses(leaves for _, leaves in _compile(node or {}, cap, cut))
+    clauses.truncated = cut[0]
+    if memo_key is not None:
+        with _compiled_lock:
+            _compiled[memo_key] = (tree, clauses)
+            _compiled.move_to_end(memo_key)
+            while len(_compiled) > MEMO_SIZE:
+                _compiled.popitem(last=False)
+    return clauses
+
+
+def requisites_met(node: Optional[Dict], leaf_met: Callable[[Dict], bool]) -> bool:
+    """Evaluate the tree itself, in time linear in its size: the check for
+    clause lists that were truncated. An empty tree is met."""
+    node = node or {}
+    if 'and' in node:
+        return all(requisites_met(child, leaf_met) for child in node['and'])
+    if 'or' in node:
+        return any(requisites_met(child, leaf_met) for child in node['or'])
+    return not node or leaf_met(node)
+
+
+def requisite_leaves(node: Optional[Dict]) -> Iterator[Dict]:
+    """Every leaf of the tree, including ones no kept clause mentions."""
+    node = node or {}
+    for op in ('and', 'or'):
+        if op in node:
+            for child in node[op]:
+                yield from requisite_leaves(child)
+            return
+    if node:
+        yield node
+
+
+def clear_compiled() -> None:
+    """Forget memoized clauses, e.g. after the catalog is re-ingested."""
+    with _compiled_lock:
+        _compiled.clear()
@@ -213,10 +213,8 @@ def print_schedule(schedule: Dict):
                 for course_id in courses:
                     print(f"  {course_id}")
 
-def main():
-    # Read input from stdin
-    input_data = json.loads(sys.stdin.read())
-    
+def run(input_data: Dict) -> Dict:
+    """Handle one chat edit request; shared by the CLI and python_worker."""
     editor = ScheduleEditor(
         schedule=input_data['schedule'],
         transcript=input_data['transcript'],
@@ -285,8 +283,14 @@ def main():
             'schedule': None
         }
     
+    return result
+
+def main():
+    # Read input from stdin
+    input_data = json.loads(sys.stdin.read())
+    
     # Output result as JSON
-    print(json.dumps(result))
+    print(json.dumps(run(input_data)))
 
 if __name__ == "__main__":
     main() 
@@ -1,10 +1,15 @@
 import os
 import json
 import sys
-from typing import Dict, List, Set, Tuple, Optional
-from datetime import datetime
+import threading
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Optional
 from dotenv import load_dotenv
-from supabase import create_client
+from supabase_client import get_supabase
+from catalog_cache import CatalogCache, get_catalog_cache, cached_subjects, COURSE_COLUMNS
+from bulk_fetch import select_in
+from requisites import compile_requisites
+from occupancy import minutes, overlapping_pairs, section_bits
+from prereq_index import PrereqIndex
 
 def debug_print(*args, **kwargs):
     """Print debug information to stderr."""
@@ -15,8 +20,34 @@ load_dotenv()
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 
+# (code -> subject id, requisite-leaf name -> code) per catalog version. A
+# resident python_worker builds them once, not once per edit or per leaf.
+_subject_maps: Dict[str, Tuple[Dict[str, int], Dict[str, str]]] = {}
+_subject_maps_lock = threading.Lock()
+
+# Snapshot table for resolved prerequisites, keyed by SUBJ|NUM. They only
+# depend on the course row and the subject names, so they live next to them
+# in the catalog cache and expire with them.
+PREREQ_TABLE = "editor_prerequisites"
+
+
+def subject_maps(client, catalog: CatalogCache,
+                 execute: Callable = lambda req: req.execute()) -> Tuple[Dict[str, int], Dict[str, str]]:
+    """Subject id by code, and code by `match_name` (see cached_subjects)."""
+    with _subject_maps_lock:
+        if catalog.version not in _subject_maps:
+            subs = cached_subjects(client, catalog, execute)
+            _subject_maps[catalog.version] = ({s['code']: s['id'] for s in subs},
+                                              {s['match_name']: s['code'] for s in subs})
+        return _subject_maps[catalog.version]
+
+
 class ScheduleEditor:
-    def __init__(self, schedule: Dict, transcript: Dict[str, str], preferences: Dict):
+    def __init__(self, schedule: Dict, transcript: Dict[str, str], preferences: Dict,
+                 supabase=None, prerequisites: Optional[Dict[str, List]] = None):
+        """`supabase` defaults to the process-wide client, opened on first use.
+        `prerequisites` preloads resolved DNF by SUBJ|NUM; those courses are
+        never looked up."""
         debug_print("\n=== Initializing Schedule Editor ===")
         debug_print(f"Initial Schedule: {json.dumps(schedule, indent=2)}")
         debug_print(f"Transcript: {json.dumps(transcript, indent=2)}")
@@ -26,12 +57,24 @@ class ScheduleEditor:
         self.schedule = schedule
         self.transcript = transcript
         self.preferences = preferences
-        self.supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+        self._supabase = supabase
         
         # Cache for course data
         self._course_cache = {}
-        self._prereq_cache = {}
-        
+        self._prereq_cache = dict(prerequisites or {})
+        # Database round trips per table, for this editor
+        self.round_trips: Dict[str, int] = {}
+        # Built on the first prerequisite check, then kept in step with edits
+        self._prereq_index: Optional[PrereqIndex] = None
+        # Courses let through only because their requisites were truncated
+        self.unchecked_requisites: Set[str] = set()
+        
+    @property
+    def supabase(self):
+        if self._supabase is None:
+            self._supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
+        return self._supabase
+
     def _get_course_data(self, course_id: str) -> Optional[Dict]:
         """Fetch course data from Supabase or cache."""
         debug_print(f"\n🔍 Fetching data for course: {course_id}")
@@ -45,32 +88,92 @@ class ScheduleEditor:
             debug_print("✓ Found in cache")
             return self._course_cache[course_id]
             
-        try:
-            subject_code, number = course_id.split('|')
-            debug_print(f"Looking up: Subject={subject_code}, Number={number}")
-            
-            # First, get the subject ID from the subjects table
-            subject_result = self.supabase.table("subjects").select("id").eq("code", subject_code).execute()
-            if not subject_result.data:
-                debug_print(f"❌ Subject {subject_code} not found in database")
-                return None
-            
-            subject_id = subject_result.data[0]['id']
-            debug_print(f"Found subject ID: {subject_id}")
-            
-            # Now get the course data using the numeric subject ID
-            result = self.supabase.table("courses").select("*").eq("subject_id", subject_id).eq("catalog_number", number).execute()
-            
-            if result.data:
-                debug_print("✓ Found course data in database")
-                self._course_cache[course_id] = result.data[0]
-                return result.data[0]
-            
-            debug_print("❌ Course not found in database")
-            return None
-        except ValueError:
-            debug_print(f"❌ Invalid course ID format: {course_id}")
-            return None
+        self._prefetch_courses([course_id])
+        if course_id in self._course_cache:
+            debug_print("✓ Found course data in database")
+            return self._course_cache[course_id]
+        debug_print("❌ Course not found in database")
+        return None
+
+    def _execute(self, table: str) -> Callable:
+        """req.execute(), counted under `table` in self.round_trips."""
+        def counted(req):
+            self.round_trips[table] = self.round_trips.get(table, 0) + 1
+            return req.execute()
+        return counted
+
+    def _subjects(self) -> Tuple[Dict[str, int], Dict[str, str]]:
+        return subject_maps(self.supabase, get_catalog_cache(), self._execute("subjects"))
+
+    def _subject_code(self, dept: str) -> Optional[str]:
+        """Subject code for the department a requisite leaf names, e.g.
+        "Computer Science" -> "COM SCI". Falls back to the first subject
+        whose name starts with it, as the old per-leaf ilike query did."""
+        name2sub = self._subjects()[1]
+        dept = dept.strip().upper()
+        if dept in name2sub:
+            return name2sub[dept]
+        return next((name2sub[n] for n in sorted(name2sub) if n.startswith(dept)), None)
+
+    def _load_courses(self, keys: List[str]) -> Dict[str, List[Dict]]:
+        """One batched read for any number of SUBJ|NUM keys (CatalogCache.fetch loader)."""
+        sub2id = self._subjects()[0]
+        wanted = {}
+        for k in keys:
+            dept, num = k.split("|", 1)
+            if dept in sub2id:
+                wanted[(sub2id[dept], num)] = k
+            else:
+                debug_print(f"❌ Subject {dept} not found in database")
+        if not wanted:
+            return {}
+        rows = select_in(self.supabase, "courses", COURSE_COLUMNS, "catalog_number",
+                         {num for _, num in wanted}, where={"subject_id": sorted({sid for sid, _ in wanted})},
+                         execute=self._execute("courses"))
+        found: Dict[str, List[Dict]] = {}
+        for r in rows:
+            # The two in_() filters match every subject x number pair
+            k = wanted.get((r['subject_id'], r['catalog_number']))
+            if k:
+                found.setdefault(k, []).append(r)
+        return found
+
+    def _prefetch_courses(self, course_ids: Iterable[str]) -> None:
+        """Load every course row a validation pass will need in one request."""
+        keys = []
+        for course_id in course_ids:
+            if course_id == "FILLER" or "Elective" in course_id or course_id in self._course_cache:
+                continue
+            if course_id.count('|') != 1:
+                debug_print(f"❌ Invalid course ID format: {course_id}")
+                continue
+            keys.append(course_id)
+        if not keys:
+            return
+        for course_id, rows in get_catalog_cache().fetch("courses", keys, self._load_courses).items():
+            if rows:
+                self._course_cache[course_id] = rows[0]
+
+    def _load_prerequisites(self, course_ids: Iterable[str]) -> None:
+        """Resolved prerequisites for every course a validation pass will check.
+
+        Each chat edit is a new editor, often a new process; courses resolved
+        by an earlier edit come back from the shared catalog cache without a
+        course read or leaf lookup. The rest are resolved from one batched
+        course read and stored for the next edit.
+        """
+        keys = [c for c in dict.fromkeys(course_ids)
+                if c != "FILLER" and "Elective" not in c and c not in self._prereq_cache]
+        if not keys:
+            return
+
+        def resolve(missing: List[str]) -> Dict[str, List]:
+            self._prefetch_courses(missing)
+            return {c: self._get_prerequisites(c) for c in missing}
+
+        for course_id, clauses in get_catalog_cache().fetch(PREREQ_TABLE, keys, resolve).items():
+            # Stored as JSON, so leaves come back as lists
+            self._prereq_cache[course_id] = [[tuple(leaf) for leaf in clause] for clause in clauses]
 
     def _get_prerequisites(self, course_id: str) -> List[List[Tuple[str, str, str, str]]]:
         """Get prerequisites for a course in DNF form."""
@@ -93,21 +196,9 @@ class ScheduleEditor:
         
         debug_print(f"Raw prerequisite data: {json.dumps(course_data['course_requisites'], indent=2)}")
         
-        def to_dnf(node: Dict) -> List[List[Dict]]:
-            if 'and' in node:
-                prods = to_dnf(node['and'][0])
-                for child in node['and'][1:]:
-                    prods = [a + b for a in prods for b in to_dnf(child)]
-                return prods
-            if 'or' in node:
-                res = []
-                for child in node['or']:
-                    res.extend(to_dnf(child))
-                return res
-            return [[node]]
-        
         prereqs = []
-        for clause in to_dnf(course_data["course_requisites"]):
+        clauses = compile_requisites(course_data["course_requisites"], course_id, get_catalog_cache().version)
+        for clause in clauses:
             debug_print(f"\nProcessing prerequisite clause: {json.dumps(clause, indent=2)}")
             prereq_clause = []
             for req in clause:
@@ -125,12 +216,11 @@ class ScheduleEditor:
                 dept, num = course_parts
                 debug_print(f"Looking up subject code for department: {dept}")
                 # Look up the subject code for the department name
-                subject_result = self.supabase.table("subjects").select("code").ilike("name", f"{dept}%").execute()
-                if not subject_result.data:
+                subject_code = self._subject_code(dept)
+                if not subject_code:
                     debug_print(f"Warning: Could not find subject code for department: {dept}")
                     continue
                     
-                subject_code = subject_result.data[0]['code']
                 debug_print(f"Found subject code: {subject_code}")
                 prereq_clause.append((
                     f"{subject_code}|{num}",
@@ -143,6 +233,12 @@ class ScheduleEditor:
             if prereq_clause:
                 prereqs.append(prereq_clause)
                 debug_print(f"Added clause: {prereq_clause}")
+        if clauses.truncated:
+            # Too many clauses to list them all: the one this student meets
+            # may be missing, so an empty clause lets the course through
+            # (reported as unchecked_requisites) rather than block it
+            debug_print(f"Warning: requisites of {course_id} truncated to {len(clauses)} clauses")
+            prereqs.append([])
                 
         self._prereq_cache[course_id] = prereqs
         debug_print(f"\nFinal prerequisites for {course_id}: {prereqs}")
@@ -162,26 +258,8 @@ class ScheduleEditor:
             debug_print("✓ No prerequisites found")
             return True
             
-        # Get all courses taken before this term
-        taken_courses = set(self.transcript.keys())
-        debug_print(f"Courses from transcript: {taken_courses}")
-        
-        term_order = list(self.schedule.keys())
-        current_term_idx = term_order.index(term)
-        
-        # Only look at courses from terms STRICTLY BEFORE the current term
-        for prev_term_idx in range(current_term_idx):
-            prev_term = term_order[prev_term_idx]
-            debug_print(f"\nChecking courses from previous term: {prev_term}")
-            if isinstance(self.schedule[prev_term], dict):
-                # For dictionary format, add course IDs directly
-                # Skip FILLER courses
-                taken_courses.update(cid for cid in self.schedule[prev_term].keys() if cid != "FILLER")
-            else:
-                # For list format, add course IDs directly
-                # Skip FILLER courses
-                taken_courses.update(cid for cid in self.schedule[prev_term] if cid != "FILLER")
-        
+        # Transcript plus every course from terms STRICTLY BEFORE the current term
+        taken_courses = self._index().completed_before(term)
         debug_print(f"All courses taken before {term}: {taken_courses}")
                     
         # Check if any prerequisite clause is satisfied
@@ -219,88 +297,67 @@ class ScheduleEditor:
                     debug_print(f"✓ Found prerequisite: {prereq}")
                 
             if clause_satisfied:
-                debug_print("✓ Prerequisites satisfied!")
+                if not clause:
+                    debug_print("⚠️ Requisites were truncated; not checked")
+                    self.unchecked_requisites.add(course_id)
+                else:
+                    debug_print("✓ Prerequisites satisfied!")
                 return True
                 
         debug_print("❌ No prerequisite clauses satisfied")
         return False
 
+    @staticmethod
+    def _section_bits(section: Optional[Dict]) -> int:
+        """Weekly occupancy bitset of a formatted section (days/start/end)."""
+        if not section:
+            return 0
+        return section_bits(section.get('times', []), 'days', 'start', 'end')
+
     def _check_time_conflict(self, section1: Dict, section2: Dict) -> bool:
         """Check if two sections have time conflicts."""
-        def meetings_overlap(m1: Dict, m2: Dict) -> bool:
-            if not set(m1['days']).intersection(m2['days']):
-                return False
-            t1_start = datetime.strptime(m1['start'], '%H:%M').time()
-            t1_end = datetime.strptime(m1['end'], '%H:%M').time()
-            t2_start = datetime.strptime(m2['start'], '%H:%M').time()
-            t2_end = datetime.strptime(m2['end'], '%H:%M').time()
-            return not (t1_end <= t2_start or t2_end <= t1_start)
-
-        for m1 in section1.get('times', []):
-            for m2 in section2.get('times', []):
-                if meetings_overlap(m1, m2):
-                    return True
-        return False
+        return bool(self._section_bits(section1) & self._section_bits(section2))
 
-    def _validate_term_schedule(self, schedule: Dict) -> bool:
-        """Validate a term's schedule for time conflicts."""
+    def _term_conflicts(self, schedule: Dict) -> List[Tuple[str, str]]:
+        """Every pair of courses in a term whose sections overlap.
+
+        A course whose lecture and discussion overlap each other is paired
+        with itself. One sweep over all meetings (see
+        occupancy.overlapping_pairs) finds every clash, not just the first.
+        """
         debug_print("\n=== Validating Term Schedule ===")
-        debug_print(f"Schedule to validate: {json.dumps(schedule, indent=2)}")
-        
-        # Extract all meeting times
         meetings = []
         for course_id, course_data in schedule.items():
             # Skip FILLER courses
             if course_id == "FILLER" or not isinstance(course_data, dict):
                 continue
-                
-            # Add lecture meetings
-            if 'lecture' in course_data and course_data['lecture']:
-                for time in course_data['lecture'].get('times', []):
-                    meetings.append({
-                        'days': time['days'],
-                        'start': time['start'],
-                        'end': time['end'],
-                        'course': course_data['lecture'].get('section_code', 'Unknown')
-                    })
-            
-            # Add discussion meetings
-            if 'discussion' in course_data and course_data['discussion']:
-                for time in course_data['discussion'].get('times', []):
-                    meetings.append({
-                        'days': time['days'],
-                        'start': time['start'],
-                        'end': time['end'],
-                        'course': course_data['discussion'].get('section_code', 'Unknown')
-                    })
-        
-        debug_print(f"\nExtracted meetings: {json.dumps(meetings, indent=2)}")
-        
-        # Check for conflicts
-        for i in range(len(meetings)):
-            for j in range(i + 1, len(meetings)):
-                m1, m2 = meetings[i], meetings[j]
-                
-                # Check if meetings share any days
-                days1 = set(m1['days'])
-                days2 = set(m2['days'])
-                if not days1.intersection(days2):
-                    continue
-                
-                # Check time overlap
-                if m1['start'] < m2['end'] and m2['start'] < m1['end']:
-                    debug_print(f"❌ Found conflict:")
-                    debug_print(f"  Section 1: {m1['course']} ({m1['days']} {m1['start']}-{m1['end']})")
-                    debug_print(f"  Section 2: {m2['course']} ({m2['days']} {m2['start']}-{m2['end']})")
-                    return False
-        
-        debug_print("✓ No conflicts found")
+            for kind in ('lecture', 'discussion'):
+                for t in (course_data.get(kind) or {}).get('times', []):
+                    meetings.append(((course_id, kind), t['days'], minutes(t['start']), minutes(t['end'])))
+        conflicts = []
+        for (a, _), (b, _) in overlapping_pairs(meetings):
+            if (a, b) not in conflicts:
+                conflicts.append((a, b))
+                debug_print(f"❌ Found conflict: {a} overlaps {'itself' if a == b else b}")
+        if not conflicts:
+            debug_print("✓ No conflicts found")
         debug_print("=== Validation Complete ===\n")
-        return True
+        return conflicts
+
+    @staticmethod
+    def _conflict_message(prefix: str, conflicts: List[Tuple[str, str]]) -> str:
+        clashes = "; ".join(f"{a} lecture overlaps its discussion" if a == b else f"{a} overlaps {b}"
+                            for a, b in conflicts)
+        return f"{prefix}: {clashes}"
+
+    def _validate_term_schedule(self, schedule: Dict) -> bool:
+        """Validate a term's schedule for time conflicts."""
+        return not self._term_conflicts(schedule)
 
     def _validate_prerequisites_for_term(self, term: str) -> Tuple[bool, Optional[str]]:
         """Check prerequisites for all courses in a term."""
         debug_print(f"\n🔍 Validating prerequisites for all courses in {term}")
+        self._load_prerequisites(self.schedule[term])
         for course_id in self.schedule[term]:
             # Skip FILLER courses
             if course_id == "FILLER":
@@ -309,10 +366,34 @@ class ScheduleEditor:
                 return False, f"Prerequisites not met for {course_id} in {term}"
         return True, None
 
+    def _index(self) -> PrereqIndex:
+        if self._prereq_index is None:
+            self._load_prerequisites(c for term in self.schedule.values() for c in term)
+            self._prereq_index = PrereqIndex(self.schedule, self.transcript, self._get_prerequisites)
+        return self._prereq_index
+
+    def _set_schedule(self, schedule: Dict, changed: Tuple[str, ...]) -> None:
+        """Replace the schedule after an edit (or undo) of the `changed` terms."""
+        self.schedule = schedule
+        if self._prereq_index is not None:
+            self._prereq_index.refresh(schedule, changed)
+
+    def _validate_prerequisites_for_edit(self, moved: List[str]) -> Tuple[bool, Optional[str]]:
+        """Check prerequisites of the moved courses and of every course that
+        lists one of them; nothing else can change standing in a move or swap."""
+        debug_print(f"\n🔍 Validating prerequisites affected by moving {moved}")
+        affected = self._index().affected(moved)
+        self._load_prerequisites(c for c, _ in affected)
+        for course_id, term in affected:
+            if not self._meets_prerequisites(course_id, term):
+                return False, f"Prerequisites not met for {course_id} in {term}"
+        return True, None
+
     def _validate_prerequisites_after_term(self, start_term: str) -> Tuple[bool, Optional[str]]:
         """Check prerequisites for all courses in all terms, starting from the first quarter."""
         debug_print(f"\n🔍 Validating prerequisites for all terms")
         term_order = list(self.schedule.keys())
+        self._load_prerequisites(c for term in self.schedule.values() for c in term)
         
         # Always start from the first term
         for term_idx in range(len(term_order)):
@@ -367,28 +448,29 @@ class ScheduleEditor:
         
         # Store original schedule
         original_schedule = {**self.schedule}
+        changed = (from_term, to_term)
         
         # Apply temporary changes to check prerequisites
-        self.schedule = temp_schedule
+        self._index()
+        self._set_schedule(temp_schedule, changed)
         
-        # Check prerequisites for all courses in and after both terms
-        earliest_term = min(from_term, to_term)
-        valid, message = self._validate_prerequisites_after_term(earliest_term)
+        # Check prerequisites of the moved course and its dependents
+        valid, message = self._validate_prerequisites_for_edit([course_id])
         
         if not valid:
             # Restore original schedule
-            self.schedule = original_schedule
+            self._set_schedule(original_schedule, changed)
             return False, message
             
         # Validate term schedule if destination is earliest quarter (has detailed info)
         if to_term == min(self.schedule.keys()) and isinstance(temp_schedule[to_term], dict):
-            if not self._validate_term_schedule(temp_schedule[to_term]):
+            conflicts = self._term_conflicts(temp_schedule[to_term])
+            if conflicts:
                 # Restore original schedule
-                self.schedule = original_schedule
-                return False, "Time conflict in new term"
+                self._set_schedule(original_schedule, changed)
+                return False, self._conflict_message("Time conflict in new term", conflicts)
             
         # If all validations pass, keep the changes
-        self.schedule = temp_schedule
         return True, "Move successful"
 
     def swap_courses(self, course1_id: str, term1: str, course2_id: str, term2: str) -> Tuple[bool, str]:
@@ -417,28 +499,30 @@ class ScheduleEditor:
         
         # Store original schedule
         original_schedule = {**self.schedule}
+        changed = (term1, term2)
         
         # Apply temporary changes to check prerequisites
-        self.schedule = temp_schedule
+        self._index()
+        self._set_schedule(temp_schedule, changed)
         
-        # Check prerequisites for all courses in and after both terms
-        earliest_term = min(term1, term2)
-        valid, message = self._validate_prerequisites_after_term(earliest_term)
+        # Check prerequisites of both courses and their dependents
+        valid, message = self._validate_prerequisites_for_edit([course1_id, course2_id])
         
         if not valid:
             # Restore original schedule
-            self.schedule = original_schedule
+            self._set_schedule(original_schedule, changed)
             return False, message
             
-        # Validate both terms
-        if not self._validate_term_schedule(temp_schedule[term1]):
-            # Restore original schedule
-            self.schedule = original_schedule
-            return False, f"Time conflict in {term1} after swap"
-        if not self._validate_term_schedule(temp_schedule[term2]):
+        # Validate both terms, reporting every clash in either
+        messages = []
+        for term in dict.fromkeys((term1, term2)):
+            conflicts = self._term_conflicts(temp_schedule[term])
+            if conflicts:
+                messages.append(self._conflict_message(f"Time conflict in {term} after swap", conflicts))
+        if messages:
             # Restore original schedule
-            self.schedule = original_schedule
-            return False, f"Time conflict in {term2} after swap"
+            self._set_schedule(original_schedule, changed)
+            return False, "\n".join(messages)
             
         # If all validations pass, keep the changes
         return True, "Swap successful"
@@ -467,7 +551,7 @@ class ScheduleEditor:
         # Fetch new section data from Supabase
         if new_lecture_id:
             debug_print(f"\nFetching new lecture data (ID: {new_lecture_id})")
-            result = self.supabase.table("sections").select("*").eq("id", new_lecture_id).execute()
+            result = self._execute("sections")(self.supabase.table("sections").select("*").eq("id", new_lecture_id))
             if not result.data:
                 debug_print("❌ Invalid lecture section ID")
                 return False, "Invalid lecture section ID"
@@ -476,7 +560,7 @@ class ScheduleEditor:
             
         if new_discussion_id:
             debug_print(f"\nFetching new discussion data (ID: {new_discussion_id})")
-            result = self.supabase.table("sections").select("*").eq("id", new_discussion_id).execute()
+            result = self._execute("sections")(self.supabase.table("sections").select("*").eq("id", new_discussion_id))
             if not result.data:
                 debug_print("❌ Invalid discussion section ID")
                 return False, "Invalid discussion section ID"
@@ -489,9 +573,10 @@ class ScheduleEditor:
         
         debug_print("\nValidating temporary schedule...")
         # Validate term
-        if not self._validate_term_schedule(temp_schedule):
+        conflicts = self._term_conflicts(temp_schedule)
+        if conflicts:
             debug_print("❌ Time conflict with new section(s)")
-            return False, "Time conflict with new section(s)"
+            return False, self._conflict_message("Time conflict with new section(s)", conflicts)
             
         # If validation passes, update the section
         debug_print("✓ Validation passed, updating schedule")
@@ -500,10 +585,8 @@ class ScheduleEditor:
         debug_print("=== Section Change Complete ===\n")
         return True, "Section change successful"
 
-def main():
-    # Read input from stdin
-    input_data = json.loads(sys.stdin.read())
-    
+def run(input_data: Dict) -> Dict:
+    """Apply one editor operation; shared by the CLI and python_worker."""
     editor = ScheduleEditor(
         schedule=input_data['schedule'],
         transcript=input_data['transcript'],
@@ -535,13 +618,22 @@ def main():
     else:
         success, message = False, "Invalid operation type"
     
-    # Return result
-    result = {
+    debug_print(f"Database round trips: {editor.round_trips}")
+    output = {
         'success': success,
         'message': message,
         'schedule': editor.schedule if success else None
     }
-    print(json.dumps(result))
+    if editor.unchecked_requisites:
+        output['unchecked_requisites'] = sorted(editor.unchecked_requisites)
+    if input_data.get('profile'):
+        output['stats'] = {'round_trips': editor.round_trips}
+    return output
+
+def main():
+    # Read input from stdin
+    input_data = json.loads(sys.stdin.read())
+    print(json.dumps(run(input_data)))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""Compact in-memory model of the sections a plan reads.
+
+Catalog rows arrive as JSON dicts; the planner used to decorate each section
+dict in place with `times` (meeting dicts holding datetime.time objects),
+`instructors` and `occupancy`. SectionStore instead builds, once per catalog
+load:
+
+  * one slotted Section record per section, holding its scalar columns and
+    its weekly occupancy bitset (see occupancy.py),
+  * CSR-style meeting arrays: section i's meetings are the slice
+    meet_ptr[i]:meet_ptr[i+1] of parallel `array`s of start/end minutes
+    since midnight, day bitmasks and interned days/building/room ids,
+  * the same layout for instructors (instr_ptr / instr_ids).
+
+Nothing is mutated after the build, so Sections can be shared freely by the
+search. section_json() turns one back into the /schedule output shape at
+format_schedule.
+"""
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from occupancy import DAY_INDEX, meeting_bits, minutes
+
+
+class Interner:
+    """Strings (or None) to dense ints and back."""
+
+    __slots__ = ('ids', 'values')
+
+    def __init__(self):
+        self.ids: Dict[Optional[str], int] = {}
+        self.values: List[Optional[str]] = []
+
+    def __call__(self, value: Optional[str]) -> int:
+        i = self.ids.get(value)
+        if i is None:
+            i = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+class Section:
+    """One section's scalar columns; meetings and instructors live in `store`."""
+
+    __slots__ = ('id', 'course_id', 'term_id', 'section_code', 'is_primary', 'activity',
+                 'enrollment_cap', 'enrollment_total', 'waitlist_cap', 'waitlist_total',
+                 'occupancy', 'store', 'row')
+
+    def __init__(self, row: Dict, store: "SectionStore", index: int):
+        self.id = row['id']
+        self.course_id = row['course_id']
+        self.term_id = row['term_id']
+        self.section_code = row.get('section_code')
+        self.is_primary = bool(row['is_primary'])
+        self.activity = row.get('activity')
+        self.enrollment_cap = row['enrollment_cap']
+        self.enrollment_total = row['enrollment_total']
+        self.waitlist_cap = row['waitlist_cap']
+        self.waitlist_total = row['waitlist_total']
+        self.occupancy = 0
+        self.store = store
+        self.row = index
+
+    def is_full(self) -> bool:
+        """Section and waitlist both full."""
+        return (self.enrollment_total >= self.enrollment_cap
+                and self.waitlist_total >= self.waitlist_cap)
+
+    def meetings(self) -> range:
+        """Indexes of this section's meetings in the store's meeting arrays."""
+        return range(self.store.meet_ptr[self.row], self.store.meet_ptr[self.row + 1])
+
+    def instructors(self) -> List[str]:
+        st = self.store
+        return [st.instructors.values[i]
+                for i in st.instr_ids[st.instr_ptr[self.row]:st.instr_ptr[self.row + 1]]]
+
+    def __repr__(self) -> str:
+        return f"Section({self.id}, course={self.course_id}, term={self.term_id})"
+
+
+class SectionStore:
+    """Every section of a catalog load with CSR meeting and instructor arrays."""
+
+    def __init__(self):
+        self.sections: List[Section] = []
+        self.days = Interner()
+        self.buildings = Interner()
+        self.rooms = Interner()
+        self.instructors = Interner()
+        self.day_mask: List[int] = []  # per interned days string
+        self.meet_ptr = array('L', [0])
+        self.m_start = array('H')      # minutes since midnight
+        self.m_end = array('H')
+        self.m_days = array('L')       # interned days_of_week
+        self.m_mask = array('L')       # bit DAY_INDEX[d] set for each day letter
+        self.m_building = array('L')
+        self.m_room = array('L')
+        self.instr_ptr = array('L', [0])
+        self.instr_ids = array('L')
+
+    @classmethod
+    def build(cls, sections: Iterable[Dict], meetings: Iterable[Dict],
+              names: Dict[int, List[str]]) -> "SectionStore":
+        """Store for section rows, their meeting rows ('HH:MM:SS' times) and
+        instructor names by section id, keeping the sections' order."""
+        store = cls()
+        by_section: Dict[int, List[Dict]] = {}
+        for m in meetings:
+            by_section.setdefault(m['section_id'], []).append(m)
+        for row in sections:
+            sec = Section(row, store, len(store.sections))
+            occupancy = 0
+            for m in by_section.get(sec.id, ()):
+                start, end = minutes(m['start_time']), minutes(m['end_time'])
+                days = m['days_of_week'] or ""
+                d = store.days(days)
+                if d == len(store.day_mask):
+                    store.day_mask.append(store._mask(days))
+                store.m_start.append(start)
+                store.m_end.append(end)
+                store.m_days.append(d)
+                store.m_mask.append(store.day_mask[d])
+                store.m_building.append(store.buildings(m.get('building')))
+                store.m_room.append(store.rooms(m.get('room')))
+                occupancy |= meeting_bits(days, start, end)
+            sec.occupancy = occupancy
+            store.meet_ptr.append(len(store.m_start))
+            store.instr_ids.extend(store.instructors(n) for n in names.get(sec.id, ()))
+            store.instr_ptr.append(len(store.instr_ids))
+            store.sections.append(sec)
+        return store
+
+    @staticmethod
+    def _mask(days: str) -> int:
+        mask = 0
+        for d in days:
+            if d in DAY_INDEX:
+                mask |= 1 << DAY_INDEX[d]
+        return mask
+
+    def meeting(self, i: int) -> Tuple[str, int, int, Optional[str], Optional[str]]:
+        """(days_of_week, start, end, building, room) of meeting i; times in minutes."""
+        return (self.days.values[self.m_days[i]], self.m_start[i], self.m_end[i],
+                self.buildings.values[self.m_building[i]], self.rooms.values[self.m_room[i]])
+
+
+def hhmm(mins: int) -> str:
+    return f"{mins // 60:02d}:{mins % 60:02d}"
+
+
+def meeting_slots(sec: Section) -> Iterator[Dict[str, object]]:
+    """A section's meetings as output `times` rows: meetings sharing start,
+    end, building and room are merged and their days joined."""
+    st = sec.store
+    slots: Dict[Tuple[int, int, int, int], set] = {}
+    for i in sec.meetings():
+        key = (st.m_start[i], st.m_end[i], st.m_building[i], st.m_room[i])
+        slots.setdefault(key, set()).add(st.days.values[st.m_days[i]])
+    for (start, end, bld, room), days in slots.items():
+        yield {
+            'days': ''.join(sorted(days)),
+            'start': hhmm(start),
+            'end': hhmm(end),
+            'building': st.buildings.values[bld],
+            'room': st.rooms.values[room],
+        }
+
+
+def section_json(sec: Section) -> Dict[str, object]:
+    """The /schedule output shape of one chosen section."""
+    return {
+        'id': sec.id,
+        'section': sec.section_code,
+        'activity': sec.activity,
+        'enrollment_cap': sec.enrollment_cap,
+        'enrollment_total': sec.enrollment_total,
+        'waitlist_cap': sec.waitlist_cap,
+        'waitlist_total': sec.waitlist_total,
+        'times': list(meeting_slots(sec)),
+        'instructors': sec.instructors(),
+    }
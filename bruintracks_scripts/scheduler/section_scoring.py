@@ -0,0 +1,186 @@
+import os
+from datetime import time as dtime
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from section_model import Section
+
+# ───── CONFIGURATION ─────
+# Lectures and discussions kept per (course, term) in the ranked table; a
+# course then has up to RANK_DEPTH**2 lecture/discussion pairings to fall
+# back on when its best ones conflict.
+RANK_DEPTH = int(os.getenv("SECTION_RANK_DEPTH", 4))
+
+
+def _seconds(t: dtime) -> int:
+    return t.hour * 3600 + t.minute * 60 + t.second
+
+
+class SectionPack:
+    """Sections packed into flat arrays for vectorized scoring.
+
+    Section-level arrays are indexed by position in `sections`; meeting-level
+    (`m_*`) and instructor-level (`i_*`) arrays point back at their section.
+    Courses, terms, buildings and instructors are interned to small ints and
+    days become bitmasks over the day letters seen (`day_bits`).
+    """
+
+    def __init__(self):
+        self.sections: List[Dict] = []
+        self.courses: List[str] = []
+        self.course_ids: Dict[str, int] = {}
+        self.term_ids: Dict[object, int] = {}
+        self.day_bits: Dict[str, int] = {}
+        self.building_ids: Dict[str, int] = {}
+        self.instructor_ids: Dict[str, int] = {}
+
+    def day_mask(self, days: str) -> int:
+        mask = 0
+        for d in days:
+            if d not in self.day_bits:
+                self.day_bits[d] = 1 << len(self.day_bits)
+            mask |= self.day_bits[d]
+        return mask
+
+
+def _unpack(sec: Union[Section, Dict]) -> Tuple[object, bool, Iterable[Tuple], List[str]]:
+    """(term_id, is_primary, meetings, instructors) of a Section or a section
+    dict with `times`/`instructors`; meetings as (days, start s, end s, building)."""
+    if isinstance(sec, Section):
+        st = sec.store
+        meetings = [(st.days.values[st.m_days[i]], st.m_start[i] * 60, st.m_end[i] * 60,
+                     st.buildings.values[st.m_building[i]]) for i in sec.meetings()]
+        return sec.term_id, sec.is_primary, meetings, sec.instructors()
+    meetings = [(m['days_of_week'], _seconds(m['start_time']), _seconds(m['end_time']), m['building'])
+                for m in sec['times']]
+    return sec['term_id'], sec['is_primary'], meetings, sec['instructors']
+
+
+def pack_sections(sections_by_course: Dict[str, List[Union[Section, Dict]]],
+                  courses: Optional[Iterable[str]] = None) -> SectionPack:
+    """Pack every section (all terms) of `courses`, or of every course.
+
+    Built once per request; score it with score_sections and rank it with
+    rank_sections.
+    """
+    pack = SectionPack()
+    course_idx, term_idx, primary = [], [], []
+    m_sec, m_start, m_end, m_days, m_bld = [], [], [], [], []
+    i_sec, i_id = [], []
+    masks: Dict[str, int] = {}
+    for course in (sections_by_course if courses is None else courses):
+        c_idx = pack.course_ids.setdefault(course, len(pack.course_ids))
+        if c_idx == len(pack.courses):
+            pack.courses.append(course)
+        for sec in sections_by_course.get(course, []):
+            s_idx = len(pack.sections)
+            pack.sections.append(sec)
+            course_idx.append(c_idx)
+            term_id, is_primary, meetings, instructors = _unpack(sec)
+            term_idx.append(pack.term_ids.setdefault(term_id, len(pack.term_ids)))
+            primary.append(bool(is_primary))
+            for days, start, end, building in meetings:
+                if days not in masks:
+                    masks[days] = pack.day_mask(days)
+                m_sec.append(s_idx)
+                m_start.append(start)
+                m_end.append(end)
+                m_days.append(masks[days])
+                m_bld.append(pack.building_ids.setdefault(building, len(pack.building_ids)))
+            for name in instructors:
+                i_sec.append(s_idx)
+                i_id.append(pack.instructor_ids.setdefault(name, len(pack.instructor_ids)))
+
+    pack.course_idx = np.array(course_idx, dtype=np.int64)
+    pack.term_idx = np.array(term_idx, dtype=np.int64)
+    pack.is_primary = np.array(primary, dtype=bool)
+    pack.m_sec = np.array(m_sec, dtype=np.int64)
+    pack.m_start = np.array(m_start, dtype=np.int64)
+    pack.m_end = np.array(m_end, dtype=np.int64)
+    pack.m_days = np.array(m_days, dtype=np.int64)
+    pack.m_bld = np.array(m_bld, dtype=np.int64)
+    pack.i_sec = np.array(i_sec, dtype=np.int64)
+    pack.i_id = np.array(i_id, dtype=np.int64)
+    return pack
+
+
+def score_sections(pack: SectionPack, weights: Dict[str, int],
+                   earliest: dtime, latest: dtime, buildings: Set[str],
+                   no_days: Set[str], instructors: Set[str]) -> np.ndarray:
+    """Preference score of every packed section, in one vectorized pass.
+
+    Per meeting: the 'time' weight once each for a start and an end inside
+    [earliest, latest], the 'building' weight for a preferred building and the
+    'days' weight when it avoids every day in `no_days`. The section then gets
+    the 'instructor' weight once if any of its instructors is preferred.
+    """
+    n = len(pack.sections)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    lo, hi = _seconds(earliest), _seconds(latest)
+    w_time = weights.get('time', 0)
+    avoid = 0
+    for d in no_days:
+        avoid |= pack.day_bits.get(d, 0)
+    good_blds = [pack.building_ids[b] for b in buildings if b in pack.building_ids]
+    good_instr = [pack.instructor_ids[i] for i in instructors if i in pack.instructor_ids]
+
+    per_meeting = (
+        w_time * ((lo <= pack.m_start) & (pack.m_start <= hi))
+        + w_time * ((lo <= pack.m_end) & (pack.m_end <= hi))
+        + weights.get('building', 0) * np.isin(pack.m_bld, good_blds)
+        + weights.get('days', 0) * ((pack.m_days & avoid) == 0)
+    )
+    scores = np.bincount(pack.m_sec, weights=per_meeting, minlength=n).astype(np.int64)
+    matched = np.bincount(pack.i_sec[np.isin(pack.i_id, good_instr)], minlength=n) > 0
+    return scores + weights.get('instructor', 0) * matched
+
+
+def section_options(lectures: List[Tuple[int, Dict]], discussions: List[Tuple[int, Dict]]
+                    ) -> List[Tuple[int, Dict[str, Optional[Dict]]]]:
+    """Every lecture/discussion pairing, best combined score first.
+
+    Inputs are ranked (score, section) lists; an empty side pairs as None.
+    The sort is stable, so the first option is always the top lecture with
+    the top discussion.
+    """
+    options = [
+        (l_sc + d_sc, {'lecture': lec, 'discussion': disc})
+        for l_sc, lec in (lectures or [(0, None)])
+        for d_sc, disc in (discussions or [(0, None)])
+    ]
+    options.sort(key=lambda opt: -opt[0])
+    return options
+
+
+def rank_sections(pack: SectionPack, scores: np.ndarray, depth: int = RANK_DEPTH
+                  ) -> Dict[Tuple[str, object], List[Tuple[int, Dict[str, Optional[Dict]]]]]:
+    """Ranked section options for every (course, term_id) in the pack.
+
+    Keeps the `depth` best lectures and discussions of each course per term
+    (ties go to the section listed first) and pairs them up with
+    section_options. Built once per request; scoring a course in a term is
+    then `table[(course, term_id)][0][0]`, and a search that cannot use the
+    top pairing moves down the list instead of rescoring.
+    """
+    n = len(pack.sections)
+    if n == 0:
+        return {}
+    kind = (~pack.is_primary).astype(np.int64)
+    order = np.lexsort((np.arange(n), -scores, kind, pack.course_idx, pack.term_idx))
+    t_sorted, c_sorted, k_sorted = pack.term_idx[order], pack.course_idx[order], kind[order]
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = ((t_sorted[1:] != t_sorted[:-1]) | (c_sorted[1:] != c_sorted[:-1])
+                  | (k_sorted[1:] != k_sorted[:-1]))
+    pos = np.arange(n)
+    rank = pos - np.maximum.accumulate(np.where(starts, pos, 0))
+
+    term_of = {idx: term_id for term_id, idx in pack.term_ids.items()}
+    ranked: Dict[Tuple[str, object], Tuple[List, List]] = {}
+    for s_idx in order[rank < depth].tolist():
+        key = (pack.courses[pack.course_idx[s_idx]], term_of[pack.term_idx[s_idx]])
+        lectures, discussions = ranked.setdefault(key, ([], []))
+        (lectures if pack.is_primary[s_idx] else discussions).append(
+            (int(scores[s_idx]), pack.sections[s_idx]))
+    return {key: section_options(lec, disc) for key, (lec, disc) in ranked.items()}
@@ -0,0 +1,19 @@
+from functools import lru_cache
+from supabase import create_client, Client
+
+from catalog_cache import CATALOG_BACKEND
+
+
+@lru_cache(maxsize=None)
+def get_supabase(url: str, key: str) -> Client:
+    """One client per (url, key) per process.
+
+    Each CLI run only ever builds one, but a resident python_worker serves many
+    requests and should keep reusing the same client and its HTTP connections.
+    With CATALOG_BACKEND=csv the catalog is served offline from the scrape
+    CSVs instead (see csv_catalog) and url and key are ignored.
+    """
+    if CATALOG_BACKEND == "csv":
+        from csv_catalog import get_csv_catalog
+        return get_csv_catalog()
+    return create_client(url, key)
@@ -3,8 +3,10 @@ import json
 import sys
 from typing import Dict, List, Optional, Set, Tuple
 from dotenv import load_dotenv
-from supabase import create_client
 from openai import OpenAI
+from catalog_cache import get_catalog_cache, cached_subjects, group_rows
+from supabase_client import get_supabase
+from requisites import compile_requisites
 
 # Load environment variables
 load_dotenv()
@@ -12,28 +14,10 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_ANON_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
-def to_dnf(node: Dict) -> List[List[Dict]]:
-    """Convert prerequisite logic to disjunctive normal form"""
-    if 'and' in node:
-        prods = to_dnf(node['and'][0])
-        for child in node['and'][1:]:
-            prods = [a + b for a in prods for b in to_dnf(child)]
-        return prods
-    if 'or' in node:
-        res: List[List[Dict]] = []
-        for child in node['or']:
-            res.extend(to_dnf(child))
-        return res
-    return [[node]]
-
 def get_dept_code_mapping(supabase) -> Dict[str, str]:
     """Get mapping of department names to their codes from subjects table"""
-    subjects_query = supabase.table('subjects') \
-        .select('name,code') \
-        .execute()
-    
     dept_mapping = {}
-    for subject in subjects_query.data:
+    for subject in cached_subjects(supabase):
         # The name format is typically "Department Name (CODE)"
         # Extract just the department name part
         name = subject['name']
@@ -47,7 +31,7 @@ def get_prerequisites(course_data: Dict, dept_mapping: Dict[str, str]) -> List[s
     """Extract prerequisites from course data and convert to proper course codes"""
     prereqs = []
     raw = course_data.get("course_requisites") or {}
-    clauses = to_dnf(raw)
+    clauses = compile_requisites(raw, course_data.get("id"), get_catalog_cache().version)
     
     # Get the clause with minimum prerequisites
     min_prereqs = []
@@ -78,53 +62,55 @@ def get_prerequisites(course_data: Dict, dept_mapping: Dict[str, str]) -> List[s
 
 def get_tech_breadth_courses(tech_breadth_area: str, supabase) -> List[Tuple[str, List[str], str]]:
     """Get all courses, their prerequisites, and descriptions for a given technical breadth area"""
+    catalog = get_catalog_cache()
+
     # Get department name to code mapping first
     dept_mapping = get_dept_code_mapping(supabase)
     
     # Get course_ids from tech_breadth_courses
-    tech_breadth_query = supabase.table('tech_breadth_courses') \
-        .select('course_id') \
-        .eq('tba_title', tech_breadth_area) \
-        .execute()
+    tech_breadth_rows = catalog.fetch('tech_breadth_courses', [tech_breadth_area], lambda areas: {
+        tech_breadth_area: supabase.table('tech_breadth_courses') \
+            .select('course_id') \
+            .eq('tba_title', tech_breadth_area) \
+            .execute().data
+    })[tech_breadth_area]
     
-    if not tech_breadth_query.data:
+    if not tech_breadth_rows:
         return []
     
-    course_ids = [item['course_id'] for item in tech_breadth_query.data]
+    course_ids = [item['course_id'] for item in tech_breadth_rows]
     
     # Get course details including prerequisites
-    courses_query = supabase.table('courses') \
-        .select('id,subject_id,catalog_number,course_requisites') \
-        .in_('id', course_ids) \
-        .execute()
+    course_rows = [c for rows in catalog.fetch('courses_by_id', course_ids, lambda ids: group_rows(
+        supabase.table('courses') \
+            .select('id,subject_id,catalog_number,course_requisites') \
+            .in_('id', ids) \
+            .execute().data, 'id'
+    )).values() for c in rows]
     
-    if not courses_query.data:
+    if not course_rows:
         return []
     
     # Get descriptions for all courses
-    descriptions_query = supabase.table('course_descriptions') \
-        .select('course_id,description') \
-        .in_('course_id', course_ids) \
-        .execute()
+    descriptions = catalog.fetch('course_descriptions', course_ids, lambda ids: group_rows(
+        supabase.table('course_descriptions') \
+            .select('course_id,description') \
+            .in_('course_id', ids) \
+            .execute().data, 'course_id'
+    ))
     
     # Create mapping of course_id to description
     course_descriptions = {
         desc['course_id']: desc['description']
-        for desc in descriptions_query.data
+        for rows in descriptions.values() for desc in rows
     }
     
     # Get subject codes
-    subject_ids = list({course['subject_id'] for course in courses_query.data})
-    subjects_query = supabase.table('subjects') \
-        .select('id,code') \
-        .in_('id', subject_ids) \
-        .execute()
-    
-    subject_id_to_code = {subject['id']: subject['code'] for subject in subjects_query.data}
+    subject_id_to_code = {subject['id']: subject['code'] for subject in cached_subjects(supabase, catalog)}
     
     # Format results with prerequisites and descriptions
     courses_with_prereqs = []
-    for course in courses_query.data:
+    for course in course_rows:
         if course['subject_id'] in subject_id_to_code:
             dept_code = subject_id_to_code[course['subject_id']]
             course_id = f"{dept_code}|{course['catalog_number']}"
@@ -253,12 +239,10 @@ YOU MUST FOLLOW THE EXACT JSON FORMAT. e.g.
     
     return json.loads(response.choices[0].message.content)
 
-def main():
+def run(input_data: Dict) -> object:
+    """Recommend tech breadth courses for one request; shared by the CLI and python_worker."""
     # Initialize Supabase client
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    
-    # Read input from stdin
-    input_data = json.loads(sys.stdin.read())
+    supabase = get_supabase(SUPABASE_URL, SUPABASE_KEY)
     
     try:
         # Get initial course recommendations based on prerequisites
@@ -273,13 +257,17 @@ def main():
         gpt_results = get_beginner_friendly_courses(results, input_data["tech_breadth_area"])
         
         # Extract just the course IDs into a list
-        recommended_courses = [course["course"] for course in gpt_results["recommended_courses"]]
-        
-        # Output just the list of courses
-        print(json.dumps(recommended_courses))
+        return [course["course"] for course in gpt_results["recommended_courses"]]
         
     except ValueError as e:
-        print(json.dumps({"error": str(e)}))
+        return {"error": str(e)}
+
+def main():
+    # Read input from stdin
+    input_data = json.loads(sys.stdin.read())
+    
+    # Output just the list of courses
+    print(json.dumps(run(input_data)))
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,164 @@
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from occupancy import bits_conflict, selection_bits
+
+# A course's chosen sections for one term: {'lecture': sec|None, 'discussion': sec|None}
+Selection = Dict[str, Optional[Dict]]
+
+# How many search nodes run between deadline checks
+CLOCK_EVERY = 64
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def new_search_stats(detail: bool = False) -> Dict[str, int]:
+    """Counters best_assignment accumulates across the searches of one plan.
+
+    `space` is the number of nodes an exhaustive search without the bound or
+    conflict checks would visit, so nodes / space is the share explored.
+    With `detail` the searches also count branches pruned by the bound and
+    conflict checks made (conflict_graph's pairs included); without it they
+    skip that bookkeeping entirely.
+    """
+    stats = {'searches': 0, 'nodes': 0, 'space': 0, 'cut_short': 0}
+    if detail:
+        stats.update(pruned=0, conflict_checks=0)
+    return stats
+
+
+def conflict_graph(sel: Dict[str, Selection], allow_primary: bool, allow_secondary: bool,
+                   stats: Optional[Dict[str, int]] = None
+                   ) -> Tuple[Dict[str, Set[str]], Set[str]]:
+    """Pairwise course conflicts for the given section choices.
+
+    Mirrors the planner's prefix check (see occupancy.bits_conflict), one AND
+    per pair of weekly occupancy bitsets. The lecture/discussion test also
+    covers a course's own pair, so such courses come back in `blocked`.
+    """
+    courses = list(sel)
+    graph: Dict[str, Set[str]] = {c: set() for c in courses}
+    blocked: Set[str] = set()
+    if allow_primary and allow_secondary:
+        return graph, blocked
+    bits = {c: selection_bits(sel[c]) for c in courses}
+    for c in courses:
+        lec, disc = bits[c]
+        if not allow_secondary and lec & disc:
+            blocked.add(c)
+    for i, c1 in enumerate(courses):
+        for c2 in courses[i + 1:]:
+            if bits_conflict(bits[c1], bits[c2], allow_primary, allow_secondary):
+                graph[c1].add(c2)
+                graph[c2].add(c1)
+    if stats is not None and 'conflict_checks' in stats:
+        stats['conflict_checks'] += len(courses) * (len(courses) - 1) // 2
+    return graph, blocked
+
+
+def search_space(option_counts: List[int], max_size: int) -> int:
+    """Partial picks of at most `max_size` courses, one option each: the
+    nodes best_assignment visits with no pruning and no conflicts."""
+    # picks[k]: ways to choose k courses and an option for each
+    picks = [1] + [0] * max_size
+    for m in option_counts:
+        for k in range(max_size, 0, -1):
+            picks[k] += picks[k - 1] * m
+    return sum(picks)
+
+
+def best_assignment(candidates: List[str], options: Dict[str, List[Tuple[float, Selection]]],
+                    min_size: int, max_size: int,
+                    allow_primary: bool = False, allow_secondary: bool = False,
+                    deadline: Optional[float] = None,
+                    stats: Optional[Dict[str, int]] = None
+                    ) -> Optional[Dict[str, Selection]]:
+    """Best conflict-free set of `min_size`..`max_size` courses, one ranked option each.
+
+    Branch and bound over `options[course]` (score, selection) lists, best
+    first: a branch is cut once its score plus the prefix sum of the best
+    scores it could still add cannot beat the incumbent. Past `deadline` (a
+    perf_counter value, checked every CLOCK_EVERY nodes) it returns the best
+    pick so far, possibly None, and counts the search as cut short in `stats`.
+    """
+    detail = stats is not None and 'conflict_checks' in stats
+    checks = pruned = 0
+    conflict = bits_conflict
+    if detail:
+        def conflict(a, b, allow_p, allow_s):
+            nonlocal checks
+            checks += 1
+            return bits_conflict(a, b, allow_p, allow_s)
+
+    prepared = {}
+    for c in candidates:
+        opts = []
+        for score, sel in options.get(c, ()):
+            lec, disc = selection_bits(sel)
+            if not allow_secondary and lec & disc:
+                continue  # the course clashes with itself
+            opts.append((score, (lec, disc), sel))
+        if opts:
+            prepared[c] = opts
+    order = sorted(prepared, key=lambda c: -prepared[c][0][0])
+    n = len(order)
+    if stats is not None:
+        stats['searches'] += 1
+    if n < min_size or max_size < min_size:
+        return None
+    if stats is not None:
+        stats['space'] += search_space([len(opts) for opts in prepared.values()], max_size)
+    opts_at = [prepared[c] for c in order]
+    prefix = [0]
+    for opts in opts_at:
+        prefix.append(prefix[-1] + opts[0][0])
+
+    best_score = float('-inf')
+    best_pick: Optional[Dict[str, Selection]] = None
+    pick: Dict[str, Selection] = {}
+    nodes = 0
+
+    def dfs(start: int, occupied, size: int, cur: float) -> None:
+        nonlocal best_score, best_pick, nodes, pruned
+        nodes += 1
+        if deadline is not None and nodes % CLOCK_EVERY == 0 and time.perf_counter() > deadline:
+            raise _OutOfTime
+        if size >= min_size and cur > best_score:
+            best_score, best_pick = cur, dict(pick)
+        room = max_size - size
+        if room == 0:
+            return
+        for j in range(start, n):
+            if (cur + prefix[min(n, j + room)] - prefix[j] <= best_score
+                    or size + (n - j) < min_size):
+                if detail:
+                    pruned += 1
+                return
+            # Best the rest of the pick could add after taking course j
+            rest = prefix[min(n, j + room)] - prefix[j + 1]
+            for score, bits, sel in opts_at[j]:
+                if cur + score + rest <= best_score:
+                    if detail:
+                        pruned += 1
+                    break
+                if conflict(bits, occupied, allow_primary, allow_secondary):
+                    continue
+                pick[order[j]] = sel
+                dfs(j + 1, (occupied[0] | bits[0], occupied[1] | bits[1]), size + 1, cur + score)
+                del pick[order[j]]
+
+    try:
+        dfs(0, (0, 0), 0, 0)
+    except _OutOfTime:
+        if stats is not None:
+            stats['cut_short'] += 1
+    if stats is not None:
+        stats['nodes'] += nodes
+    if detail:
+        stats['pruned'] += pruned
+        stats['conflict_checks'] += checks
+    if best_pick is None:
+        return None
+    return {c: best_pick[c] for c in candidates if c in best_pick}
@@ -0,0 +1,83 @@
+import random
+import time
+
+from async_fetch import FetchTimings, concurrently, sections_pipeline
+from catalog_cache import CatalogCache
+
+
+def catalog(seed=2):
+    rnd = random.Random(seed)
+    sections, meetings, teaching = [], [], []
+    for cid in range(1, 41):
+        for tid in (10, 11, 12):
+            for _ in range(rnd.randint(0, 3)):
+                sid = len(sections) + 1
+                sections.append({'id': sid, 'course_id': cid, 'term_id': tid})
+                meetings += [{'section_id': sid, 'room': str(rnd.randrange(100, 999))}
+                             for _ in range(rnd.randint(0, 2))]
+                teaching += [{'section_id': sid, 'instructor_id': i}
+                             for i in rnd.sample(range(1, 30), rnd.randint(0, 2))]
+    instructors = [{'id': i, 'name': f"Prof {i}"} for i in range(1, 30)]
+    return sections, meetings, teaching, instructors
+
+
+def make_loaders(delay=0.0, calls=None):
+    sections, meetings, teaching, instructors = catalog()
+
+    def loader(table, rows, key):
+        def load(keys):
+            if calls is not None:
+                calls.append((table, list(keys)))
+            time.sleep(delay)
+            found = {}
+            for r in rows:
+                found.setdefault(key(r), []).append(r)
+            return {k: found[k] for k in keys if k in found}
+        return load
+
+    loaders = {
+        "term_sections": loader("term_sections", sections, lambda s: (s['course_id'], s['term_id'])),
+        "meeting_times": loader("meeting_times", meetings, lambda m: m['section_id']),
+        "section_instructors": loader("section_instructors", teaching, lambda r: r['section_id']),
+        "instructors": loader("instructors", instructors, lambda r: r['id']),
+    }
+    return loaders
+
+
+def sequential(loaders, pairs):
+    cache = CatalogCache(":memory:")
+    read = lambda t, keys: [r for rows in cache.fetch(t, keys, loaders[t]).values() for r in rows]
+    secs = read("term_sections", pairs)
+    mt = read("meeting_times", [s['id'] for s in secs])
+    si = read("section_instructors", [s['id'] for s in secs])
+    return secs, mt, si, read("instructors", sorted({r['instructor_id'] for r in si}))
+
+
+def test_pipeline_matches_sequential_reads():
+    pairs = [(c, t) for c in range(40, 0, -1) for t in (10, 11, 12)]
+    calls = []
+    loaders = make_loaders(calls=calls)
+    timings = FetchTimings()
+    secs, mt, si, instr = timings.run(sections_pipeline(CatalogCache(":memory:"), pairs, loaders,
+                                                        timings, chunk=7))
+    want = sequential(make_loaders(), pairs)
+    # Same rows in the same order; instructors only need to be the same set
+    assert (secs, mt, si) == want[:3]
+    assert sorted(r['id'] for r in instr) == sorted(r['id'] for r in want[3])
+    asked = [i for table, ids in calls if table == "instructors" for i in ids]
+    assert len(asked) == len(set(asked))
+    assert timings.report()['phases']['term_sections']['calls'] == 6
+
+
+def test_concurrency_saves_wall_time():
+    pairs = [(c, t) for c in range(1, 41) for t in (10, 11, 12)]
+    timings = FetchTimings()
+    timings.run(sections_pipeline(CatalogCache(":memory:"), pairs, make_loaders(delay=0.02),
+                                  timings, chunk=5))
+    report = timings.report()
+    assert report['serial_ms'] > 2 * report['wall_ms'] and report['saved_ms'] > 0
+
+    both = FetchTimings()
+    got = both.run(concurrently(both, a=lambda: time.sleep(0.05) or 1, b=lambda: time.sleep(0.05) or 2))
+    assert got == {'a': 1, 'b': 2}
+    assert both.report()['wall_ms'] < both.report()['serial_ms']
@@ -0,0 +1,93 @@
+import random
+import threading
+
+from bulk_fetch import chunked, select_in
+
+
+class Table:
+    """Just enough of a PostgREST table: in_(), order(), range() and a row cap."""
+
+    def __init__(self, rows, cap):
+        self.rows, self.cap = rows, cap
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def table(self, name):
+        return Query(self)
+
+
+class Query:
+    def __init__(self, db):
+        self.db, self.filters, self.orders, self.window = db, [], [], (0, db.cap - 1)
+
+    def select(self, columns):
+        self.columns = columns.split(",")
+        return self
+
+    def in_(self, col, values):
+        self.filters.append((col, set(values)))
+        return self
+
+    def order(self, col):
+        self.orders.append(col)
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end)
+        return self
+
+    def execute(self):
+        with self.db.lock:
+            self.db.requests.append(self.filters[0][1])
+        rows = [r for r in self.db.rows if all(r[c] in vals for c, vals in self.filters)]
+        rows.sort(key=lambda r: [r[c] for c in self.orders])
+        start, end = self.window
+        rows = rows[start:min(end + 1, start + self.db.cap)]
+        return type("Response", (), {"data": [{c: r[c] for c in self.columns} for r in rows]})
+
+
+def meetings(n, seed=1):
+    rnd = random.Random(seed)
+    rows = []
+    for sid in range(1, n + 1):
+        for _ in range(rnd.randint(0, 4)):
+            rows.append({'id': len(rows) + 1, 'section_id': sid, 'term_id': rnd.choice([10, 11]),
+                         'room': str(rnd.randrange(100, 999))})
+    rnd.shuffle(rows)
+    return rows
+
+
+def test_chunked():
+    assert chunked([1, 2, 3, 4, 5], 2) == [[1, 2], [3, 4], [5]]
+    assert chunked([], 3) == []
+
+
+def test_pages_past_the_row_cap_and_merges_chunks():
+    rows = meetings(300)
+    db = Table(rows, cap=25)
+    ids = list(range(1, 301, 2)) * 2  # duplicates are asked for once
+    got = select_in(db, "meeting_times", "section_id,room", "section_id", ids,
+                    chunk_size=40, page_size=25, workers=4)
+    want = sorted((r['section_id'], r['room']) for r in rows if r['section_id'] % 2)
+    assert sorted((r['section_id'], r['room']) for r in got) == want
+    # The order column was only selected for paging
+    assert all(set(r) == {'section_id', 'room'} for r in got)
+    assert max(len(ids) for ids in db.requests) <= 40
+    assert len(db.requests) > 4
+
+
+def test_where_filters_every_chunk():
+    rows = meetings(200)
+    db = Table(rows, cap=1000)
+    got = select_in(db, "meeting_times", "id,section_id,term_id", "section_id", range(1, 201),
+                    where={"term_id": [11]}, chunk_size=30)
+    assert sorted(r['id'] for r in got) == sorted(r['id'] for r in rows if r['term_id'] == 11)
+
+
+def test_sequential_and_empty():
+    rows = meetings(50)
+    got = select_in(Table(rows, cap=7), "meeting_times", "id", "section_id", range(1, 51),
+                    chunk_size=9, page_size=7, workers=1)
+    assert sorted(r['id'] for r in got) == sorted(r['id'] for r in rows)
+    db = Table(rows, cap=7)
+    assert select_in(db, "meeting_times", "id", "section_id", []) == [] and not db.requests
@@ -0,0 +1,136 @@
+import multiprocessing
+import os
+import sqlite3
+import tempfile
+import time
+
+from catalog_cache import CatalogCache
+
+
+def age_entries(path: str, seconds: float) -> None:
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE snapshot SET used_at = used_at - ?", (seconds,))
+
+
+def backdate_fetch(path: str, seconds: float) -> None:
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE snapshot SET fetched_at = fetched_at - ?", (seconds,))
+
+
+def used_at(path: str, key: str) -> float:
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT used_at FROM snapshot WHERE key = ?", (key,)).fetchone()[0]
+
+
+def test_entries_expire_after_ttl():
+    path = os.path.join(tempfile.mkdtemp(), "catalog.sqlite3")
+    loads = []
+    load = lambda keys: loads.extend(keys) or {k: [{'id': k}] for k in keys}
+    CatalogCache(path, version="ttl", ttl=60).fetch("courses", ["A", "B"], load)
+    assert CatalogCache(path, version="ttl", ttl=60).fetch("courses", ["A"], load) == {"A": [{'id': "A"}]}
+    assert loads == ["A", "B"]
+    backdate_fetch(path, 120)
+    fresh = CatalogCache(path, version="ttl", ttl=60)
+    assert fresh.get_many("courses", ["A", "B"]) == {}
+    fresh.fetch("courses", ["A"], load)
+    assert loads == ["A", "B", "A"] and fresh.misses == 1
+
+
+def test_version_bump_misses_and_drops_old_rows():
+    path = os.path.join(tempfile.mkdtemp(), "catalog.sqlite3")
+    CatalogCache(path, version="1").put_many("courses", {"A": [{'v': 1}], "B": []})
+    bumped = CatalogCache(path, version="2")
+    assert bumped.get_many("courses", ["A", "B"]) == {}
+    assert bumped.fetch("courses", ["A"], lambda keys: {"A": [{'v': 2}]}) == {"A": [{'v': 2}]}
+    assert CatalogCache(path, version="1").get_many("courses", ["A"]) == {"A": [{'v': 1}]}
+    # Invalidating any table also clears what older versions left behind
+    assert bumped.invalidate("terms") == 2
+    assert bumped.info() == {"2": {"courses": 1}}
+
+
+def test_least_recently_used_entries_are_evicted():
+    path = os.path.join(tempfile.mkdtemp(), "catalog.sqlite3")
+    cache = CatalogCache(path, version="lru", max_rows=10)
+    for k in range(10):
+        cache.put_many("courses", {k: [{'id': k}]})
+    age_entries(path, 3600)
+    # Read 0-2 through a second handle so they are touched in SQLite
+    assert set(CatalogCache(path, version="lru", max_rows=10).get_many("courses", range(3))) == {"0", "1", "2"}
+    cache.put_many("courses", {10: [{'id': 10}]})
+    kept = set(CatalogCache(path, version="lru").get_many("courses", range(11)))
+    assert kept == {"0", "1", "2", "5", "6", "7", "8", "9", "10"}
+
+
+def test_recently_used_entries_are_not_rewritten():
+    path = os.path.join(tempfile.mkdtemp(), "catalog.sqlite3")
+    CatalogCache(path, version="touch", ttl=600).put_many("courses", {"A": [1]})
+    written = used_at(path, "A")
+    assert CatalogCache(path, version="touch", ttl=600).get_many("courses", ["A"]) == {"A": [1]}
+    assert used_at(path, "A") == written
+    age_entries(path, 120)
+    CatalogCache(path, version="touch", ttl=600).get_many("courses", ["A"])
+    assert used_at(path, "A") > written
+
+
+def test_memory_layer_keeps_the_most_recently_used():
+    cache = CatalogCache(":memory:", version="memory", max_rows=10)
+    cache.put_many("courses", {k: [k] for k in range(10)})
+    assert set(cache.get_many("courses", range(3))) == {"0", "1", "2"}
+    cache.put_many("courses", {k: [k] for k in range(10, 17)})
+    assert [k for _, k in cache._memory] == ["0", "1", "2", *map(str, range(10, 17))]
+
+
+def test_memory_hits_refresh_use_on_disk():
+    path = os.path.join(tempfile.mkdtemp(), "catalog.sqlite3")
+    cache = CatalogCache(path, version="hot", ttl=1)
+    cache.put_many("courses", {"A": [1]})
+    written = used_at(path, "A")
+    assert cache.get_many("courses", ["A"]) == {"A": [1]}
+    assert used_at(path, "A") == written
+    time.sleep(0.2)
+    # Served from memory, but now older than ttl/10 on disk
+    assert cache.get_many("courses", ["A"]) == {"A": [1]}
+    assert used_at(path, "A") > written
+
+
+def write_keys(path: str, worker: int) -> None:
+    cache = CatalogCache(path, version="shared", max_rows=150)
+    for batch in range(20):
+        cache.put_many("courses", {f"{worker}-{batch}-{i}": [{'w': worker}] for i in range(10)})
+        cache.get_many("courses", [f"{worker}-{batch}-0"])
+
+
+def test_processes_share_one_bounded_file():
+    path = os.path.join(tempfile.mkdtemp(), "catalog.sqlite3")
+    CatalogCache(path, version="shared")
+    procs = [multiprocessing.Process(target=write_keys, args=(path, w)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+    # Other writers' rows count once a writer next counts the file
+    CatalogCache(path, version="shared", max_rows=150).put_many("courses", {"last": []})
+    rows = CatalogCache(path, version="shared").info()["shared"]["courses"]
+    assert 0 < rows <= 150
+
+
+def open_together(path: str, barrier) -> None:
+    barrier.wait()
+    CatalogCache(path, version="old").put_many("courses", {str(os.getpid()): []})
+
+
+def test_old_files_migrate_under_concurrent_opens():
+    path = os.path.join(tempfile.mkdtemp(), "catalog.sqlite3")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE snapshot (version TEXT NOT NULL, table_name TEXT NOT NULL, "
+                     "key TEXT NOT NULL, rows TEXT NOT NULL, fetched_at REAL NOT NULL, "
+                     "PRIMARY KEY (version, table_name, key))")
+    barrier = multiprocessing.Barrier(4)
+    procs = [multiprocessing.Process(target=open_together, args=(path, barrier)) for _ in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+    assert CatalogCache(path, version="old").info()["old"]["courses"] == 4
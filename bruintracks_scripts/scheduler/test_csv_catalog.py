@@ -0,0 +1,83 @@
+import csv
+import os
+import tempfile
+
+from csv_catalog import CSVCatalog
+from planning_bundle import load_bundle, unbundle
+
+HEADER = ["index", "course_id", "full_course_id", "days_of_wk_cd", "meet_strt_tm", "meet_stop_tm",
+          "meet_bldg_cd", "meet_room_cd", "instructors", "requisites_logic"]
+PHYS_REQ = "{'prerequisites': {'type': 'AND', 'conditions': ['Mathematics 31A']}, 'corequisites': None}"
+CS_REQ = ("{'prerequisites': {'type': 'AND', 'conditions': [{'type': 'OR', 'conditions': "
+          "['Physics 1A', 'Mathematics 31A']}, 'Writing Requirement']}, "
+          "'corequisites': {'type': 'AND', 'conditions': ['Computer Science 31']}}")
+FALL = [
+    [0, "MATH 31A", "Mathematics 31A", "MWF", "10:00 am", "10:50 am", "MS", "4000A", "Roe, A.", ""],
+    [4, "MATH 31A", "Mathematics 31A", "TR", "02:00 pm", "03:15 pm", "MS", "4000A", "Roe, A.; TA", ""],
+    [9, "PHYSICS 1A", "Physics and Astronomy 1A", "MW", "12:00 pm", "12:50 pm", "PAB", "1425", "Kim, B.", PHYS_REQ],
+    [10, "PHYSICS 1A", "Physics and Astronomy 1A", "F", "12:00 pm", "01:50 pm", "PAB", "1434", "Kim, B.", PHYS_REQ],
+    [11, "COM SCI 31", "Computer Science 31", "VAR", "", "", "", "", "", ""],
+]
+WINTER = [
+    [0, "COM SCI 32", "Computer Science 32", "TR", "08:00 am", "09:50 am", "BOELTER", "3400", "Lee, C.", CS_REQ],
+    [3, "ASTR 3", "Physics and Astronomy 3", "MW", "09:00 am", "09:50 am", "PAB", "1425", "Kim, B.", ""],
+]
+
+
+def catalog() -> CSVCatalog:
+    tmp = tempfile.mkdtemp()
+    for name, rows in (("fall.csv", FALL), ("winter.csv", WINTER)):
+        with open(os.path.join(tmp, name), "w", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(HEADER)
+            w.writerows(rows)
+    with open(os.path.join(tmp, "course_name_mapping.csv"), "w", newline="") as f:
+        csv.writer(f).writerows([["course_id", "full_course_id"], ["MATH 32A", "Mathematics 32A"]])
+    return CSVCatalog.load(tmp, [("24F", "Fall 2024", "fall.csv"), ("25W", "Winter 2025", "winter.csv")])
+
+
+def test_scrape_rows_become_catalog_tables():
+    cat = catalog()
+    subjects = {s['code']: s for s in cat.table("subjects").select("*").execute().data}
+    # PHYSICS is named the way requisites spell it, ASTR keeps its department
+    assert subjects['PHYSICS']['name'] == "Physics (PHYSICS)"
+    assert subjects['ASTR']['name'] == "Physics and Astronomy (ASTR)"
+    secs = cat.table("sections").select("id,course_id,term_id,section_code").order("id").execute().data
+    # Rows 9 and 10 are one section meeting twice; rows 0 and 4 are two sections
+    assert len(secs) == 6 and [s['section_code'] for s in secs[:2]] == ["001", "002"]
+    meets = cat.table("meeting_times").select("section_id,start_time").eq("section_id", secs[2]['id']).execute().data
+    assert [m['start_time'] for m in meets] == ["12:00:00", "12:00:00"]
+    assert cat.table("meeting_times").select("id").eq("section_id", secs[3]['id']).execute().data == []
+    offered = cat.table("course_offerings").select("season,last_year").execute().data
+    assert {(o['season'], o['last_year']) for o in offered} == {("Fall", 2024), ("Winter", 2025)}
+
+
+def test_requisites_name_resolvable_subjects():
+    cat = catalog()
+    cs32 = cat.table("courses").select("course_requisites").eq("catalog_number", "32").execute().data
+    pre, co = cs32[0]['course_requisites']['and']
+    either, writing = pre['and']
+    assert [leaf['course'] for leaf in either['or']] == ["Physics 1A", "Mathematics 31A"]
+    assert writing['course'] == "Writing Requirement" and writing['min_grade'] == "D-"
+    assert co == {'and': [{'course': "Computer Science 31", 'min_grade': 'D-',
+                           'severity': 'R', 'relation': 'corequisite'}]}
+
+
+def test_queries_filter_order_and_page():
+    cat = catalog()
+    math = cat.table("subjects").select("id").ilike("name", "math%").execute().data[0]['id']
+    rows = (cat.table("courses").select("catalog_number").in_("subject_id", [math, 999])
+            .in_("catalog_number", ["32A", "31A", "1A"]).order("catalog_number", desc=True).execute().data)
+    assert [r['catalog_number'] for r in rows] == ["32A", "31A"]
+    assert cat.table("courses").select("id").eq("subject_id", str(math)).limit(1).execute().data == [{'id': 1}]
+    page = cat.table("section_instructors").select("section_id").order("section_id").range(1, 2).execute().data
+    assert [r['section_id'] for r in page] == [2, 2]
+
+
+def test_bundle_matches_table_reads():
+    cat = catalog()
+    pairs = [(c, t) for c in range(1, 7) for t in (1, 2)]
+    secs, meetings, si_map = unbundle(load_bundle(cat, pairs))
+    assert sorted(s['id'] for s in secs) == [r['id'] for r in cat.table("sections").select("id").order("id").execute().data]
+    assert len(meetings) == len(cat.table("meeting_times").select("id").execute().data)
+    assert si_map[2] == ["Roe, A.", "TA"] and si_map[4] == []
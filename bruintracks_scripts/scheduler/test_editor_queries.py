@@ -0,0 +1,89 @@
+import contextlib
+import io
+import os
+import tempfile
+
+import requisites
+from catalog_cache import CatalogCache, set_catalog_cache
+from schedule_editor import PREREQ_TABLE, ScheduleEditor
+from test_csv_catalog import catalog
+
+
+def editor(client) -> ScheduleEditor:
+    schedule = {
+        "Fall 2024": {"MATH|31A": {}, "COM SCI|31": {}},
+        "Winter 2025": {"PHYSICS|1A": {}, "ASTR|3": {}},
+        "Spring 2025": {"COM SCI|32": {}, "FILLER": {}},
+    }
+    with contextlib.redirect_stderr(io.StringIO()):
+        return ScheduleEditor(schedule, {}, {}, supabase=client)
+
+
+@contextlib.contextmanager
+def catalog_cache(cache: CatalogCache):
+    """Make `cache` the process-wide one for the block, then put the old one back."""
+    previous = set_catalog_cache(cache)
+    try:
+        yield cache
+    finally:
+        set_catalog_cache(previous)
+
+
+def test_one_subjects_read_and_one_courses_read_per_pass():
+    client = catalog()
+    with catalog_cache(CatalogCache(":memory:", version="editor-queries")), \
+            contextlib.redirect_stderr(io.StringIO()):
+        ed = editor(client)
+        assert ed._validate_prerequisites_after_term("Fall 2024") == (True, None)
+        assert ed.round_trips == {'subjects': 1, 'courses': 1}
+        # Leaves were resolved from the subject map, not one query each
+        assert ed._prereq_cache['PHYSICS|1A'] == [[('MATH|31A', 'prerequisite', 'D-', 'R')]]
+        assert ed.move_course("PHYSICS|1A", "Winter 2025", "Fall 2024")[0] is False
+        assert ed.move_course("COM SCI|31", "Fall 2024", "Winter 2025")[0] is True
+        assert ed.round_trips == {'subjects': 1, 'courses': 1}
+
+        # A second edit in the same process reads nothing again
+        again = editor(client)
+        assert again.move_course("ASTR|3", "Winter 2025", "Spring 2025")[0] is True
+        assert again.round_trips == {}
+
+
+def test_department_names_fall_back_to_prefix():
+    ed = editor(catalog())
+    with catalog_cache(CatalogCache(":memory:", version="editor-prefix")):
+        assert ed._subject_code("Computer Science") == "COM SCI"
+        assert ed._subject_code("mathem") == "MATH"
+        assert ed._subject_code("Writing") is None
+    assert ed.round_trips == {'subjects': 1}
+
+
+def test_resolved_prerequisites_outlive_the_editor():
+    path = os.path.join(tempfile.mkdtemp(), "catalog.sqlite3")
+    client = catalog()
+    with contextlib.redirect_stderr(io.StringIO()):
+        with catalog_cache(CatalogCache(path, version="editor-store")):
+            first = editor(client)
+            assert first.move_course("ASTR|3", "Winter 2025", "Spring 2025")[0] is True
+        # A later edit opens the same file afresh, as a new process would
+        with catalog_cache(CatalogCache(path, version="editor-store")):
+            later = editor(client)
+            assert later.move_course("PHYSICS|1A", "Winter 2025", "Fall 2024")[0] is False
+    assert later.round_trips == {} and later._course_cache == {}
+    assert later._prereq_cache == first._prereq_cache
+    assert CatalogCache(path, version="editor-store").info()["editor-store"][PREREQ_TABLE] == 5
+
+
+def test_truncated_requisites_are_let_through_and_reported():
+    # COM SCI|32 needs Physics 1A or Mathematics 31A; a cap of 1 keeps only Physics 1A
+    cap, requisites.MAX_CLAUSES = requisites.MAX_CLAUSES, 1
+    requisites.clear_compiled()
+    try:
+        with catalog_cache(CatalogCache(":memory:", version="editor-truncated")), \
+                contextlib.redirect_stderr(io.StringIO()):
+            ed = editor(catalog())
+            assert ed.move_course("PHYSICS|1A", "Winter 2025", "Spring 2025")[0] is True
+    finally:
+        requisites.MAX_CLAUSES = cap
+        requisites.clear_compiled()
+    assert ed.unchecked_requisites == {"COM SCI|32"}
+    assert ed._prereq_cache["COM SCI|32"][-1] == []
@@ -0,0 +1,56 @@
+import random
+from datetime import time
+
+from occupancy import (SLOT_MINUTES, bits_conflict, meeting_bits, minutes,
+                       overlapping_pairs, section_bits)
+
+
+def mt(days, start, end):
+    return {'days_of_week': days, 'start_time': start, 'end_time': end}
+
+
+def test_touching_meetings_do_not_overlap():
+    a = section_bits([mt("MW", time(10, 0), time(10, 50))])
+    b = section_bits([mt("W", time(10, 50), time(11, 40))])
+    c = section_bits([mt("TR", time(10, 0), time(10, 50))])
+    d = section_bits([mt("MF", time(10, 45), time(11, 0))])
+    assert not a & b and not a & c
+    assert a & d
+
+
+def test_editor_format_and_unknown_days():
+    fmt = section_bits([{'days': "TR", 'start': "09:30", 'end': "10:45"}], 'days', 'start', 'end')
+    assert fmt == section_bits([mt("TR", time(9, 30), time(10, 45))])
+    assert minutes("13:05:00") == minutes(time(13, 5)) == 785
+    assert meeting_bits("X", 600, 660) & meeting_bits("X", 630, 700)
+    assert not meeting_bits("X", 600, 660) & meeting_bits("M", 600, 660)
+
+
+def test_conflict_rules():
+    lec, disc = meeting_bits("M", 600, 650), meeting_bits("M", 620, 670)
+    assert bits_conflict((lec, 0), (lec, 0))
+    assert not bits_conflict((lec, 0), (lec, 0), allow_primary=True)
+    assert bits_conflict((lec, 0), (0, disc), allow_primary=True)
+    assert not bits_conflict((lec, 0), (0, disc), allow_secondary=True)
+
+
+def test_sweep_finds_every_overlapping_pair():
+    rnd = random.Random(3)
+    for _ in range(200):
+        meetings = []
+        for key in range(rnd.randint(0, 12)):
+            for _ in range(rnd.randint(1, 2)):
+                start = rnd.randrange(8 * 60, 12 * 60, SLOT_MINUTES)
+                meetings.append((key, rnd.choice(["MW", "TR", "F", "MWF", "X"]), start,
+                                 start + rnd.choice([0, 50, 75, 110])))
+        bits = {}
+        for key, days, start, end in meetings:
+            bits[key] = bits.get(key, 0) | meeting_bits(days, start, end)
+        keys = list(bits)
+        expected = [(a, b) for i, a in enumerate(keys) for b in keys[i + 1:] if bits[a] & bits[b]]
+        assert overlapping_pairs(meetings) == expected
+
+
+def test_sweep_ignores_touching_and_self():
+    meetings = [("A", "MW", 600, 650), ("B", "W", 650, 700), ("A", "M", 620, 640), ("C", "M", 645, 655)]
+    assert overlapping_pairs(meetings) == [("A", "C")]
@@ -0,0 +1,59 @@
+import random
+import tracemalloc
+
+from plan_profile import NULL_PROFILE, PlanProfile
+from term_search import best_assignment, conflict_graph, new_search_stats
+
+
+class Reply:
+    def __init__(self, data):
+        self.data = data
+
+
+def test_null_profile_adds_nothing():
+    execute = lambda req: Reply([req])
+    assert NULL_PROFILE.execute("sections", execute) is execute
+    NULL_PROFILE.mark("catalog")
+    assert NULL_PROFILE.stats() is None
+    assert set(new_search_stats()) == {'searches', 'nodes', 'space', 'cut_short'}
+
+
+def test_counts_round_trips_rows_and_phases():
+    was_tracing = tracemalloc.is_tracing()
+    prof = PlanProfile()
+    run = prof.execute("sections", lambda n: Reply(list(range(n))))
+    run(3)
+    run(4)
+    prof.execute("planning_bundle", lambda _: Reply({
+        'sections': {'id': [1, 2]}, 'meetings': {'section_id': [1]}, 'instructors': {'section_id': []}}))(None)
+    prof.mark("sections_fetch")
+    prof.mark("sections_fetch")
+    stats = prof.stats()
+    assert stats['db']['tables']['sections'] == {'round_trips': 2, 'rows': 7}
+    assert stats['db']['tables']['planning_bundle'] == {'round_trips': 1, 'rows': 3}
+    assert stats['db']['round_trips'] == 3 and stats['db']['rows'] == 10
+    assert list(stats['phases_ms']) == ["sections_fetch"]
+    assert stats['peak_traced_mb'] >= 0
+    assert tracemalloc.is_tracing() == was_tracing
+
+
+def section(rnd):
+    day = rnd.choice("MTWRF")
+    hour = rnd.randrange(8, 12)
+    return {'times': [{'days_of_week': day, 'start_time': f"{hour:02d}:00", 'end_time': f"{hour:02d}:50"}]}
+
+
+def test_detailed_search_counters_do_not_change_picks():
+    rnd = random.Random(8)
+    for _ in range(50):
+        courses = [f"C{i}" for i in range(rnd.randint(2, 7))]
+        options = {c: sorted([(rnd.randint(0, 9), {'lecture': section(rnd), 'discussion': section(rnd)})
+                              for _ in range(rnd.randint(1, 3))], key=lambda o: -o[0]) for c in courses}
+        plain, detail = new_search_stats(), new_search_stats(detail=True)
+        a = best_assignment(courses, options, 1, 4, False, False, stats=plain)
+        b = best_assignment(courses, options, 1, 4, False, False, stats=detail)
+        assert a == b
+        assert plain['nodes'] == detail['nodes']
+        assert detail['conflict_checks'] > 0 or a is None or len(a) == 1
+        conflict_graph({c: options[c][0][1] for c in courses}, False, False, detail)
+        assert detail['conflict_checks'] >= len(courses) * (len(courses) - 1) // 2
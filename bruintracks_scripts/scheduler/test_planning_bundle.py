@@ -0,0 +1,86 @@
+import random
+
+from planning_bundle import SQLiteRPC, columns_to_rows, load_bundle, unbundle
+
+
+def catalog(seed=3):
+    rnd = random.Random(seed)
+    rpc = SQLiteRPC.create()
+    db = rpc.conn
+    db.execute("INSERT INTO subjects (id, code, name) VALUES (1, 'COM SCI', 'Computer Science')")
+    for tid, name in [(10, "Fall 2024"), (11, "Winter 2025"), (12, "Spring 2025")]:
+        db.execute("INSERT INTO terms (id, term_code, term_name) VALUES (?, ?, ?)", (tid, str(tid), name))
+    for i in range(1, 6):
+        db.execute("INSERT INTO instructors (id, name) VALUES (?, ?)", (i, f"Prof {i}"))
+    sid = mid = 0
+    for cid in range(1, 7):
+        db.execute("INSERT INTO courses (id, subject_id, catalog_number, title) VALUES (?, 1, ?, ?)",
+                   (cid, str(30 + cid), f"Course {cid}"))
+        for tid in (10, 11, 12):
+            for code in ("1", "1A", "1B")[:rnd.randint(0, 3)]:
+                sid += 1
+                db.execute("INSERT INTO sections (id, course_id, term_id, class_number, section_code,"
+                           " is_primary, activity, enrollment_cap, enrollment_total, waitlist_cap,"
+                           " waitlist_total) VALUES (?, ?, ?, ?, ?, ?, ?, 30, ?, 5, 0)",
+                           (sid, cid, tid, str(sid), code, code == "1",
+                            "Lecture" if code == "1" else "Discussion", rnd.randint(0, 30)))
+                for _ in range(rnd.randint(0, 2)):
+                    mid += 1
+                    hour = rnd.randrange(8, 17)
+                    db.execute("INSERT INTO meeting_times (id, section_id, days_of_week, start_time,"
+                               " end_time, building, room) VALUES (?, ?, ?, ?, ?, 'MS', '4000')",
+                               (mid, sid, rnd.choice(["MW", "TR", "F"]),
+                                f"{hour:02d}:00:00", f"{hour:02d}:50:00"))
+                for iid in rnd.sample(range(1, 6), rnd.randint(0, 2)):
+                    db.execute("INSERT INTO section_instructors (section_id, instructor_id) VALUES (?, ?)",
+                               (sid, iid))
+    return rpc
+
+
+def naive(rpc, pairs):
+    """The planner's old path: sections, then meetings, then instructors, table by table."""
+    db = rpc.conn
+    out = {}
+    for cid, tid in pairs:
+        for (sec_id,) in db.execute("SELECT id FROM sections WHERE course_id = ? AND term_id = ?"
+                                    " ORDER BY id", (cid, tid)).fetchall():
+            times = [tuple(r) for r in db.execute(
+                "SELECT days_of_week, start_time, end_time, building, room FROM meeting_times"
+                " WHERE section_id = ? ORDER BY id", (sec_id,))]
+            names = [r[0] for r in db.execute(
+                "SELECT i.name FROM section_instructors si JOIN instructors i ON i.id = si.instructor_id"
+                " WHERE si.section_id = ? ORDER BY si.instructor_id", (sec_id,))]
+            out.setdefault((cid, tid), []).append((sec_id, times, names))
+    return out
+
+
+def test_matches_table_by_table_join():
+    rpc = catalog()
+    # A pair list whose cross product is wider than the pairs themselves
+    pairs = [(1, 10), (1, 11), (2, 12), (3, 10), (4, 11), (6, 12)]
+    got = load_bundle(rpc, pairs)
+    assert set(got) <= set(pairs)
+    shaped = {
+        pair: [(s['id'], [(m['days_of_week'], m['start_time'], m['end_time'], m['building'], m['room'])
+                          for m in s['times']], s['instructors']) for s in rows]
+        for pair, rows in got.items()
+    }
+    assert shaped == naive(rpc, pairs)
+
+
+def test_unbundle_gives_planner_rows():
+    rpc = catalog()
+    pairs = [(c, t) for c in range(1, 7) for t in (10, 11, 12)]
+    secs, meetings, si_map = unbundle(load_bundle(rpc, pairs))
+    assert secs and all(isinstance(s['is_primary'], bool) for s in secs)
+    assert all('times' not in s and 'instructors' not in s for s in secs)
+    ids = {s['id'] for s in secs}
+    assert {m['section_id'] for m in meetings} <= ids and set(si_map) == ids
+    assert all(len(m['start_time']) == 8 for m in meetings)
+
+
+def test_empty_request():
+    rpc = catalog()
+    assert load_bundle(rpc, []) == {}
+    bundle = rpc.rpc("get_planning_bundle", {"course_ids": [99], "term_ids": [10]}).execute().data
+    assert columns_to_rows(bundle['sections']) == [] and bundle['meetings']['section_id'] == []
@@ -0,0 +1,60 @@
+import contextlib
+import io
+import random
+
+from prereq_index import PrereqIndex
+from schedule_editor import ScheduleEditor
+
+TERMS = [f"T{i:02d}" for i in range(12)]
+
+
+def editor(seed: int) -> ScheduleEditor:
+    """A valid 12-term dict-format plan whose courses need 0-2 earlier ones."""
+    rnd = random.Random(seed)
+    schedule, prereqs, placed = {}, {}, []
+    for term in TERMS:
+        schedule[term] = {}
+        for k in range(4):
+            course = f"C|{term}{k}"
+            needs = [(p, 'prerequisite', 'D-', 'R') for p in rnd.sample(placed, min(len(placed), rnd.randint(0, 2)))]
+            # Both needed, or either one will do
+            prereqs[course] = ([needs] if rnd.random() < 0.5 else [[n] for n in needs]) if needs else []
+            schedule[term][course] = {}
+        schedule[term]["FILLER"] = {}
+        placed += [c for c in schedule[term] if c != "FILLER"]
+    # Every course already resolved, so nothing goes to the database
+    with contextlib.redirect_stderr(io.StringIO()):
+        return ScheduleEditor(schedule, {}, {}, prerequisites=prereqs)
+
+
+def test_prefix_sets_and_dependents():
+    ed = editor(1)
+    with contextlib.redirect_stderr(io.StringIO()):
+        index = PrereqIndex(ed.schedule, {"X|1": "A"}, ed._get_prerequisites)
+    assert index.completed_before("T00") == {"X|1"}
+    assert index.completed_before("T02") == {"X|1", *ed.schedule["T00"], *ed.schedule["T01"]} - {"FILLER"}
+    for course, clauses in ed._prereq_cache.items():
+        for clause in clauses:
+            for leaf in clause:
+                assert course in index.dependents[leaf[0]]
+
+
+def test_incremental_edits_agree_with_full_validation():
+    with contextlib.redirect_stderr(io.StringIO()):
+        for seed in range(5):
+            ed, full, rnd = editor(seed), editor(seed), random.Random(seed)
+            # The old behaviour: every edit rechecks the whole plan
+            full._validate_prerequisites_for_edit = lambda moved: full._validate_prerequisites_after_term(TERMS[0])
+            for _ in range(60):
+                a, b = rnd.sample(TERMS, 2)
+                c1 = rnd.choice([c for c in ed.schedule[a] if c != "FILLER"] or ["FILLER"])
+                c2 = rnd.choice([c for c in ed.schedule[b] if c != "FILLER"] or ["FILLER"])
+                # Messages may name a different failing course; the verdict may not differ
+                if rnd.random() < 0.5:
+                    assert ed.swap_courses(c1, a, c2, b)[0] == full.swap_courses(c1, a, c2, b)[0]
+                else:
+                    assert ed.move_course(c1, a, b)[0] == full.move_course(c1, a, b)[0]
+                assert ed.schedule == full.schedule
+                fresh = PrereqIndex(ed.schedule, ed.transcript, ed._get_prerequisites)
+                assert ed._index().completed == fresh.completed
+                assert ed._index().terms_of == fresh.terms_of
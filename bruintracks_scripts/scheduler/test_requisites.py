@@ -0,0 +1,80 @@
+import requisites
+from requisites import compile_requisites, clear_compiled, requisites_met
+
+
+def leaf(course, **extra):
+    return {"course": course, "relation": "prerequisite", "severity": "R", **extra}
+
+
+def courses(clauses):
+    return [sorted(l["course"] for l in clause) for clause in clauses]
+
+
+def test_single_leaf_and_empty_tree():
+    assert courses(compile_requisites({"and": [leaf("Mathematics 31A")]})) == [["Mathematics 31A"]]
+    # An empty requisite tree compiles to one clause holding the empty leaf, as before
+    assert compile_requisites({}) == [[{}]]
+
+
+def test_and_of_ors_matches_cross_product_order():
+    tree = {"and": [
+        {"or": [leaf("A"), leaf("B"), leaf("C")]},
+        {"or": [leaf("D"), leaf("E"), leaf("F")]},
+        {"or": [leaf("G"), leaf("H")]},
+    ]}
+    clauses = courses(compile_requisites(tree))
+    assert len(clauses) == 18
+    assert clauses[0] == ["A", "D", "G"]
+    assert clauses[-1] == ["C", "F", "H"]
+
+
+def test_duplicates_and_subsumed_clauses_are_dropped():
+    # (A) or (A and B) or (A) -> just (A)
+    tree = {"or": [leaf("A"), {"and": [leaf("A"), leaf("B")]}, leaf("A")]}
+    assert courses(compile_requisites(tree)) == [["A"]]
+
+    # (A or B) and (A or C) -> A, (B and C); (A and C), (B and A) are subsumed by A
+    tree = {"and": [{"or": [leaf("A"), leaf("B")]}, {"or": [leaf("A"), leaf("C")]}]}
+    assert courses(compile_requisites(tree)) == [["A"], ["B", "C"]]
+
+
+def test_leaves_differing_in_grade_are_distinct():
+    tree = {"or": [leaf("A", min_grade="C-"), leaf("A", min_grade="B")]}
+    assert len(compile_requisites(tree)) == 2
+
+
+def test_expansion_is_capped():
+    # 2^12 = 4096 clauses uncapped
+    tree = {"and": [{"or": [leaf(f"X{i}"), leaf(f"Y{i}")]} for i in range(12)]}
+    clauses = compile_requisites(tree, cap=50)
+    assert len(clauses) == 50 and clauses.truncated
+    assert not compile_requisites({"and": tree["and"][:5]}, cap=50).truncated
+    # Only the all-Y clause is met, and the cap dropped it
+    met = lambda l: l["course"].startswith("Y")
+    assert not any(all(met(l) for l in clause) for clause in clauses)
+    assert requisites_met(tree, met)
+    assert not requisites_met(tree, lambda l: l["course"] not in ("X3", "Y3"))
+    assert requisites_met({}, met) and requisites_met(None, met)
+
+
+def test_memoized_per_course_version_and_tree():
+    clear_compiled()
+    first = compile_requisites({"and": [leaf("A")]}, "COM SCI|31", version="v1")
+    assert compile_requisites({"and": [leaf("A")]}, "COM SCI|31", version="v1") is first
+    # A refreshed catalog row with another tree is compiled again
+    assert courses(compile_requisites({"and": [leaf("B")]}, "COM SCI|31", version="v1")) == [["B"]]
+    assert courses(compile_requisites({"and": [leaf("C")]}, "COM SCI|31", version="v2")) == [["C"]]
+    clear_compiled()
+
+
+def test_memo_is_bounded():
+    clear_compiled()
+    size, requisites.MEMO_SIZE = requisites.MEMO_SIZE, 3
+    try:
+        for n in range(5):
+            compile_requisites({"and": [leaf(f"A{n}")]}, f"COM SCI|{n}", version="v1")
+        compile_requisites({"and": [leaf("A2")]}, "COM SCI|2", version="v1")
+        assert list(requisites._compiled) == [("COM SCI|3", "v1"), ("COM SCI|4", "v1"), ("COM SCI|2", "v1")]
+    finally:
+        requisites.MEMO_SIZE = size
+        clear_compiled()
@@ -0,0 +1,85 @@
+import random
+from datetime import time
+
+from occupancy import section_bits, selection_bits
+from section_model import SectionStore, section_json
+from section_scoring import pack_sections, score_sections
+
+WEIGHTS = {'time': 4, 'building': 3, 'days': 2, 'instructor': 1}
+
+
+def rows(seed=4, n=60):
+    rnd = random.Random(seed)
+    secs, meetings, names = [], [], {}
+    for sid in range(1, n + 1):
+        secs.append({'id': sid, 'course_id': sid % 7, 'term_id': rnd.choice([10, 11]),
+                     'section_code': str(sid), 'is_primary': rnd.random() < 0.5, 'activity': "Lecture",
+                     'enrollment_cap': 10, 'enrollment_total': rnd.randint(0, 10),
+                     'waitlist_cap': 2, 'waitlist_total': rnd.randint(0, 2)})
+        start = rnd.randrange(8, 17) * 60 + rnd.choice([0, 30])
+        for _ in range(rnd.randint(0, 3)):
+            meetings.append({'section_id': sid, 'days_of_week': rnd.choice(["MW", "TR", "F", "W"]),
+                             'start_time': f"{start // 60:02d}:{start % 60:02d}:00",
+                             'end_time': f"{(start + 50) // 60:02d}:{(start + 50) % 60:02d}:00",
+                             'building': rnd.choice(["MS", "SCI", None]), 'room': rnd.choice(["1", "2"])})
+        names[sid] = rnd.sample(["Prof 1", "Prof 2", "Prof 3"], rnd.randint(0, 2))
+    rnd.shuffle(meetings)
+    return secs, meetings, names
+
+
+def as_dicts(secs, meetings, names):
+    # The decorated dicts the planner used before SectionStore
+    parse = lambda s: time(*map(int, s.split(":")))
+    out = []
+    for s in secs:
+        times = [{**m, 'start_time': parse(m['start_time']), 'end_time': parse(m['end_time'])}
+                 for m in meetings if m['section_id'] == s['id']]
+        out.append({**s, 'times': times, 'instructors': names.get(s['id'], [])})
+    return out
+
+
+def old_json(sec):
+    # format_schedule's clean() before SectionStore
+    slots = {}
+    for t in sec['times']:
+        slots.setdefault((t['start_time'], t['end_time'], t['building'], t['room']), set()).add(t['days_of_week'])
+    return {
+        'id': sec['id'], 'section': sec['section_code'], 'activity': sec['activity'],
+        'enrollment_cap': sec['enrollment_cap'], 'enrollment_total': sec['enrollment_total'],
+        'waitlist_cap': sec['waitlist_cap'], 'waitlist_total': sec['waitlist_total'],
+        'times': [{'days': ''.join(sorted(days)), 'start': st.strftime('%H:%M'), 'end': en.strftime('%H:%M'),
+                   'building': bld, 'room': rm} for (st, en, bld, rm), days in slots.items()],
+        'instructors': sec['instructors'],
+    }
+
+
+def test_store_matches_row_dicts():
+    secs, meetings, names = rows()
+    store = SectionStore.build(secs, meetings, names)
+    dicts = as_dicts(secs, meetings, names)
+    assert [s.id for s in store.sections] == [s['id'] for s in secs]
+    for sec, d in zip(store.sections, dicts):
+        assert section_json(sec) == old_json(d)
+        assert sec.occupancy == section_bits(d['times'])
+        assert selection_bits({'lecture': sec, 'discussion': None}) == (sec.occupancy, 0)
+        assert sec.is_full() == (d['enrollment_total'] >= d['enrollment_cap']
+                                 and d['waitlist_total'] >= d['waitlist_cap'])
+
+
+def test_scores_match_row_dicts():
+    secs, meetings, names = rows(seed=9)
+    store = SectionStore.build(secs, meetings, names)
+    args = (WEIGHTS, time(9, 0), time(12, 0), {"MS"}, {"F"}, {"Prof 2"})
+    packed = score_sections(pack_sections({"all": store.sections}), *args)
+    expected = score_sections(pack_sections({"all": as_dicts(secs, meetings, names)}), *args)
+    assert packed.tolist() == expected.tolist()
+
+
+def test_meetings_are_compact():
+    store = SectionStore.build(*rows())
+    assert store.meet_ptr[-1] == len(store.m_start) == len(store.m_mask)
+    assert len(store.buildings.values) == 3 and len(store.rooms.values) == 2
+    for sec in store.sections:
+        for i in sec.meetings():
+            days = store.meeting(i)[0]
+            assert store.m_mask[i] == sum(1 << "MTWRFSU".index(d) for d in days)
@@ -0,0 +1,82 @@
+import random
+from datetime import time
+
+from section_scoring import pack_sections, score_sections, rank_sections
+
+WEIGHTS = {'time': 4, 'building': 3, 'days': 2, 'instructor': 1}
+EARLIEST, LATEST = time(9, 0), time(10, 0)
+BUILDINGS, NO_DAYS, INSTRUCTORS = {"MS", "SCI"}, {"F"}, {"Prof 2"}
+
+
+def loop_score(sec):
+    # The per-section loop score_and_select used before vectorizing
+    sc = 0
+    for m in sec['times']:
+        if EARLIEST <= m['start_time'] <= LATEST:
+            sc += WEIGHTS['time']
+        if EARLIEST <= m['end_time'] <= LATEST:
+            sc += WEIGHTS['time']
+        if m['building'] in BUILDINGS:
+            sc += WEIGHTS['building']
+        if set(m['days_of_week']).isdisjoint(NO_DAYS):
+            sc += WEIGHTS['days']
+    if any(i in INSTRUCTORS for i in sec['instructors']):
+        sc += WEIGHTS['instructor']
+    return sc
+
+
+def make_sections(rnd):
+    by_course = {}
+    for c in range(20):
+        for s in range(rnd.randint(0, 6)):
+            start = rnd.randrange(8 * 60, 12 * 60, 10)
+            by_course.setdefault(f"C|{c}", []).append({
+                'id': c * 100 + s,
+                'term_id': rnd.choice([1, 2]),
+                'is_primary': rnd.random() < 0.4,
+                'times': [{
+                    'days_of_week': rnd.choice(["MW", "TR", "F", "MWF"]),
+                    'start_time': time(start // 60, start % 60),
+                    'end_time': time((start + 50) // 60, (start + 50) % 60),
+                    'building': rnd.choice(["MS", "SCI", "BOELTER", "ROYCE"]),
+                } for _ in range(rnd.randint(0, 2))],
+                'instructors': rnd.sample(["Prof 1", "Prof 2", "Prof 3"], rnd.randint(0, 2)),
+            })
+    return by_course
+
+
+def test_matches_section_loop():
+    rnd = random.Random(3)
+    for _ in range(20):
+        by_course = make_sections(rnd)
+        pack = pack_sections(by_course)
+        scores = score_sections(pack, WEIGHTS, EARLIEST, LATEST, BUILDINGS, NO_DAYS, INSTRUCTORS)
+        assert scores.tolist() == [loop_score(s) for s in pack.sections]
+
+        table = rank_sections(pack, scores, depth=2)
+        for course, secs in by_course.items():
+            offered = [s for s in secs if s['term_id'] == 1]
+            if not offered:
+                assert (course, 1) not in table
+                continue
+            options = table[(course, 1)]
+            totals = [sc for sc, _ in options]
+            assert totals == sorted(totals, reverse=True)
+            lectures = {id(o['lecture']) for _, o in options}
+            discussions = {id(o['discussion']) for _, o in options}
+            assert len(options) == len(lectures) * len(discussions) and len(lectures) <= 2
+            total, sel = options[0]
+            expected = 0
+            for kind, primary in (('lecture', True), ('discussion', False)):
+                cands = [s for s in offered if s['is_primary'] == primary]
+                # First section with the top score wins, like the old strict '>'
+                best = max(cands, key=loop_score) if cands else None
+                assert sel[kind] is best
+                expected += loop_score(best) if best else 0
+            assert total == expected
+
+
+def test_empty_pack():
+    pack = pack_sections({}, ["C|1"])
+    scores = score_sections(pack, WEIGHTS, EARLIEST, LATEST, set(), set(), set())
+    assert rank_sections(pack, scores) == {}
@@ -0,0 +1,126 @@
+import random
+from itertools import combinations, product
+
+from occupancy import bits_conflict, selection_bits
+from term_search import best_assignment, new_search_stats, search_space
+
+
+def weekly(day, hour):
+    return {'times': [{'days_of_week': day, 'start_time': f"{hour:02d}:00", 'end_time': f"{hour:02d}:50"}]}
+
+
+def test_self_clashing_courses_and_order():
+    options = {
+        "A": [(1, {'lecture': weekly("T", 10), 'discussion': None})],
+        # Lecture and discussion overlap: B can never be taken
+        "B": [(5, {'lecture': weekly("M", 10), 'discussion': weekly("M", 10)})],
+        "C": [(3, {'lecture': weekly("W", 10), 'discussion': None})],
+    }
+    assert list(best_assignment(["A", "B", "C"], options, 1, 2)) == ["A", "C"]
+    options["B"] = [(5, {'lecture': weekly("W", 10), 'discussion': None})]
+    assert list(best_assignment(["A", "B", "C"], options, 1, 2)) == ["A", "B"]
+
+
+def test_no_admissible_assignment():
+    mon = {'lecture': weekly("M", 10), 'discussion': None}
+    assert best_assignment(["A", "B"], {"A": [(1, mon)], "B": [(1, mon)]}, 2, 2) is None
+    assert best_assignment([], {}, 1, 3) is None
+
+
+def section(rnd):
+    day = rnd.choice("MTWRF")
+    start = rnd.randrange(8, 16) * 60
+    return {'occupancy': 0} if rnd.random() < 0.2 else {
+        'times': [{'days_of_week': day, 'start_time': f"{start // 60:02d}:00",
+                   'end_time': f"{start // 60:02d}:50"}]}
+
+
+def test_assignment_matches_exhaustive_search():
+    rnd = random.Random(11)
+    for _ in range(150):
+        courses = [f"C{i}" for i in range(rnd.randint(1, 6))]
+        options = {}
+        for c in courses:
+            opts = [(rnd.randint(0, 9), {'lecture': section(rnd), 'discussion': section(rnd)})
+                    for _ in range(rnd.randint(1, 3))]
+            options[c] = sorted(opts, key=lambda o: -o[0])
+        lo = rnd.randint(1, 2)
+        hi = rnd.randint(lo, 4)
+        allow_secondary = rnd.random() < 0.5
+
+        def fits(sels):
+            bits = [selection_bits(s) for s in sels]
+            if not allow_secondary and any(l & d for l, d in bits):
+                return False
+            return not any(bits_conflict(a, b, False, allow_secondary)
+                           for a, b in combinations(bits, 2))
+
+        expected = None
+        for size in range(lo, hi + 1):
+            for combo in combinations(courses, size):
+                for choice in product(*(options[c] for c in combo)):
+                    if fits([sel for _, sel in choice]):
+                        sc = sum(score for score, _ in choice)
+                        expected = sc if expected is None else max(expected, sc)
+
+        pick = best_assignment(courses, options, lo, hi, False, allow_secondary)
+        if expected is None:
+            assert pick is None
+            continue
+        assert fits(list(pick.values()))
+        scores = {c: {id(sel): sc for sc, sel in options[c]} for c in courses}
+        assert sum(scores[c][id(sel)] for c, sel in pick.items()) == expected
+
+
+def test_assignment_falls_back_to_next_best_option():
+    mon = {'times': [{'days_of_week': "M", 'start_time': "10:00", 'end_time': "10:50"}]}
+    tue = {'times': [{'days_of_week': "T", 'start_time': "10:00", 'end_time': "10:50"}]}
+    options = {
+        "A": [(5, {'lecture': mon, 'discussion': None})],
+        "B": [(4, {'lecture': mon, 'discussion': None}), (3, {'lecture': tue, 'discussion': None})],
+    }
+    pick = best_assignment(["A", "B"], options, 2, 2)
+    assert pick == {"A": options["A"][0][1], "B": options["B"][1][1]}
+
+
+def test_assignment_stops_at_deadline():
+    # Monday sections in four possible hours: six compatible courses never
+    # exist, so an exact search has to prove it the hard way
+    rnd = random.Random(5)
+
+    def monday():
+        hour = rnd.randrange(9, 13)
+        return {'times': [{'days_of_week': "M", 'start_time': f"{hour:02d}:00",
+                           'end_time': f"{hour:02d}:50"}]}
+
+    courses = [f"C{i}" for i in range(40)]
+    options = {c: sorted([(rnd.randint(0, 9), {'lecture': monday(), 'discussion': None})
+                          for _ in range(3)], key=lambda o: -o[0]) for c in courses}
+
+    full = new_search_stats()
+    best = best_assignment(courses, options, 1, 6, stats=full)
+    assert full['cut_short'] == 0 and full['nodes'] > 64
+    assert full['space'] == search_space([3] * 40, 6) and full['nodes'] < full['space']
+
+    rushed = new_search_stats()
+    pick = best_assignment(courses, options, 1, 6, deadline=0, stats=rushed)
+    assert rushed['cut_short'] == 1 and rushed['nodes'] < full['nodes']
+    # The first dive already finds an admissible (if not optimal) pick
+    assert pick and 1 <= len(pick) <= 6
+    score = lambda p: sum(next(sc for sc, sel in options[c] if sel is s) for c, s in p.items())
+    assert score(pick) <= score(best)
+
+
+def test_search_space_counts_every_partial_pick():
+    rnd = random.Random(11)
+    for _ in range(30):
+        counts = [rnd.randint(1, 4) for _ in range(rnd.randint(0, 6))]
+        cap = rnd.randint(0, 7)
+        brute = sum(len(list(product(*(range(counts[i]) for i in subset))))
+                    for k in range(min(cap, len(counts)) + 1) for subset in combinations(range(len(counts)), k))
+        assert search_space(counts, cap) == brute
+    # The search's own count is bounded by it
+    options = {f"C{i}": [(0, {'lecture': weekly("M", 9 + i), 'discussion': None})] for i in range(5)}
+    stats = new_search_stats()
+    best_assignment(list(options), options, 0, 3, stats=stats)
+    assert stats['nodes'] <= stats['space'] == search_space([1] * 5, 3)
@@ -0,0 +1,112 @@
+"""Plan a whole advising cohort from a JSON-lines stream of /schedule bodies.
+
+    python3 batch_plan.py [requests.jsonl|-] [workers] > plans.jsonl
+
+The catalog is paged into one snapshot up front (catalog_cache.load_snapshot),
+then the plans fan out over a process pool whose workers all read that
+snapshot, so no worker goes back to Supabase. Each input line may carry an
+"id" next to the usual body fields; results stream out in input order as
+soon as every earlier line is done:
+
+    <- {"line": 1, "id": "s-17", "ok": true, "result": {...}, "elapsed_ms": 812.4}
+    <- {"line": 2, "id": null, "ok": false, "error": "KeyError: 'start_year'"}
+
+elapsed_ms is the plan's own time inside its worker. A summary (catalog load
+time, wall time, plans per second) goes to stderr.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import traceback
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from scheduler import PlanRequest, plan, safe_execute, SUPABASE_URL, SUPABASE_KEY
+from catalog_cache import (CatalogCache, CATALOG_CACHE_ENABLED, get_catalog_cache,
+                           load_snapshot, set_catalog_cache)
+from supabase_client import get_supabase
+
+
+def _init_worker(path: str, version: str, ttl: float) -> None:
+    # Forked workers inherit the parent's SQLite connection; never share it
+    set_catalog_cache(CatalogCache(path, version, ttl))
+
+
+def plan_line(line_no: int, line: str) -> Dict:
+    started = time.perf_counter()
+    req_id = None
+    try:
+        body = json.loads(line)
+        req_id = body.get("id")
+        with redirect_stdout(sys.stderr):
+            result = plan(PlanRequest(body))
+        return {
+            "line": line_no,
+            "id": req_id,
+            "ok": True,
+            "result": result,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        return {"line": line_no, "id": req_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def main():
+    src = sys.argv[1] if len(sys.argv) > 1 else "-"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    if src in ("", "-"):
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(src) as f:
+            lines = f.read().splitlines()
+    lines = [(n, l) for n, l in enumerate(lines, 1) if l.strip()]
+
+    # With the snapshot turned off, the batch still loads the catalog once
+    # into a scratch file the workers share
+    scratch: Optional[str] = None
+    if CATALOG_CACHE_ENABLED:
+        cache = get_catalog_cache()
+    else:
+        scratch = tempfile.mkdtemp(prefix="bruintracks-batch-")
+        cache = CatalogCache(os.path.join(scratch, "catalog.sqlite3"))
+        set_catalog_cache(cache)
+
+    try:
+        started = time.perf_counter()
+        loaded = load_snapshot(get_supabase(SUPABASE_URL, SUPABASE_KEY), cache, safe_execute)
+        load_ms = (time.perf_counter() - started) * 1000
+
+        ok = 0
+        started = time.perf_counter()
+        out = sys.stdout
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(cache.path, cache.version, cache.ttl)) as pool:
+            futures = [pool.submit(plan_line, n, l) for n, l in lines]
+            for fut in futures:
+                reply = fut.result()
+                ok += reply["ok"]
+                out.write(json.dumps(reply, default=str) + "\n")
+                out.flush()
+        wall = time.perf_counter() - started
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    print(json.dumps({
+        "plans": len(lines),
+        "failed": len(lines) - ok,
+        "workers": workers,
+        "catalog_rows": loaded,
+        "catalog_load_ms": round(load_ms, 1),
+        "wall_s": round(wall, 2),
+        "plans_per_s": round(len(lines) / wall, 2) if wall else None,
+    }), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Planner throughput: one subprocess per plan vs a thread pool in one process.
+
+    python3 bench_planner_threads.py [input.json|-] [plans] [threads]
+
+Plans the same body `plans` times (default 16) three ways: spawning
+scheduler.py per plan as the controllers used to, sequentially through
+scheduler.plan in this process, and through a ThreadPoolExecutor with
+`threads` workers (default 4) calling scheduler.plan on its own PlanRequest.
+Every in-process result must match the first one, which also catches any
+state leaking between concurrent plans.
+
+The search itself is pure Python and holds the GIL, so threads mostly win by
+overlapping Supabase round trips and by sharing one warm catalog cache and
+client; the subprocess column pays interpreter start-up and imports per plan.
+"""
+import sys
+import json
+import time
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+from bench_python_worker import DEFAULT_INPUT, HERE, SCRIPTS, summary
+from scheduler import PlanRequest, plan
+
+
+def strip_timing(result: Dict) -> Dict:
+    # Elapsed times differ run to run; everything else must not
+    return {k: v for k, v in result.items() if k != 'search'}
+
+
+def run_subprocess(body: Dict) -> float:
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, SCRIPTS["scheduler"]], input=json.dumps(body),
+                          capture_output=True, text=True, cwd=HERE)
+    if proc.returncode != 0:
+        raise RuntimeError(f"scheduler exited with {proc.returncode}: {proc.stderr[-2000:]}")
+    return (time.perf_counter() - started) * 1000
+
+
+def run_in_process(body: Dict) -> Dict:
+    started = time.perf_counter()
+    result = plan(PlanRequest(body))
+    return {'ms': (time.perf_counter() - started) * 1000, 'result': strip_timing(result)}
+
+
+def throughput(label: str, plans: int, run: Callable[[], List[float]]) -> Dict:
+    started = time.perf_counter()
+    samples = run()
+    wall = time.perf_counter() - started
+    return {"mode": label, "wall_s": round(wall, 2),
+            "plans_per_s": round(plans / wall, 2), **summary(samples)}
+
+
+def main():
+    body = DEFAULT_INPUT
+    if len(sys.argv) > 1 and sys.argv[1] not in ("", "-"):
+        with open(sys.argv[1]) as f:
+            body = json.load(f)
+    plans = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    threads = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+
+    # Warm the imports, client and catalog cache once, as a resident worker would
+    reference = run_in_process(body)['result']
+
+    def checked(outs: List[Dict]) -> List[float]:
+        for out in outs:
+            if out['result'] != reference:
+                raise AssertionError("in-process plans disagree; state leaked between requests")
+        return [out['ms'] for out in outs]
+
+    def pooled() -> List[float]:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            return checked(list(pool.map(run_in_process, [body] * plans)))
+
+    rows = [
+        throughput("subprocess_per_plan", plans, lambda: [run_subprocess(body) for _ in range(plans)]),
+        throughput("in_process_sequential", plans,
+                   lambda: checked([run_in_process(body) for _ in range(plans)])),
+        throughput(f"thread_pool_{threads}", plans, pooled),
+    ]
+    base = rows[0]["plans_per_s"]
+    for row in rows:
+        row["speedup"] = round(row["plans_per_s"] / base, 2)
+    print(json.dumps({"plans": plans, "threads": threads, "runs": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Cold (spawn-per-request) vs warm (python_worker) latency for one entry point.
+
+    python3 bench_python_worker.py [entry] [input.json|-] [runs]
+
+Defaults to 20 scheduler runs with a Fall 2024 - Spring 2026 plan. Cold runs
+spawn the entry's script exactly as the controllers used to; warm runs send
+the same body to a single resident python_worker.py. The worker's start-up
+and first request are reported separately and excluded from the warm stats.
+"""
+import os
+import sys
+import json
+import math
+import time
+import subprocess
+from typing import Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_DIR = os.path.join(HERE, "..", "bruintracks_scripts", "scheduler")
+
+SCRIPTS = {
+    "scheduler": os.path.join(HERE, "scheduler.py"),
+    "schedule_editor": os.path.join(SCRIPTS_DIR, "schedule_editor.py"),
+    "schedule_assistant": os.path.join(SCRIPTS_DIR, "schedule_assistant.py"),
+    "tech_breadth_optimizer": os.path.join(SCRIPTS_DIR, "tech_breadth_optimizer.py"),
+    "get_elective_options": os.path.join(SCRIPTS_DIR, "get_elective_options.py"),
+}
+
+DEFAULT_INPUT = {
+    "start_year": 2024, "start_quarter": "Fall",
+    "end_year": 2026, "end_quarter": "Spring",
+    "transcript": {},
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(samples),
+        "p50_ms": round(percentile(samples, 50), 1),
+        "p99_ms": round(percentile(samples, 99), 1),
+        "mean_ms": round(sum(samples) / len(samples), 1),
+    }
+
+
+def run_cold(entry: str, body: Dict) -> float:
+    env = dict(os.environ)
+    stdin = json.dumps(body)
+    if entry == "get_elective_options":
+        # This script takes its input from the environment, not stdin
+        env["SCHEDULE"] = json.dumps(body.get("schedule", {}))
+        env["TRANSCRIPT"] = json.dumps(body.get("transcript", {}))
+        stdin = ""
+    started = time.perf_counter()
+    proc = subprocess.run([sys.executable, SCRIPTS[entry]], input=stdin,
+                          capture_output=True, text=True, env=env)
+    elapsed = (time.perf_counter() - started) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{entry} exited with {proc.returncode}: {proc.stderr[-2000:]}")
+    return elapsed
+
+
+def main():
+    entry = sys.argv[1] if len(sys.argv) > 1 else "scheduler"
+    body = DEFAULT_INPUT
+    if len(sys.argv) > 2 and sys.argv[2] not in ("", "-"):
+        with open(sys.argv[2]) as f:
+            body = json.load(f)
+    runs = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    cold = [run_cold(entry, body) for _ in range(runs)]
+
+    started = time.perf_counter()
+    worker = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "python_worker.py")],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, env={**os.environ, "PY_WORKER_PRELOAD": entry},
+    )
+
+    def call(req_id: int) -> float:
+        t0 = time.perf_counter()
+        worker.stdin.write(json.dumps({"id": req_id, "entry": entry, "input": body}) + "\n")
+        worker.stdin.flush()
+        reply = json.loads(worker.stdout.readline())
+        if not reply["ok"]:
+            raise RuntimeError(reply["error"])
+        return (time.perf_counter() - t0) * 1000
+
+    first = call(0)
+    startup = (time.perf_counter() - started) * 1000
+    warm = [call(i + 1) for i in range(runs)]
+    worker.stdin.close()
+    worker.wait()
+
+    print(json.dumps({
+        "entry": entry,
+        "cold": summary(cold),
+        "warm": summary(warm),
+        "worker_startup_plus_first_request_ms": round(startup, 1),
+        "first_warm_request_ms": round(first, 1),
+        "p50_speedup": round(percentile(cold, 50) / percentile(warm, 50), 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
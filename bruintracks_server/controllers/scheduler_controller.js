@@ -1,11 +1,11 @@
 import { OpenAI } from "openai";
 import dotenv from "dotenv";
-import { spawn } from 'child_process';
 import path from 'path';
 dotenv.config();
 import { fileURLToPath } from "url";
 import { createClient } from "@supabase/supabase-js";
 import supabase from "./supabase_client.js";
+import { runPython } from "../services/pythonWorkerPool.js";
 
 const openai = new OpenAI({ apiKey: process.env.OPENAI_API_KEY });
 
@@ -62,46 +62,18 @@ You are helping build a structured list of courses required for a major. Your ta
 
 // Add function to get tech breadth recommendations
 async function getTechBreadthRecommendations(transcript, techBreadthArea, required_courses) {
-  return new Promise((resolve, reject) => {
-    const pythonProcess = spawn('python3', [
-      path.join(process.cwd(), '../bruintracks_scripts/scheduler/tech_breadth_optimizer.py')
-    ]);
-
-    let outputData = '';
-    let errorData = '';
-
-    pythonProcess.stdin.write(JSON.stringify({
+  try {
+    const recommendations = await runPython("tech_breadth_optimizer", {
       transcript: transcript,
       required_courses: required_courses,
       tech_breadth_area: techBreadthArea
-    }));
-    pythonProcess.stdin.end();
-
-    pythonProcess.stdout.on('data', (data) => {
-      outputData += data.toString();
     });
-
-    pythonProcess.stderr.on('data', (data) => {
-      errorData += data.toString();
-    });
-
-    pythonProcess.on('close', (code) => {
-      if (code !== 0) {
-        console.error('Tech breadth optimizer error:', errorData);
-        reject(new Error(`Tech breadth optimizer failed with code ${code}`));
-        return;
-      }
-
-      try {
-        const recommendations = JSON.parse(outputData);
-        resolve(recommendations);
-        console.log("Tech breadth recommendations:", recommendations);
-      } catch (error) {
-        console.error('Failed to parse tech breadth optimizer output:', error);
-        reject(error);
-      }
-    });
-  });
+    console.log("Tech breadth recommendations:", recommendations);
+    return recommendations;
+  } catch (error) {
+    console.error('Tech breadth optimizer error:', error);
+    throw error;
+  }
 }
 
 export const getCoursesToSchedule = async (req, res) => {
@@ -1,77 +1,49 @@
 // controllers/scheduling_controller.js
-import path from "path";
-import { spawn } from "child_process";
-import { fileURLToPath } from "url";
-import { createClient } from "@supabase/supabase-js";
 import supabase from "./supabase_client.js";
-
-// ESM __dirname shim
-const __filename = fileURLToPath(import.meta.url);
-const __dirname = path.dirname(__filename);
+import { runPython } from "../services/pythonWorkerPool.js";
 
 /**
  * POST /schedule
- * Spawns the Python scheduler, pipes in req.body, and returns its JSON output.
+ * Runs the Python scheduler on a resident worker with req.body and returns its JSON output.
  */
-export const scheduleCourses = (req, res) => {
-  // adjust the path if your get_courses.py lives elsewhere
-  const scriptPath = path.join(__dirname, "..", "scheduler.py");
-
-  const py = spawn("python3", [scriptPath], {
-    stdio: ["pipe", "pipe", "inherit"],
-  });
-
-  let stdout = "";
-  py.stdout.on("data", (chunk) => {
-    stdout += chunk.toString();
-  });
-
-  py.on("close", (code) => {
-    if (code !== 0) {
-      return res
-        .status(500)
-        .json({ error: `Scheduler script exited with code ${code}` });
-    }
-    try {
-      const result = JSON.parse(stdout);
-
-      // Save schedule to database
-      if (req.user && req.user.id && result) {
-        supabase
-          .from("schedules")
-          .insert([
-            {
-              user_id: req.user.id,
-              schedule: result, // Assuming the whole result is the schedule object
-            },
-          ])
-          .then(({ data, error }) => {
-            if (error) {
-              console.error("Error saving schedule to database:", error);
-            } else {
-              console.log("Schedule successfully saved to database:", data);
-            }
-          })
-          .catch((error) => {
-            console.error("Promise rejection error saving schedule:", error);
-          });
-      } else if (!req.user || !req.user.id) {
-        console.warn("User not authenticated. Schedule not saved to database.");
-      } else if (!result) {
-        console.warn(
-          "No scheduling result received. Schedule not saved to database."
-        );
-      }
+export const scheduleCourses = async (req, res) => {
+  let result;
+  try {
+    result = await runPython("scheduler", req.body);
+  } catch (err) {
+    console.error("Scheduler worker error:", err);
+    return res.status(500).json({ error: `Scheduler failed: ${err.message}` });
+  }
 
-      res.json(result);
-    } catch (err) {
-      console.error("Failed to parse scheduler JSON:", err);
-      res.status(500).json({ error: "Invalid JSON from scheduler script" });
-    }
-  });
+  // Save schedule to database
+  if (req.user && req.user.id && result) {
+    supabase
+      .from("schedules")
+      .insert([
+        {
+          user_id: req.user.id,
+          schedule: result, // Assuming the whole result is the schedule object
+        },
+      ])
+      .then(({ data, error }) => {
+        if (error) {
+          console.error("Error saving schedule to database:", error);
+        } else {
+          console.log("Schedule successfully saved to database:", data);
+        }
+      })
+      .catch((error) => {
+        console.error("Promise rejection error saving schedule:", error);
+      });
+  } else if (!req.user || !req.user.id) {
+    console.warn("User not authenticated. Schedule not saved to database.");
+  } else if (!result) {
+    console.warn(
+      "No scheduling result received. Schedule not saved to database."
+    );
+  }
 
-  py.stdin.write(JSON.stringify(req.body));
-  py.stdin.end();
+  res.json(result);
 };
 
 /**
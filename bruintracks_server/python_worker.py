@@ -0,0 +1,97 @@
+"""Long-lived Python worker for the Express server.
+
+Instead of spawning a fresh interpreter per HTTP request, the server keeps a
+small pool of these processes (services/pythonWorkerPool.js). Each one reads
+JSON lines from stdin and answers with one JSON line per request on stdout:
+
+    -> {"id": 7, "entry": "scheduler", "input": {...}}
+    <- {"id": 7, "ok": true, "result": {...}, "elapsed_ms": 812.4}
+    <- {"id": 7, "ok": false, "error": "KeyError: 'start_year'"}
+
+Modules, Supabase clients and the catalog snapshot stay loaded between
+requests. Anything an entry point prints goes to stderr so stdout only ever
+carries protocol lines.
+"""
+import os
+import sys
+import json
+import time
+import importlib
+import traceback
+from contextlib import redirect_stdout
+from typing import Callable, Dict
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "..", "bruintracks_scripts", "scheduler")
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+
+# entry name -> module exposing run(input) -> JSON-serialisable result
+ENTRY_MODULES = {
+    "scheduler": "scheduler",
+    "schedule_editor": "schedule_editor",
+    "schedule_assistant": "schedule_assistant",
+    "tech_breadth_optimizer": "tech_breadth_optimizer",
+    "get_elective_options": "get_elective_options",
+    "what_if": "what_if",
+}
+RUN_FUNCTIONS = {
+    "scheduler": "run_request",
+}
+
+# Entries imported at start-up so the first request is already warm
+PRELOAD = [e for e in os.getenv("PY_WORKER_PRELOAD", "scheduler,schedule_editor").split(",") if e]
+
+_handlers: Dict[str, Callable[[Dict], object]] = {}
+
+
+def get_handler(entry: str) -> Callable[[Dict], object]:
+    if entry not in _handlers:
+        if entry not in ENTRY_MODULES:
+            raise ValueError(f"Unknown entry point: {entry}")
+        # Imports are lazy so a missing OPENAI_API_KEY only breaks the entries that need it
+        module = importlib.import_module(ENTRY_MODULES[entry])
+        _handlers[entry] = getattr(module, RUN_FUNCTIONS.get(entry, "run"))
+    return _handlers[entry]
+
+
+def handle(line: str) -> Dict:
+    started = time.perf_counter()
+    req_id = None
+    try:
+        req = json.loads(line)
+        req_id = req.get("id")
+        if req.get("entry") == "ping":
+            return {"id": req_id, "ok": True, "result": "pong"}
+        handler = get_handler(req["entry"])
+        with redirect_stdout(sys.stderr):
+            result = handler(req.get("input", {}))
+        return {
+            "id": req_id,
+            "ok": True,
+            "result": result,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        }
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        return {"id": req_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def main():
+    for entry in PRELOAD:
+        try:
+            get_handler(entry)
+        except Exception:
+            print(f"python_worker: could not preload {entry}", file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+
+    out = sys.stdout
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        out.write(json.dumps(handle(line), default=str) + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
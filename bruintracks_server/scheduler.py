@@ -3,11 +3,31 @@ import re
 import time
 import json
 import sys
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional, Set
-from itertools import combinations
 from dotenv import load_dotenv
-from supabase import create_client
+
+# Shared planner modules live next to the other scheduler scripts
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           "..", "bruintracks_scripts", "scheduler")
+if SCRIPTS_DIR not in sys.path:
+    sys.path.append(SCRIPTS_DIR)
+
+from catalog_cache import (CatalogCache, get_catalog_cache, cached_subjects, group_rows,
+                           term_season, term_year, COURSE_COLUMNS, SECTION_COLUMNS,
+                           MEETING_COLUMNS, OFFERING_COLUMNS)
+from supabase_client import get_supabase
+from planning_bundle import load_bundle, unbundle
+from bulk_fetch import select_in
+from async_fetch import FetchTimings, concurrently, sections_pipeline
+from plan_profile import PlanProfile, NULL_PROFILE
+from requisites import compile_requisites, requisite_leaves, requisites_met
+from term_search import conflict_graph, best_assignment, new_search_stats
+from section_scoring import pack_sections, score_sections, rank_sections
+from section_model import Section, SectionStore, section_json
 
 # ───── CONFIGURATION ─────
 load_dotenv()
@@ -31,12 +51,9 @@ DEFAULT_COURSES_TO_SCHEDULE = [
     "RESOLVE: Technical Breadth #2",
     "RESOLVE: Technical Breadth #3"
 ]
-COURSES_TO_SCHEDULE = DEFAULT_COURSES_TO_SCHEDULE.copy()
-
-# Transcript of completed courses
-TRANSCRIPT: Dict[str, Optional[str]] = {}
 
-# Scheduling parameters
+# Scheduling parameters. These are only defaults: every request's overrides
+# live on its PlanRequest, so nothing below is mutated while planning.
 MAX_COURSES_PER_TERM      = 5
 LEAST_COURSES_PER_TERM    = 3
 FILLER_COURSE             = "FILLER"
@@ -52,14 +69,120 @@ PREF_NO_DAYS     = {"F"}
 PREF_BUILDINGS   = {"MS","SCI"}
 PREF_INSTRUCTORS = set()
 
+# Incremental replanning: per-course closure entries of the most recent plans
+# in this process, so a follow-up request can reuse its predecessor's work
+REPLAN_MEMO_SIZE = int(os.getenv("REPLAN_MEMO_SIZE", 64))
+
+# Fetch sections, meetings and instructors through the get_planning_bundle
+# RPC (one round trip) instead of one query per table
+PLANNING_BUNDLE = os.getenv("PLANNING_BUNDLE", "0") == "1"
+# Run independent catalog reads concurrently and pipeline the section reads
+# (see async_fetch); adds a `fetch` timing block to the output
+ASYNC_FETCH = os.getenv("ASYNC_FETCH", "0") == "1"
+
 # Grade ordering
 GRADE_ORDER = [
     "A+","A","A-","B+","B","B-",
     "C+","C","C-","D+","D","D-","F"
 ]
 
+# ───── REQUEST ─────
+
+def request_key(inp: Dict) -> str:
+    """Stable digest of the parts of a (delta-applied) body that shape the plan."""
+    body = {k: v for k, v in inp.items() if k not in ('id', 'time_budget_ms', 'profile')}
+    return hashlib.sha1(json.dumps(body, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def apply_delta(inp: Dict, delta: Dict) -> Dict:
+    """The body `inp` would have been with `delta` applied:
+
+        {"transcript": {"COM SCI|31": "A"},      # grades set (or cleared with null)
+         "add_courses": ["COM SCI|M146"], "remove_courses": ["PHYSICS|4AL"],
+         "preferences": {"pref_no_days": ["F", "M"]}}
+    """
+    courses = list(inp.get('courses_to_schedule', DEFAULT_COURSES_TO_SCHEDULE))
+    for c in delta.get('remove_courses', []):
+        if c in courses:
+            courses.remove(c)
+    courses += [c for c in delta.get('add_courses', []) if c not in courses]
+    return {
+        **{k: v for k, v in inp.items() if k not in ('prior_plan', 'delta')},
+        'courses_to_schedule': courses,
+        'transcript': {**inp.get('transcript', {}), **delta.get('transcript', {})},
+        'preferences': {**inp.get('preferences', {}), **delta.get('preferences', {})},
+    }
+
+
+class PlanRequest:
+    """One /schedule request body, parsed once and filled in from the defaults.
+
+    build_schedule reads everything it needs from here instead of module
+    globals, so any number of plans can run concurrently in one process
+    (threads in a worker, a batch run) without seeing each other's overrides.
+    """
+
+    def __init__(self, inp: Dict):
+        # Incremental replans send the previous body, its result and a delta;
+        # the delta is applied here and build_schedule keeps what it can
+        self.prior_plan: Optional[Dict] = inp.get('prior_plan')
+        self.delta: Dict = inp.get('delta') or {}
+        self.prior_key: Optional[str] = (
+            request_key(apply_delta(inp, {})) if self.prior_plan is not None else None)
+        inp = apply_delta(inp, self.delta)
+        self.key: str = request_key(inp)
+
+        prefs = inp.get('preferences', {})
+        self.start_year: int = inp['start_year']
+        self.start_quarter: str = inp['start_quarter']
+        self.end_year: int = inp['end_year']
+        self.end_quarter: str = inp['end_quarter']
+        self.time_budget_ms: Optional[float] = inp.get('time_budget_ms')
+        # Adds a `stats` block (phase times, DB traffic, search counters, memory)
+        self.profile: bool = bool(inp.get('profile', False))
+        self.courses_to_schedule: List[str] = list(
+            inp.get('courses_to_schedule', DEFAULT_COURSES_TO_SCHEDULE))
+        self.transcript: Dict[str, Optional[str]] = dict(inp.get('transcript', {}))
+
+        self.allow_warnings: bool = prefs.get('allow_warnings', ALLOW_WARNINGS)
+        self.allow_primary_conflicts: bool = prefs.get(
+            'allow_primary_conflicts', ALLOW_PRIMARY_CONFLICTS)
+        self.allow_secondary_conflicts: bool = prefs.get(
+            'allow_secondary_conflicts', ALLOW_SECONDARY_CONFLICTS)
+        self.max_courses_per_term: int = prefs.get('max_courses_per_term', MAX_COURSES_PER_TERM)
+        self.least_courses_per_term: int = prefs.get('least_courses_per_term', LEAST_COURSES_PER_TERM)
+
+        self.pref_priority: List[str] = list(prefs.get('pref_priority', PREF_PRIORITY))
+        pe = prefs.get('pref_earliest', PREF_EARLIEST.strftime('%H:%M'))
+        self.pref_earliest = datetime.strptime(pe, '%H:%M').time()
+        pl = prefs.get('pref_latest', PREF_LATEST.strftime('%H:%M'))
+        self.pref_latest = datetime.strptime(pl, '%H:%M').time()
+        self.pref_no_days: Set[str] = set(prefs.get('pref_no_days', PREF_NO_DAYS))
+        self.pref_buildings: Set[str] = set(prefs.get('pref_buildings', PREF_BUILDINGS))
+        self.pref_instructors: Set[str] = set(prefs.get('pref_instructors', PREF_INSTRUCTORS))
+
 # ───── HELPERS ─────
 
+_closure_memo: "OrderedDict[Tuple[str, str], Dict]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def memo_get(key: Tuple[str, str]) -> Optional[Dict]:
+    with _memo_lock:
+        entry = _closure_memo.get(key)
+        if entry is not None:
+            _closure_memo.move_to_end(key)
+        return entry
+
+
+def memo_put(key: Tuple[str, str], closure: Dict) -> None:
+    with _memo_lock:
+        _closure_memo[key] = closure
+        _closure_memo.move_to_end(key)
+        while len(_closure_memo) > REPLAN_MEMO_SIZE:
+            _closure_memo.popitem(last=False)
+
+
 def safe_execute(req, retries:int=3, backoff:float=0.2):
     for i in range(retries):
         try:
@@ -70,20 +193,6 @@ def safe_execute(req, retries:int=3, backoff:float=0.2):
             time.sleep(backoff)
 
 
-def to_dnf(node: Dict) -> List[List[Dict]]:
-    if 'and' in node:
-        prods = to_dnf(node['and'][0])
-        for child in node['and'][1:]:
-            prods = [a + b for a in prods for b in to_dnf(child)]
-        return prods
-    if 'or' in node:
-        res: List[List[Dict]] = []
-        for child in node['or']:
-            res.extend(to_dnf(child))
-        return res
-    return [[node]]
-
-
 def meets_min_grade(obt: str, req: str) -> bool:
     try:
         return GRADE_ORDER.index(obt) <= GRADE_ORDER.index(req)
@@ -91,12 +200,6 @@ def meets_min_grade(obt: str, req: str) -> bool:
         return False
 
 
-def meetings_overlap(m1: Dict, m2: Dict) -> bool:
-    if not set(m1['days_of_week']).intersection(m2['days_of_week']):
-        return False
-    return not (m1['end_time'] <= m2['start_time'] or m2['end_time'] <= m1['start_time'])
-
-
 def create_term_sequence(start_q: str, start_y: int, end_q: str, end_y: int) -> List[str]:
     seasons = ["Fall", "Winter", "Spring"]
     seq: List[str] = []
@@ -112,18 +215,69 @@ def create_term_sequence(start_q: str, start_y: int, end_q: str, end_y: int) ->
     return seq
 
 
-def quarter_prefixes(prereq_logic: Dict[str, List[Tuple[str, str, str, str]]],
-                     k: int, allow_warnings: bool) -> List[List[str]]:
+def term_position(term: str) -> int:
+    """Calendar index of a term label: 'Fall 2024' < 'Winter 2025' < 'Spring 2025' < 'Fall 2025'."""
+    season, year = term.split()
+    return int(year) * 3 + {"Winter": -2, "Spring": -1, "Fall": 0}[season]
+
+
+def preference_scores(pack, req: PlanRequest):
+    """Every packed section's score under `req`'s preferences (see section_scoring)."""
+    weight_map = {p: len(req.pref_priority) - i for i, p in enumerate(req.pref_priority)}
+    return score_sections(pack, weight_map, req.pref_earliest, req.pref_latest,
+                          req.pref_buildings, req.pref_no_days, req.pref_instructors)
+
+
+def first_affected_term(delta: Dict, terms: List[str], prior_schedule: Dict[str, object],
+                        added: Set[str], unblocked: Set[str], first_offered: Dict[str, int],
+                        max_per_term: int) -> int:
+    """Index of the earliest term a replan has to recompute; the terms before
+    it are kept from the prior plan as they are.
+
+    A changed grade or removed course frees its slot in the prior plan (or
+    anywhere, if it was not placed). A changed grade also changes what the
+    courses mentioning it (`unblocked`) wait for, so each may now land as
+    early as the first term it is offered. An added course can land no
+    earlier than the first term it or a newly required prerequisite (`added`)
+    is offered, and a new RESOLVE slot can land in any term with a FILLER or
+    room to spare. Preference changes touch every term.
+    """
+    if list(prior_schedule) != terms or delta.get('preferences'):
+        return 0
+    where: Dict[str, int] = {}
+    for t_idx, term in enumerate(terms):
+        for c in prior_schedule[term]:
+            where.setdefault(c, t_idx)
+            where.setdefault(re.sub(r' #\d+$', '', c), t_idx)
+    first = len(terms)
+    for c in delta.get('transcript', {}):
+        first = min(first, where.get(c, 0))
+    for c in delta.get('remove_courses', []):
+        if c.startswith("RESOLVE:"):
+            c = re.sub(r' #\d+$', '', c[8:].strip())
+        first = min(first, where.get(c, len(terms)))
+    for c in added | unblocked:
+        first = min(first, first_offered.get(c, 0))
+    if any(c.startswith("RESOLVE:") for c in delta.get('add_courses', [])):
+        first = min(first, next((i for i, term in enumerate(terms)
+                                 if FILLER_COURSE in prior_schedule[term]
+                                 or len(prior_schedule[term]) < max_per_term), len(terms)))
+    return first
+
+
+def first_term_candidates(prereq_logic: Dict[str, List[Tuple[str, str, str, str]]],
+                          allow_warnings: bool,
+                          transcript: Dict[str, Optional[str]]) -> List[str]:
     """Top-level helper used only when choosing the *very first* quarter.
-    Unchanged – it still enumerates all prerequisite-satisfying sets of k courses
-    that are currently available, *ignoring term offerings*. We filter by term
-    availability later (see build_schedule).
+    Returns every course whose prerequisites are already satisfied, *ignoring
+    term offerings*. build_schedule filters by term availability and searches
+    for the best conflict-free assignment (see term_search.best_assignment).
     """
     nodes = set(prereq_logic.keys())
     for reqs in prereq_logic.values():
         for c, *_ in reqs:
             nodes.add(c)
-    passed = {c for c, g in TRANSCRIPT.items() if g and meets_min_grade(g, 'D-')}
+    passed = {c for c, g in transcript.items() if g and meets_min_grade(g, 'D-')}
     nodes -= passed
     indegree = {n: 0 for n in nodes}
     for course, reqs in prereq_logic.items():
@@ -133,22 +287,25 @@ def quarter_prefixes(prereq_logic: Dict[str, List[Tuple[str, str, str, str]]],
             if rc in indegree and typ in ('prerequisite', 'corequisite') and (
                 sev == 'R' or (sev == 'W' and not allow_warnings)):
                 indegree[course] += 1
-    avail = sorted(n for n, d in indegree.items() if d == 0)
-    if len(avail) < k:
-        return [avail]
-    return [list(cmb) for cmb in combinations(avail, k)]
+    return sorted(n for n, d in indegree.items() if d == 0)
 
 # ───── CORE SCHEDULER ─────
 
-def build_schedule(start_y: int, start_q: str,
-                   end_y: int, end_q: str,
-                   allow_warnings: bool) -> Tuple[Dict[str, object], Optional[str]]:
-    global COURSES_TO_SCHEDULE
+def build_schedule(req: PlanRequest, cache: Optional[CatalogCache] = None,
+                   profile=NULL_PROFILE, score_as: Optional[PlanRequest] = None
+                   ) -> Tuple[Dict[str, object], Optional[str], Dict[str, Dict]]:
+    started = time.perf_counter()
+    allow_warnings = req.allow_warnings
+    max_per_term, least_per_term = req.max_courses_per_term, req.least_courses_per_term
+    # Section searches stop at the deadline with the best pick found so far
+    time_budget_ms = req.time_budget_ms
+    deadline = started + time_budget_ms / 1000 if time_budget_ms else None
+    search_stats = new_search_stats(detail=profile.enabled)
     
     # Separate RESOLVE requirements from regular courses and count them
     resolve_reqs = []
     resolve_counts = {}
-    for course in COURSES_TO_SCHEDULE:
+    for course in req.courses_to_schedule:
         if course.startswith("RESOLVE:"):
             # Extract the base requirement name by removing "RESOLVE: " and any trailing " #N"
             full_req_name = course[8:].strip()  # Skip "RESOLVE: "
@@ -156,140 +313,284 @@ def build_schedule(start_y: int, start_q: str,
             base_req_name = re.sub(r' #\d+$', '', full_req_name)
             resolve_counts[base_req_name] = resolve_counts.get(base_req_name, 0) + 1
             resolve_reqs.append(base_req_name)  # Store without prefix and number
-    regular_courses = [c for c in COURSES_TO_SCHEDULE if not c.startswith("RESOLVE:")]
-    
-    # First build schedule with regular courses
-    original_courses = COURSES_TO_SCHEDULE[:]
-    COURSES_TO_SCHEDULE = regular_courses
+    # The regular courses are scheduled first; RESOLVE slots are placed after
+    regular_courses = [c for c in req.courses_to_schedule if not c.startswith("RESOLVE:")]
 
     # term labels & DB ids -----------------------------------------------------
-    terms = create_term_sequence(start_q, start_y, end_q, end_y)
+    terms = create_term_sequence(req.start_quarter, req.start_year, req.end_quarter, req.end_year)
 
-    supa = create_client(SUPABASE_URL, SUPABASE_KEY)
+    supa = get_supabase(SUPABASE_URL, SUPABASE_KEY)
+    cache = cache or get_catalog_cache()
+    # Reads go through safe_execute; a profiled plan also counts them per table
+    db = lambda table: profile.execute(table, safe_execute)
 
-    term_rows = safe_execute(supa.table("terms").select("term_name,id")).data
-    db_map = {r['term_name'].split()[0]: r['id'] for r in term_rows}
-    idx2db = [db_map.get(lbl.split()[0]) for lbl in terms]
+    load_terms = lambda: cache.table(
+        "terms", lambda: db("terms")(supa.table("terms").select("term_name,id")).data
+    )
+    load_subjects = lambda: cached_subjects(supa, cache, db("subjects"))
+    # With ASYNC_FETCH the independent reads run together and are timed
+    fetch_timings = FetchTimings() if ASYNC_FETCH else None
+    if fetch_timings:
+        got = fetch_timings.run(concurrently(fetch_timings, terms=load_terms, subjects=load_subjects))
+        term_rows, subs = got['terms'], got['subjects']
+    else:
+        term_rows, subs = load_terms(), load_subjects()
+    # A planned term uses its own published term when there is one; otherwise
+    # the most recent published term of the same season stands in for it
+    published = {r['term_name']: r['id'] for r in term_rows}
+    db_map: Dict[str, int] = {}
+    for r in sorted(term_rows, key=lambda r: term_year(r['term_name'])):
+        db_map[term_season(r['term_name'])] = r['id']
+    idx2db = [published.get(lbl, db_map.get(term_season(lbl))) for lbl in terms]
+    db_season = {r['id']: term_season(r['term_name']) for r in term_rows}
 
     # Track scheduling failures
     scheduling_failures = {}
 
+    profile.mark("catalog")
+
     # subject mappings --------------------------------------------------------
-    subs = safe_execute(supa.table("subjects").select("id,code,name")).data
     sub2id = {s['code']: s['id'] for s in subs}
     id2sub = {s['id']: s['code'] for s in subs}
-    name2sub = {re.sub(r"\s*\(.*\)$", "", s['name']).strip().upper(): s['code'] for s in subs}
+    name2sub = {s['match_name']: s['code'] for s in subs}
 
     # remove passed courses ---------------------------------------------------
-    passed = {c for c, g in TRANSCRIPT.items() if g and meets_min_grade(g, 'D-')}
-    required: Set[str] = set(COURSES_TO_SCHEDULE) - passed
-    transcript = TRANSCRIPT.copy()
+    transcript = req.transcript
+    passed = {c for c, g in transcript.items() if g and meets_min_grade(g, 'D-')}
+    required: Set[str] = set(regular_courses) - passed
 
     # ───── 1. Fetch course rows ---------------------------------------------
-    def fetch_courses(keys: List[str]):
-        pairs = [k.split("|", 1) for k in keys]
-        ids, nums = zip(*[(sub2id[d], n) for d, n in pairs])
-        return safe_execute(
-            supa.table("courses")
-                .select("id,subject_id,catalog_number,course_requisites")
-                .in_("subject_id", list(ids))
-                .in_("catalog_number", list(nums))
-        ).data
-
-    # ───── 2. Build prerequisite logic --------------------------------------
-    prereq_logic: Dict[str, List[Tuple[str, str, str, str]]] = {}
-    queue = list(required)
-    while queue:
-        c = queue.pop(0)
-        rows = fetch_courses([c])
-        raw = rows[0].get('course_requisites') if rows else {}
-        clauses = to_dnf(raw or {})
+    # Batches are load_courses calls; select_in may chunk and page one batch
+    # into several requests, each counted as a round trip
+    round_trips = {'batches': 0, 'requests': 0}
+    round_trips_lock = threading.Lock()
+
+    def count_request(req):
+        with round_trips_lock:
+            round_trips['requests'] += 1
+        return db("courses")(req)
+
+    def load_courses(keys: List[str]) -> Dict[str, List[Dict]]:
+        """One batched read (see bulk_fetch) for any number of SUBJ|NUM keys.
+        The two in_() filters match the cross product of subjects and numbers,
+        so rows are trimmed back to the keys that were actually asked for.
+        """
+        wanted = {}
+        for k in keys:
+            dept, num = k.split("|", 1)
+            if dept in sub2id:
+                wanted[(sub2id[dept], num)] = k
+        if not wanted:
+            return {}
+        round_trips['batches'] += 1
+        ids = sorted({sid for sid, _ in wanted})
+        nums = sorted({num for _, num in wanted})
+        rows = select_in(supa, "courses", COURSE_COLUMNS, "catalog_number", nums,
+                         where={"subject_id": ids}, execute=count_request)
+        found: Dict[str, List[Dict]] = {}
+        for r in rows:
+            k = wanted.get((r['subject_id'], r['catalog_number']))
+            if k:
+                found.setdefault(k, []).append(r)
+        return found
+
+    def fetch_courses(keys: List[str]) -> List[Dict]:
+        by_key = cache.fetch("courses", keys, load_courses)
+        return [rows[0] for rows in by_key.values() if rows]
+
+    def leaf_key(leaf: Dict) -> Optional[str]:
+        """SUBJ|NUM of a requisite leaf, or None when it names no known course."""
+        if 'course' not in leaf:
+            return None
+        parts = leaf['course'].strip().rstrip(')').rsplit(' ', 1)
+        if len(parts) != 2:
+            return None
+        code = name2sub.get(parts[0].upper())
+        return f"{code}|{parts[1].upper()}" if code else None
+
+    def leaf_passed(leaf: Dict) -> bool:
+        ukey = leaf_key(leaf)
+        return ukey is None or meets_min_grade(transcript.get(ukey, 'F'), leaf.get('min_grade', 'F'))
+
+    def select_clause(course: str, raw: Optional[Dict]
+                      ) -> Tuple[List[Tuple[str, str, str, str]], List[str], Set[str], bool]:
+        """Pick the DNF clause with the fewest unmet courses (first fully met wins).
+        Also returns every course any clause mentions: only their grades can
+        change the pick, which is what lets a replan reuse it. The last item
+        says the clause list was truncated (see requisites.Clauses); the
+        transcript is then checked against the whole tree before any course
+        is scheduled for it."""
+        clauses = compile_requisites(raw, course, cache.version)
         best_clause, best_missing = [], []
         min_miss = float('inf')
+        mentioned: Set[str] = set()
         for clause in clauses:
             parsed, missing = [], []
             for leaf in clause:
-                if 'course' not in leaf:
-                    continue
-                txt = leaf['course'].strip().rstrip(')')
-                parts = txt.rsplit(' ', 1)
-                if len(parts) != 2:
-                    continue
-                dept, num = parts
-                code = name2sub.get(dept.upper())
-                if not code:
+                ukey = leaf_key(leaf)
+                if ukey is None:
                     continue
-                ukey = f"{code}|{num.upper()}"
+                mentioned.add(ukey)
                 parsed.append((ukey, leaf['relation'], leaf.get('min_grade', 'D-'), leaf.get('severity')))
-                if not meets_min_grade(transcript.get(ukey, 'F'), leaf.get('min_grade', 'F')):
+                if not leaf_passed(leaf):
                     missing.append(ukey)
-            if not missing:
-                best_clause, best_missing = parsed, []
-                break
             if len(missing) < min_miss:
                 best_clause, best_missing, min_miss = parsed, missing, len(missing)
-        prereq_logic[c] = best_clause
-        for u in best_missing:
-            if u not in required:
-                required.add(u)
-                queue.append(u)
+        if clauses.truncated:
+            mentioned |= {k for k in map(leaf_key, requisite_leaves(raw)) if k}
+            if best_missing and requisites_met(raw, leaf_passed):
+                best_clause, best_missing = [], []
+        return best_clause, best_missing, mentioned, clauses.truncated
+
+    # ───── 2. Build prerequisite logic --------------------------------------
+    # Level-synchronous BFS: every course on the current frontier is fetched in
+    # a single query, so round trips grow with prerequisite depth, not course count.
+    # A replan seeds it with its predecessor's per-course picks and only
+    # recomputes (and fetches) courses whose requisites mention a changed grade.
+    seed = memo_get((cache.version, req.prior_key)) if req.prior_key else None
+    seed = seed or {}
+    regraded = set(req.delta.get('transcript', {}))
+    closure: Dict[str, Tuple[List[Tuple[str, str, str, str]], List[str], Set[str]]] = {}
+    prereq_logic: Dict[str, List[Tuple[str, str, str, str]]] = {}
+    closure_levels = 0
+    frontier = sorted(required)
+    while frontier:
+        stale = [c for c in frontier if c not in seed or seed[c][2] & regraded]
+        rows = fetch_courses(stale) if stale else []
+        closure_levels += 1
+        raw_by_key = {
+            f"{id2sub[r['subject_id']]}|{r['catalog_number']}": r.get('course_requisites')
+            for r in rows
+        }
+        stale = set(stale)
+        next_frontier: Set[str] = set()
+        for c in frontier:
+            closure[c] = select_clause(c, raw_by_key.get(c)) if c in stale else seed[c]
+            best_clause, best_missing, _, _ = closure[c]
+            prereq_logic[c] = best_clause
+            for u in best_missing:
+                if u not in required:
+                    required.add(u)
+                    next_frontier.add(u)
+        frontier = sorted(next_frontier)
+    memo_put((cache.version, req.key), closure)
+    closure_reused = sum(1 for c in closure if c in seed and not seed[c][2] & regraded)
+    closure_stats = {
+        'round_trips': round_trips['requests'],
+        'batches': round_trips['batches'],
+        'levels': closure_levels,
+        'courses': len(prereq_logic),
+    }
+    truncated = sorted(c for c, entry in closure.items() if entry[3])
+    if truncated:
+        # Their picks came from the MAX_CLAUSES smallest clauses only
+        closure_stats['truncated_requisites'] = truncated
+
+    profile.mark("prereq_closure")
 
     # ───── 3. Fetch sections + meetings -------------------------------------
     all_courses = fetch_courses(list(required))
     cid2key = {c['id']: f"{id2sub[c['subject_id']]}|{c['catalog_number']}" for c in all_courses}
 
-    secs = safe_execute(
-        supa.table("sections").select(
-            "id,course_id,term_id,section_code,is_primary,activity," +
-            "enrollment_cap,enrollment_total,waitlist_cap,waitlist_total"
-        ).in_("course_id", [c['id'] for c in all_courses])
-    ).data
-
-    mt = safe_execute(
-        supa.table("meeting_times").select(
-            "section_id,days_of_week,start_time,end_time,building,room"
-        ).in_("section_id", [s['id'] for s in secs])
-    ).data
-
-    si = safe_execute(
-        supa.table("section_instructors").select("section_id,instructor_id")
-            .in_("section_id", [s['id'] for s in secs])
-    ).data
-
-    # ───── 3a. Map meeting times & instructors ------------------------------
-    mt_map, si_map = {}, {}
-    for m in mt:
-        m['start_time'] = datetime.strptime(m['start_time'], "%H:%M:%S").time()
-        m['end_time'] = datetime.strptime(m['end_time'], "%H:%M:%S").time()
-        mt_map.setdefault(m['section_id'], []).append(m)
-
-    instr_ids = {r['instructor_id'] for r in si}
-    instr_rows = safe_execute(
-        supa.table("instructors").select("id,name").in_("id", list(instr_ids))
-    ).data
-    id2instr = {r['id']: r['name'] for r in instr_rows}
-    for r in si:
-        si_map.setdefault(r['section_id'], []).append(id2instr[r['instructor_id']])
+    # The offering index says which seasons teach each course, so sections
+    # are only fetched for (course, term) pairs the plan can actually use.
+    # A course the index has no row for (added since the index was last
+    # refreshed) falls back to reading its sections in every planned term.
+    offerings = cache.fetch(
+        "course_offerings", [c['id'] for c in all_courses],
+        lambda ids: group_rows(select_in(
+            supa, "course_offerings", OFFERING_COLUMNS, "course_id", ids,
+            order=("course_id", "season"), execute=db("course_offerings")
+        ), 'course_id')
+    )
+    plan_terms = sorted({db for db in idx2db if db is not None})
+    pairs = [
+        (c['id'], db) for c in all_courses for db in plan_terms
+        if not offerings[c['id']] or any(o['season'] == db_season[db] for o in offerings[c['id']])
+    ]
+
+    def load_term_sections(keys: List[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Dict]]:
+        # Both in_() filters match a cross product; keep the asked-for pairs
+        wanted = set(keys)
+        rows = select_in(supa, "sections", SECTION_COLUMNS, "course_id", {cid for cid, _ in keys},
+                         where={"term_id": sorted({tid for _, tid in keys})},
+                         execute=db("sections"))
+        found: Dict[Tuple[int, int], List[Dict]] = {}
+        for r in rows:
+            if (r['course_id'], r['term_id']) in wanted:
+                found.setdefault((r['course_id'], r['term_id']), []).append(r)
+        return found
+
+    loaders = {
+        "term_sections": load_term_sections,
+        "meeting_times": lambda ids: group_rows(select_in(
+            supa, "meeting_times", MEETING_COLUMNS, "section_id", ids, execute=db("meeting_times")
+        ), 'section_id'),
+        "section_instructors": lambda ids: group_rows(select_in(
+            supa, "section_instructors", "section_id,instructor_id", "section_id", ids,
+            order=("section_id", "instructor_id"), execute=db("section_instructors")
+        ), 'section_id'),
+        "instructors": lambda ids: group_rows(select_in(
+            supa, "instructors", "id,name", "id", ids, execute=db("instructors")
+        ), 'id'),
+    }
+
+    def read(table: str, keys: List) -> List[Dict]:
+        return [r for rows in cache.fetch(table, keys, loaders[table]).values() for r in rows]
+
+    if PLANNING_BUNDLE:
+        # One RPC returns the sections with meetings and instructor names joined
+        secs, mt, si_map = unbundle(cache.fetch(
+            "planning_bundle", pairs, lambda keys: load_bundle(supa, keys, db("planning_bundle"))))
+    else:
+        if fetch_timings:
+            # Meetings and instructors of each chunk of sections are read as
+            # soon as that chunk arrives
+            secs, mt, si, instr_rows = fetch_timings.run(
+                sections_pipeline(cache, pairs, loaders, fetch_timings))
+        else:
+            secs = read("term_sections", pairs)
+            mt = read("meeting_times", [s['id'] for s in secs])
+            si = read("section_instructors", [s['id'] for s in secs])
+            instr_rows = read("instructors", sorted({r['instructor_id'] for r in si}))
+        id2instr = {r['id']: r['name'] for r in instr_rows}
+        si_map = {}
+        for r in si:
+            si_map.setdefault(r['section_id'], []).append(id2instr[r['instructor_id']])
+
+    profile.mark("sections_fetch")
+
+    # ───── 3a. Compact section model ----------------------------------------
+    # Built once from the rows above: slotted records, integer minutes and
+    # CSR meeting arrays (see section_model.py); rows are not touched again
+    store = SectionStore.build(secs, mt, si_map)
 
     # ───── 3b. Group sections by course -------------------------------------
-    sections_by_course: Dict[str, List[Dict]] = {}
-    for s in secs:
-        key = cid2key[s['course_id']]
-        # Skip if section + waitlist both full
-        if s['enrollment_total'] >= s['enrollment_cap'] and s['waitlist_total'] >= s['waitlist_cap']:
+    sections_by_course: Dict[str, List[Section]] = {}
+    for sec in store.sections:
+        if sec.is_full():
             continue
-        s['times'] = mt_map.get(s['id'], [])
-        s['instructors'] = si_map.get(s['id'], [])
-        sections_by_course.setdefault(key, []).append(s)
+        sections_by_course.setdefault(cid2key[sec.course_id], []).append(sec)
 
     # ───── 3c. Pre-compute offering terms per course ------------------------
     offer_terms_by_course: Dict[str, Set[int]] = {}
     for c, sec_list in sections_by_course.items():
-        offer_terms_by_course[c] = {sec['term_id'] for sec in sec_list}
+        offer_terms_by_course[c] = {sec.term_id for sec in sec_list}
         # Track courses with no sections
         if not sec_list:
             scheduling_failures[c] = "No available sections found"
 
+    profile.mark("section_model")
+
+    # ───── 3d. Rank sections per (course, term) -----------------------------
+    # Every open section is packed and scored in one vectorized pass, then
+    # ranked into lecture/discussion options per (course, term_id) once
+    section_pack = pack_sections(sections_by_course)
+    section_scores = preference_scores(section_pack, req)
+    section_table = rank_sections(section_pack, section_scores)
+
+    profile.mark("scoring")
+
     # ───── 4. Build prereq DAG ---------------------------------------------
     adj = {c: [] for c in required}
     indegree = {c: 0 for c in required}
@@ -310,50 +611,88 @@ def build_schedule(start_y: int, start_q: str,
     T_left = len(terms)
     schedule: Dict[str, object] = {}
 
-    # ───── 4a. Preference weights ------------------------------------------
-    weight_map = {p: len(PREF_PRIORITY) - i for i, p in enumerate(PREF_PRIORITY)}
-
-    # ───── 4b. Scoring helper for the *first* term -------------------------
+    # ───── 4c. Replan: how many leading terms to keep -----------------------
+    keep = 0
+    prior_schedule: Dict[str, object] = {}
+    if req.prior_plan is not None:
+        prior_schedule = req.prior_plan.get('schedule', req.prior_plan)
+        placed = {c for ent in prior_schedule.values() for c in ent}
+        # Required courses whose requisites mention a regraded course (and the
+        # regraded ones still required): their prerequisites changed
+        unblocked = {c for c in required if c in regraded or closure[c][2] & regraded}
+        # Added courses plus whatever prerequisites of theirs, or of a course
+        # whose pick changed, the prior plan lacks
+        added: Set[str] = set()
+        stack = [c for c in req.delta.get('add_courses', []) if c in required]
+        stack += [rc for c in unblocked for rc, *_ in prereq_logic.get(c, []) if rc in required]
+        while stack:
+            c = stack.pop()
+            if c in added or c in placed:
+                continue
+            added.add(c)
+            stack += [rc for rc, *_ in prereq_logic.get(c, []) if rc in required]
+        first_offered = {
+            c: next((i for i, db in enumerate(idx2db) if db in offer_terms_by_course.get(c, ())),
+                    len(terms))
+            for c in added | unblocked
+        }
+        keep = first_affected_term(req.delta, terms, prior_schedule, added, unblocked,
+                                   first_offered, max_per_term)
+
+    # ───── 4a. Scoring helper for the *first* term's fallback --------------
     def score_and_select(prefix: List[str]) -> Tuple[int, Dict[str, Dict]]:
         total = 0
         sel = {}
         for course in prefix:
-            best_sec, best_sec_sc = None, -1
-            best_disc, best_disc_sc = None, -1
-
-            for sec in sections_by_course.get(course, []):
-                if sec['term_id'] != idx2db[0]:
-                    continue  # Not offered in the first term
-
-                sc = 0
-                for m in sec['times']:
-                    if PREF_EARLIEST <= m['start_time'] <= PREF_LATEST:
-                        sc += weight_map['time']
-                    if PREF_EARLIEST <= m['end_time'] <= PREF_LATEST:
-                        sc += weight_map['time']
-                    if m['building'] in PREF_BUILDINGS:
-                        sc += weight_map['building']
-                    if set(m['days_of_week']).isdisjoint(PREF_NO_DAYS):
-                        sc += weight_map['days']
-                if any(i in PREF_INSTRUCTORS for i in sec['instructors']):
-                    sc += weight_map['instructor']
-
-                if sec['is_primary']:
-                    if sc > best_sec_sc:
-                        best_sec_sc, best_sec = sc, sec
-                else:
-                    if sc > best_disc_sc:
-                        best_disc_sc, best_disc = sc, sec
-
+            options = section_table.get((course, idx2db[0]))
             # Skip courses that actually have *no* meeting in this term
-            if not best_sec and not best_disc:
+            if not options:
                 scheduling_failures[course] = "No available sections in this term"
                 continue
-
-            sel[course] = {'lecture': best_sec, 'discussion': best_disc}
-            total += max(0, best_sec_sc) + max(0, best_disc_sc)
+            sc, best = options[0]
+            sel[course] = dict(best)
+            total += sc
         return total, sel
 
+    # ───── 4b. Section search for one term ---------------------------------
+    def assign_sections(candidates: List[str], term_id, sizes: List[Tuple[int, int]],
+                        keep_order: bool = False) -> Optional[Dict[str, Dict]]:
+        """Best conflict-free courses + sections for one term.
+
+        Tries each (min, max) size range in order with term_search.best_assignment
+        over the ranked section table; if every admissible set clashes, falls back
+        to the best-scoring set of the first range, ignoring conflicts. With
+        `keep_order`, earlier candidates always win over later ones and the
+        preference score only breaks ties and picks the sections.
+        """
+        options = {c: section_table[(c, term_id)] for c in candidates}
+        if keep_order:
+            span = sum(opts[0][0] for opts in options.values()) + 1
+            n = len(candidates)
+            options = {
+                c: [(sc + span * (1 << (n - 1 - i)), sel) for sc, sel in options[c]]
+                for i, c in enumerate(candidates)
+            }
+        conflicts, blocked = conflict_graph(
+            {c: opts[0][1] for c, opts in options.items()},
+            req.allow_primary_conflicts, req.allow_secondary_conflicts, search_stats,
+        )
+        for course in sorted(blocked | {c for c, others in conflicts.items() if others}):
+            if course not in scheduling_failures:
+                scheduling_failures[course] = "Schedule conflicts with other courses"
+        for lo, hi in sizes:
+            picks = best_assignment(candidates, options, lo, hi,
+                                    req.allow_primary_conflicts, req.allow_secondary_conflicts,
+                                    deadline, search_stats)
+            if picks is not None:
+                return picks
+        # Every admissible set conflicts (or none was found in time);
+        # fall back to the best-scoring one
+        return best_assignment(candidates, options, sizes[0][0], sizes[0][1], True, True,
+                               deadline, search_stats)
+
+    profile.mark("dag")
+
     # ───── 5. Assign term-by-term -----------------------------------------
     for t_idx, term in enumerate(terms):
         term_db_id = idx2db[t_idx]
@@ -367,84 +706,55 @@ def build_schedule(start_y: int, start_q: str,
         base = R_rem // T_left
         extra = R_rem % T_left
         target = max(
-            LEAST_COURSES_PER_TERM,
-            min(base + (1 if extra > 0 else 0), MAX_COURSES_PER_TERM)
+            least_per_term,
+            min(base + (1 if extra > 0 else 0), max_per_term)
         )
 
-        if term == terms[0]:
-            # Build prerequisite-compatible prefixes, then discard courses without offerings
-            prefixes_raw = quarter_prefixes(prereq_logic, target, allow_warnings)
-            prefixes = [
-                [c for c in pref if term_db_id in offer_terms_by_course.get(c, set())]
-                for pref in prefixes_raw
-            ]
-            
-            # Filter out prefixes that don't meet minimum course requirement
-            prefixes = [p for p in prefixes if len(p) >= LEAST_COURSES_PER_TERM]
-            
-            if not prefixes:
-                # If no valid prefixes found, try to find any combination of available courses
-                prefixes = [[c for c in avail if term_db_id in offer_terms_by_course.get(c, set())][:target]]
-                if not prefixes[0]:
+        if t_idx < keep:
+            # Kept from the prior plan verbatim; only its effect on the DAG is replayed
+            schedule[term] = prior_schedule[term]
+            take = [c for c in prior_schedule[term] if c in remaining]
+        elif term == terms[0]:
+            # Prerequisite-ready courses (ignoring offerings), narrowed to this term's
+            ready = first_term_candidates(prereq_logic, allow_warnings, transcript)
+            offered = [c for c in ready if term_db_id in offer_terms_by_course.get(c, set())]
+
+            # Set sizes the old prefix enumeration could produce: a k-subset of
+            # `ready` minus whatever in it is not offered, and never below the floor
+            if len(ready) < target:
+                min_size = max_size = len(offered)
+            else:
+                min_size = max(0, target - (len(ready) - len(offered)))
+                max_size = min(target, len(offered))
+            min_size = max(min_size, least_per_term, 1)
+
+            picks = None
+            if min_size <= max_size:
+                picks = assign_sections(offered, term_db_id, [(min_size, max_size)])
+
+            if picks is None:
+                # No admissible set at all, try any combination of available courses
+                take = avail[:target]
+                if not take:
                     for course in avail:
                         if course not in scheduling_failures:
                             scheduling_failures[course] = "No valid schedule combinations found"
-            
-            scored = [
-                (sc, sel, pf)
-                for pf in prefixes
-                for sc, sel in [score_and_select(pf)]
-            ]
-
-            # Filter out prefixes that ended up empty (no offered courses)
-            scored = [tpl for tpl in scored if tpl[2]] or [scored[0]]
-
-            # Conflict checks (identical to original)
-            valid = []
-            for sc, sel, pf in scored:
-                conflict = False
-                conflict_courses = set()
-
-                if not ALLOW_PRIMARY_CONFLICTS:
-                    lec_list = [sel[c]['lecture'] for c in pf if sel[c]['lecture']]
-                    for i in range(len(lec_list)):
-                        for j in range(i + 1, len(lec_list)):
-                            for m1 in lec_list[i]['times']:
-                                for m2 in lec_list[j]['times']:
-                                    if meetings_overlap(m1, m2):
-                                        conflict = True
-                                        conflict_courses.add(pf[i])
-                                        conflict_courses.add(pf[j])
-                if not conflict and not ALLOW_SECONDARY_CONFLICTS:
-                    dis_list = [sel[c]['discussion'] for c in pf if sel[c]['discussion']]
-                    for i in range(len(dis_list)):
-                        for j in range(i + 1, len(dis_list)):
-                            for m1 in dis_list[i]['times']:
-                                for m2 in dis_list[j]['times']:
-                                    if meetings_overlap(m1, m2):
-                                        conflict = True
-                                        conflict_courses.add(pf[i])
-                                        conflict_courses.add(pf[j])
-                    lec_list = [sel[c]['lecture'] for c in pf if sel[c]['lecture']]
-                    for lec in lec_list:
-                        for d in dis_list:
-                            for m1 in lec['times']:
-                                for m2 in d['times']:
-                                    if meetings_overlap(m1, m2):
-                                        conflict = True
-                                        conflict_courses.add(pf[i])
-                                        conflict_courses.add(pf[j])
-                if not conflict:
-                    valid.append((sc, sel, pf))
-                else:
-                    for course in conflict_courses:
-                        if course not in scheduling_failures:
-                            scheduling_failures[course] = "Schedule conflicts with other courses"
-            choices = valid or scored
-            best_sc, best_sel, take = max(choices, key=lambda x: x[0])
+                _, best_sel = score_and_select(take)
+            else:
+                take = list(picks)
+                best_sel = {c: dict(sel) for c, sel in picks.items()}
             schedule[term] = best_sel
+        elif avail:
+            # Later terms get the same section-level search: as many ready courses
+            # as fit without conflicts (up to target), taken in `avail` order as
+            # before, with the best-scoring sections that fit together
+            size = min(target, len(avail))
+            picks = assign_sections(avail, term_db_id, [(k, k) for k in range(size, 0, -1)],
+                                    keep_order=True)
+            take = list(picks)
+            schedule[term] = {c: dict(sel) for c, sel in picks.items()}
         else:
-            take = avail[:target]
+            take = []
             schedule[term] = take
 
         # Update prereq DAG state -------------------------------------------
@@ -455,21 +765,28 @@ def build_schedule(start_y: int, start_q: str,
         R_rem = len(remaining)
         T_left -= 1
 
+    profile.mark("search")
+
     # ───── 6. Pad / trim each term ----------------------------------------
-    for term in terms:
+    # A dict term can only hold one FILLER key, so remember how many slots it stands for
+    filler_slots: Dict[str, int] = {}
+    for term in terms[keep:]:
         ent = schedule[term]
         if isinstance(ent, list):
-            while len(ent) < LEAST_COURSES_PER_TERM:
+            while len(ent) < least_per_term:
                 ent.append(FILLER_COURSE)
-            schedule[term] = ent[:MAX_COURSES_PER_TERM]
+            schedule[term] = ent[:max_per_term]
         else:
             keys = list(ent.keys())
-            while len(keys) < LEAST_COURSES_PER_TERM:
+            filler_slots[term] = max(0, least_per_term - len(keys))
+            while len(keys) < least_per_term:
                 keys.append(FILLER_COURSE)
                 ent[FILLER_COURSE] = {'lecture': None, 'discussion': None}
-            for extra in keys[MAX_COURSES_PER_TERM:]:
+            for extra in keys[max_per_term:]:
                 ent.pop(extra, None)
-            schedule[term] = {k: ent[k] for k in keys[:MAX_COURSES_PER_TERM]}
+            schedule[term] = {k: ent[k] for k in keys[:max_per_term]}
+
+    profile.mark("pad_trim")
 
     # ───── 7. Compute note --------------------------------------------------
     scheduled_all = set()
@@ -478,9 +795,25 @@ def build_schedule(start_y: int, start_q: str,
             scheduled_all |= set(ent.keys())
         else:
             scheduled_all |= set(ent)
-    unscheduled = set(COURSES_TO_SCHEDULE) - scheduled_all
+    unscheduled = set(regular_courses) - scheduled_all
     unscheduled -= passed  # remove previously passed courses
 
+    # Plan quality, before RESOLVE slots are spread over the later terms:
+    # terms up to the last real course and the chosen sections' total score,
+    # under `score_as`'s preferences when given so plans compare on one scale
+    outcome_scores = section_scores if score_as is None else preference_scores(section_pack, score_as)
+    section_score = {sec.id: sc for sec, sc in zip(section_pack.sections, outcome_scores.tolist())}
+    terms_used, preference_score = 0, 0
+    for t_idx, term in enumerate(terms):
+        ent = schedule[term]
+        # Terms kept by a replan already hold RESOLVE slots; those are not courses
+        if any(c != FILLER_COURSE and re.sub(r' #\d+$', '', c) not in resolve_counts for c in ent):
+            terms_used = t_idx + 1
+        if isinstance(ent, dict):
+            for sel in ent.values():
+                preference_score += sum(section_score.get(sec.id if isinstance(sec, Section) else sec.get('id'), 0)
+                                        for sec in sel.values() if sec)
+
     note = None
     if unscheduled:
         # Create detailed explanation for each unscheduled course
@@ -490,29 +823,39 @@ def build_schedule(start_y: int, start_q: str,
             explanations.append(f"{course} ({reason})")
         note = "Unable to schedule: " + "; ".join(explanations)
 
-    # Restore original COURSES_TO_SCHEDULE
-    COURSES_TO_SCHEDULE = original_courses
-    
     # Now distribute RESOLVE requirements in sparse quarters
     # Initialize tracking of placed requirements
     placed_counts = {req: 0 for req in resolve_counts.keys()}
     unplaced_reqs = []
+    live_terms = terms[keep:]
+    # Slots in terms kept from a prior plan are already placed
+    for term in terms[:keep]:
+        for c in schedule[term]:
+            base_name = re.sub(r' #\d+$', '', c)
+            if base_name in placed_counts and placed_counts[base_name] < resolve_counts[base_name]:
+                placed_counts[base_name] += 1
+    kept_counts = dict(placed_counts)
     
     # First, replace FILLER courses with electives where possible
-    for term in terms:
+    for term in live_terms:
         term_courses = schedule[term]
         if isinstance(term_courses, dict):
-            # Find FILLER courses to replace
-            filler_keys = [k for k, v in term_courses.items() if k == FILLER_COURSE]
-            for filler in filler_keys:
-                # Try to find an unplaced requirement
-                for req_name in resolve_counts.keys():
-                    if placed_counts[req_name] < resolve_counts[req_name]:
-                        placed_count = placed_counts[req_name] + 1
-                        term_courses[f"{req_name} #{placed_count}"] = {'lecture': None, 'discussion': None}
-                        term_courses.pop(filler)
-                        placed_counts[req_name] = placed_count
+            # Replace every slot the FILLER key stands for, like the list case
+            slots = filler_slots.get(term, 0) if FILLER_COURSE in term_courses else 0
+            if slots:
+                filler = term_courses.pop(FILLER_COURSE)
+                while slots:
+                    # Try to find an unplaced requirement
+                    req_name = next((r for r in resolve_counts
+                                     if placed_counts[r] < resolve_counts[r]), None)
+                    if req_name is None:
                         break
+                    placed_count = placed_counts[req_name] + 1
+                    term_courses[f"{req_name} #{placed_count}"] = {'lecture': None, 'discussion': None}
+                    placed_counts[req_name] = placed_count
+                    slots -= 1
+                if slots:
+                    term_courses[FILLER_COURSE] = filler
         elif isinstance(term_courses, list):
             # Replace FILLER courses in list
             while FILLER_COURSE in term_courses:
@@ -530,7 +873,7 @@ def build_schedule(start_y: int, start_q: str,
 
     # Then, try to place remaining requirements, preferring later terms
     # Sort terms in reverse order (latest first)
-    remaining_terms = sorted(terms, reverse=True)
+    remaining_terms = sorted(live_terms, reverse=True)
     
     for term in remaining_terms:
         term_courses = schedule[term]
@@ -538,7 +881,7 @@ def build_schedule(start_y: int, start_q: str,
             current_count = len(term_courses)
             # Try to place requirements while respecting their counts
             for req_name in resolve_counts.keys():
-                while (current_count < MAX_COURSES_PER_TERM and 
+                while (current_count < max_per_term and 
                        placed_counts[req_name] < resolve_counts[req_name]):
                     placed_count = placed_counts[req_name] + 1
                     term_courses[f"{req_name} #{placed_count}"] = {'lecture': None, 'discussion': None}
@@ -548,7 +891,7 @@ def build_schedule(start_y: int, start_q: str,
             current_count = len(term_courses)
             # Try to place requirements while respecting their counts
             for req_name in resolve_counts.keys():
-                while (current_count < MAX_COURSES_PER_TERM and 
+                while (current_count < max_per_term and 
                        placed_counts[req_name] < resolve_counts[req_name]):
                     placed_count = placed_counts[req_name] + 1
                     term_courses.append(f"{req_name} #{placed_count}")
@@ -558,7 +901,7 @@ def build_schedule(start_y: int, start_q: str,
     # If we still have unplaced requirements, try one more pass from the beginning
     # but only for terms that have space and aren't just filled with electives
     if any(placed_counts[req] < resolve_counts[req] for req in resolve_counts):
-        for term in terms:
+        for term in live_terms:
             term_courses = schedule[term]
             if isinstance(term_courses, dict):
                 # Count non-elective courses in this term
@@ -566,7 +909,7 @@ def build_schedule(start_y: int, start_q: str,
                 if non_elective_count > 0:  # Only add to terms that have some real courses
                     current_count = len(term_courses)
                     for req_name in resolve_counts.keys():
-                        while (current_count < MAX_COURSES_PER_TERM and 
+                        while (current_count < max_per_term and 
                                placed_counts[req_name] < resolve_counts[req_name]):
                             placed_count = placed_counts[req_name] + 1
                             term_courses[f"{req_name} #{placed_count}"] = {'lecture': None, 'discussion': None}
@@ -577,7 +920,7 @@ def build_schedule(start_y: int, start_q: str,
                 if non_elective_count > 0:
                     current_count = len(term_courses)
                     for req_name in resolve_counts.keys():
-                        while (current_count < MAX_COURSES_PER_TERM and 
+                        while (current_count < max_per_term and 
                                placed_counts[req_name] < resolve_counts[req_name]):
                             placed_count = placed_counts[req_name] + 1
                             term_courses.append(f"{req_name} #{placed_count}")
@@ -594,13 +937,68 @@ def build_schedule(start_y: int, start_q: str,
             for i in range(remaining):
                 unplaced_reqs.append(f"{req_name} #{start_num + i}")
 
+    if keep:
+        # Slots were numbered on from the kept count; hand out the numbers the
+        # kept terms do not already use instead, so none appears twice
+        kept_labels = {c for term in terms[:keep] for c in schedule[term]}
+        free = {r: [f"{r} #{i}" for i in range(1, n + 1) if f"{r} #{i}" not in kept_labels]
+                for r, n in resolve_counts.items()}
+
+        def relabel(c: str) -> str:
+            m = re.match(r'(.*) #(\d+)$', c)
+            if not m or m.group(1) not in free:
+                return c
+            i = int(m.group(2)) - kept_counts[m.group(1)] - 1
+            return free[m.group(1)][i] if 0 <= i < len(free[m.group(1)]) else c
+
+        for term in live_terms:
+            ent = schedule[term]
+            schedule[term] = ({relabel(c): v for c, v in ent.items()} if isinstance(ent, dict)
+                              else [relabel(c) for c in ent])
+        unplaced_reqs = [relabel(c) for c in unplaced_reqs]
+
     if unplaced_reqs:
         if note:
             note += "; Also unable to schedule: " + ", ".join(sorted(unplaced_reqs))
         else:
             note = "Unable to schedule: " + ", ".join(sorted(unplaced_reqs))
 
-    return schedule, note
+    profile.mark("resolve")
+    if profile.enabled:
+        profile.search = {
+            'searches': search_stats['searches'],
+            'prefixes_enumerated': search_stats['nodes'],
+            'pruned': search_stats.pop('pruned'),
+            'conflict_checks': search_stats.pop('conflict_checks'),
+        }
+    search_stats.update({
+        'time_budget_ms': time_budget_ms,
+        'proven_optimal': search_stats['cut_short'] == 0,
+        # Share of the unpruned search space the searches visited
+        'explored': round(search_stats['nodes'] / search_stats['space'], 6) if search_stats['space'] else None,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    })
+    report = {
+        'prereq_closure': closure_stats,
+        'search': search_stats,
+        'outcome': {
+            'terms_used': terms_used,
+            'last_term': terms[terms_used - 1] if terms_used else None,
+            'preference_score': preference_score,
+            'unscheduled': len(unscheduled) + len(unplaced_reqs),
+        },
+    }
+    if fetch_timings:
+        report['fetch'] = fetch_timings.report()
+    if req.prior_plan is not None:
+        report['replan'] = {
+            'terms_reused': keep,
+            'terms_replanned': len(terms) - keep,
+            'first_replanned_term': terms[keep] if keep < len(terms) else None,
+            'closure_reused': closure_reused,
+            'closure_recomputed': len(closure) - closure_reused,
+        }
+    return schedule, note, report
 
 # ─────  Utility: format_schedule()  ─────
 
@@ -610,74 +1008,58 @@ def format_schedule(schedule: Dict[str, object]) -> Dict[str, object]:
         if isinstance(ent, dict):
             term_d = {}
 
-            def clean(sec: Optional[Dict]) -> Optional[Dict]:
-                if not sec:
-                    return None
-                slots = {}
-                for t in sec.get('times', []):
-                    key = (t['start_time'], t['end_time'], t['building'], t['room'])
-                    slots.setdefault(key, set()).add(t['days_of_week'])
-                times = []
-                for (st, en, bld, rm), days in slots.items():
-                    days_s = ''.join(sorted(days))
-                    times.append({
-                        'days': days_s,
-                        'start': st.strftime('%H:%M') if hasattr(st, 'strftime') else str(st),
-                        'end': en.strftime('%H:%M') if hasattr(en, 'strftime') else str(en),
-                        'building': bld,
-                        'room': rm
-                    })
-                return {
-                    'id': sec.get('id'),
-                    'section': sec.get('section_code'),
-                    'activity': sec.get('activity'),
-                    'enrollment_cap': sec.get('enrollment_cap'),
-                    'enrollment_total': sec.get('enrollment_total'),
-                    'waitlist_cap': sec.get('waitlist_cap'),
-                    'waitlist_total': sec.get('waitlist_total'),
-                    'times': times,
-                    'instructors': sec.get('instructors', [])
-                }
-
             for course, info in ent.items():
                 term_d[course] = {
-                    'lecture': clean(info.get('lecture')),
-                    'discussion': clean(info.get('discussion'))
+                    kind: section_json(info[kind]) if info.get(kind) else None
+                    for kind in ('lecture', 'discussion')
                 }
             out[term] = term_d
         else:
             out[term] = ent
     return out
 
+# ─────  Request entrypoint (CLI and python_worker) ─────
+
+def plan(req: PlanRequest, cache: Optional[CatalogCache] = None,
+         score_as: Optional[PlanRequest] = None) -> Dict[str, object]:
+    """Plan one parsed request and return the JSON-ready result.
+
+    `score_as` scores the outcome's preference_score under another request's
+    preferences (the plan itself still follows `req`'s).
+
+    Touches no module state besides the catalog cache (the process-wide one
+    unless `cache` is given) and the Supabase client, so it is safe to call
+    from several threads at once.
+    """
+    profile = PlanProfile() if req.profile else NULL_PROFILE
+    try:
+        sched, note, report = build_schedule(req, cache, profile, score_as)
+        # Terms kept by a replan are already in the prior plan's formatted shape
+        kept = list(sched)[:report.get('replan', {}).get('terms_reused', 0)]
+        formatted = format_schedule({t: e for t, e in sched.items() if t not in kept})
+        result = {
+            'schedule': {t: sched[t] if t in kept else formatted[t] for t in sched},
+            **report,
+        }
+        if note:
+            result['note'] = note
+        if profile.enabled:
+            profile.mark("format")
+            result['stats'] = profile.stats()
+        return result
+    finally:
+        # A resident worker must not keep tracing after a plan that raised
+        profile.close()
+
+
+def run_request(inp: Dict) -> Dict[str, object]:
+    """Plan one /schedule request body and return the JSON-ready result."""
+    return plan(PlanRequest(inp))
+
 # ─────  CLI entrypoint ─────
 if __name__ == "__main__":
-    inp = json.load(sys.stdin)
-
-    # override defaults ------------------------------------------------------
-    COURSES_TO_SCHEDULE = inp.get('courses_to_schedule', COURSES_TO_SCHEDULE)
-    TRANSCRIPT = inp.get('transcript', {})
-    prefs = inp.get('preferences', {})
-    ALLOW_WARNINGS = prefs.get('allow_warnings', ALLOW_WARNINGS)
-    ALLOW_PRIMARY_CONFLICTS = prefs.get('allow_primary_conflicts', ALLOW_PRIMARY_CONFLICTS)
-    ALLOW_SECONDARY_CONFLICTS = prefs.get('allow_secondary_conflicts', ALLOW_SECONDARY_CONFLICTS)
-    PREF_PRIORITY = prefs.get('pref_priority', PREF_PRIORITY)
-    pe = prefs.get('pref_earliest', PREF_EARLIEST.strftime('%H:%M'))
-    PREF_EARLIEST = datetime.strptime(pe, '%H:%M').time()
-    pl = prefs.get('pref_latest', PREF_LATEST.strftime('%H:%M'))
-    PREF_LATEST = datetime.strptime(pl, '%H:%M').time()
-    PREF_NO_DAYS = set(prefs.get('pref_no_days', list(PREF_NO_DAYS)))
-    PREF_BUILDINGS = set(prefs.get('pref_buildings', list(PREF_BUILDINGS)))
-    PREF_INSTRUCTORS = set(prefs.get('pref_instructors', list(PREF_INSTRUCTORS)))
-    MAX_COURSES_PER_TERM = prefs.get('max_courses_per_term', MAX_COURSES_PER_TERM)
-    LEAST_COURSES_PER_TERM = prefs.get('least_courses_per_term', LEAST_COURSES_PER_TERM)
-
-    # run scheduler ----------------------------------------------------------
-    sched, note = build_schedule(
-        inp['start_year'], inp['start_quarter'],
-        inp['end_year'], inp['end_quarter'],
-        ALLOW_WARNINGS
-    )
-    result = {'schedule': format_schedule(sched)}
-    if note:
-        result['note'] = note
+    body = json.load(sys.stdin)
+    if "--profile" in sys.argv[1:]:
+        body['profile'] = True
+    result = run_request(body)
     print(json.dumps(result, default=str, indent=2))
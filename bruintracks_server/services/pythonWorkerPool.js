@@ -0,0 +1,225 @@
+import { spawn } from "child_process";
+import path from "path";
+import readline from "readline";
+import { fileURLToPath } from "url";
+
+// ESM __dirname shim
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const WORKER_SCRIPT = path.join(__dirname, "..", "python_worker.py");
+const POOL_SIZE = parseInt(process.env.PY_WORKER_POOL_SIZE || "2", 10);
+const REQUEST_TIMEOUT_MS = parseInt(
+  process.env.PY_WORKER_TIMEOUT_MS || "120000",
+  10
+);
+
+const DEFAULT_OPTIONS = {
+  command: "python3",
+  args: [WORKER_SCRIPT],
+  timeoutMs: REQUEST_TIMEOUT_MS,
+  // Restart delay after a crash, doubling per consecutive crash up to the cap
+  restartDelayMs: 500,
+  maxRestartDelayMs: 30000,
+  // Consecutive crashes (no reply in between) before queued jobs are failed
+  // and new ones refused, until a restarted worker answers its start-up ping
+  maxCrashes: 5,
+};
+
+let pings = 0;
+
+/**
+ * One resident python_worker.py process. It handles a single request at a
+ * time; the pool only hands it a new job once the previous one has answered.
+ */
+class PythonWorker {
+  constructor(pool, options) {
+    this.pool = pool;
+    this.options = options;
+    this.current = null;
+    this.crashes = 0;
+    this.start();
+  }
+
+  start() {
+    const proc = spawn(this.options.command, this.options.args, {
+      stdio: ["pipe", "pipe", "pipe"],
+    });
+    this.proc = proc;
+    this.alive = true;
+    this.killed = false;
+
+    readline.createInterface({ input: proc.stdout }).on("line", (line) => {
+      let msg;
+      try {
+        msg = JSON.parse(line);
+      } catch (err) {
+        console.error("python_worker sent a non-JSON line:", line);
+        return;
+      }
+      if (proc === this.proc && msg.id === this.pingId) {
+        // Started and imported its entries: no longer crash-looping
+        const recovering = this.crashes > 0;
+        this.pingId = null;
+        this.crashes = 0;
+        if (recovering) this.pool.release(this);
+        return;
+      }
+      // Only the reply to the job in flight counts; anything else is late
+      if (proc !== this.proc || !this.current || msg.id !== this.current.id) {
+        console.error("python_worker sent a reply for no pending job:", msg.id);
+        return;
+      }
+      this.crashes = 0;
+      this.finish(msg.ok ? null : new Error(msg.error), msg.result);
+    });
+
+    proc.stderr.on("data", (chunk) => {
+      console.log("Python worker:", chunk.toString());
+    });
+
+    // EPIPE on a worker that already died; its exit event handles the job
+    proc.stdin.on("error", (err) => {
+      console.error("Python worker stdin error:", err.message);
+    });
+
+    // A failed spawn may emit only 'error', a crash only 'exit'
+    proc.on("error", (err) => this.exited(proc, err));
+    proc.on("exit", (code) => {
+      this.exited(proc, new Error(`Python worker exited with code ${code}`));
+    });
+
+    // Answered once start-up imports are done; see the line handler
+    this.pingId = `ping-${++pings}`;
+    proc.stdin.write(JSON.stringify({ id: this.pingId, entry: "ping" }) + "\n");
+  }
+
+  exited(proc, err) {
+    if (proc !== this.proc || !this.alive) return;
+    this.alive = false;
+    // A timeout kill is not the worker's fault and its job already failed
+    if (!this.killed) this.crashes++;
+    this.finish(err);
+    if (this.crashes >= this.options.maxCrashes) this.pool.crashing(this);
+    // Replace exited workers so the pool keeps its size
+    const delay =
+      this.crashes === 0
+        ? this.options.restartDelayMs
+        : Math.min(
+            this.options.restartDelayMs * 2 ** (this.crashes - 1),
+            this.options.maxRestartDelayMs
+          );
+    this.restartTimer = setTimeout(() => {
+      if (this.pool.closed) return;
+      this.start();
+      // After a crash, jobs wait for the start-up ping rather than go to a
+      // worker that may die on import again
+      if (this.crashes === 0) this.pool.release(this);
+    }, delay);
+  }
+
+  run(job) {
+    this.current = job;
+    job.timer = setTimeout(() => {
+      // A wedged request would block every later one on this worker
+      this.killed = true;
+      this.finish(new Error(`Python worker timed out after ${this.options.timeoutMs} ms`));
+      this.proc.kill();
+    }, this.options.timeoutMs);
+    this.proc.stdin.write(
+      JSON.stringify({ id: job.id, entry: job.entry, input: job.input }) + "\n"
+    );
+  }
+
+  finish(err, result) {
+    const job = this.current;
+    if (!job) return;
+    clearTimeout(job.timer);
+    this.current = null;
+    if (err) job.reject(err);
+    else job.resolve(result);
+    if (this.alive && !this.killed) this.pool.release(this);
+  }
+
+  stop() {
+    clearTimeout(this.restartTimer);
+    this.alive = false;
+    this.proc.kill();
+  }
+}
+
+export class PythonWorkerPool {
+  constructor(size, options = {}) {
+    this.options = { ...DEFAULT_OPTIONS, ...options };
+    this.nextId = 1;
+    this.queue = [];
+    this.idle = [];
+    this.workers = [];
+    this.closed = false;
+    for (let i = 0; i < size; i++) {
+      const worker = new PythonWorker(this, this.options);
+      this.workers.push(worker);
+      this.idle.push(worker);
+    }
+  }
+
+  /**
+   * Run one Python entry point (scheduler, schedule_editor, schedule_assistant,
+   * tech_breadth_optimizer, get_elective_options) and resolve with its result.
+   */
+  run(entry, input) {
+    return new Promise((resolve, reject) => {
+      if (this.broken()) {
+        reject(new Error("Python workers keep crashing; not accepting requests"));
+        return;
+      }
+      this.queue.push({ id: this.nextId++, entry, input, resolve, reject });
+      this.dispatch();
+    });
+  }
+
+  release(worker) {
+    if (!this.idle.includes(worker)) this.idle.push(worker);
+    this.dispatch();
+  }
+
+  /** Every worker is past maxCrashes: nothing queued will ever run. */
+  broken() {
+    return this.workers.every((w) => w.crashes >= this.options.maxCrashes);
+  }
+
+  crashing(worker) {
+    console.error(
+      `Python worker crashed ${worker.crashes} times in a row; retrying with backoff`
+    );
+    if (!this.broken()) return;
+    const err = new Error("Python workers keep crashing; request not run");
+    for (const job of this.queue.splice(0)) job.reject(err);
+  }
+
+  dispatch() {
+    while (this.queue.length && this.idle.length) {
+      const worker = this.idle.shift();
+      if (!worker.alive || worker.current) continue;
+      worker.run(this.queue.shift());
+    }
+  }
+
+  /** Stop every worker and any pending restart (tests, shutdown). */
+  close() {
+    this.closed = true;
+    for (const worker of this.workers) worker.stop();
+  }
+}
+
+let pool = null;
+
+/** Lazily created, process-wide pool sized by PY_WORKER_POOL_SIZE. */
+export function getPythonWorkerPool() {
+  if (!pool) pool = new PythonWorkerPool(POOL_SIZE);
+  return pool;
+}
+
+export function runPython(entry, input) {
+  return getPythonWorkerPool().run(entry, input);
+}
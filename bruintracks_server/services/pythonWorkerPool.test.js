@@ -0,0 +1,80 @@
+import assert from "node:assert/strict";
+import { test } from "node:test";
+
+import { PythonWorkerPool } from "./pythonWorkerPool.js";
+
+// Speaks python_worker.py's JSON-lines protocol; the entry picks a behaviour
+const STUB_WORKER = `
+const rl = require("readline").createInterface({ input: process.stdin });
+const reply = (msg) => process.stdout.write(JSON.stringify(msg) + "\\n");
+rl.on("line", (line) => {
+  const { id, entry, input } = JSON.parse(line);
+  if (entry === "ping") reply({ id, ok: true, result: "pong" });
+  else if (entry === "echo") reply({ id, ok: true, result: input });
+  else if (entry === "fail") reply({ id, ok: false, error: "ValueError: bad input" });
+  else if (entry === "stale") {
+    reply({ id: id - 1, ok: true, result: "stale" });
+    reply({ id, ok: true, result: "fresh" });
+  } else if (entry === "crash") process.exit(3);
+  // "hang": never answers
+});
+`;
+
+function stubPool(options = {}) {
+  return new PythonWorkerPool(1, {
+    command: process.execPath,
+    args: ["-e", STUB_WORKER],
+    restartDelayMs: 10,
+    ...options,
+  });
+}
+
+test("a reply resolves its job and an error reply rejects it", async () => {
+  const pool = stubPool();
+  try {
+    assert.deepEqual(await pool.run("echo", { term: "Fall 2024" }), { term: "Fall 2024" });
+    await assert.rejects(pool.run("fail", {}), /ValueError: bad input/);
+    assert.equal(await pool.run("stale", {}), "fresh");
+  } finally {
+    pool.close();
+  }
+});
+
+test("a timed-out job fails and the worker is replaced", async () => {
+  const pool = stubPool({ timeoutMs: 200 });
+  try {
+    await assert.rejects(pool.run("hang", {}), /timed out after 200 ms/);
+    assert.equal(await pool.run("echo", "after"), "after");
+    assert.equal(pool.workers[0].crashes, 0);
+  } finally {
+    pool.close();
+  }
+});
+
+test("a crash fails the job in flight and the next job runs on a restart", async () => {
+  const pool = stubPool();
+  try {
+    const crashed = pool.run("crash", {});
+    const queued = pool.run("echo", "queued");
+    await assert.rejects(crashed, /exited with code 3/);
+    assert.equal(await queued, "queued");
+  } finally {
+    pool.close();
+  }
+});
+
+test("a worker that crashes on start fails queued jobs instead of looping", async () => {
+  for (const command of [process.execPath, "/nonexistent/python3"]) {
+    const pool = stubPool({ command, args: ["-e", "process.exit(1)"], maxCrashes: 3 });
+    try {
+      const inFlight = pool.run("echo", "first");
+      const queued = pool.run("echo", "never");
+      await assert.rejects(inFlight, /exited with code 1|ENOENT/);
+      await assert.rejects(queued, /keep crashing/);
+      assert.equal(pool.workers[0].crashes, 3);
+      await assert.rejects(pool.run("echo", "refused"), /not accepting requests/);
+    } finally {
+      pool.close();
+    }
+  }
+});
@@ -0,0 +1,61 @@
+import io
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+import batch_plan
+import scheduler
+from catalog_cache import CatalogCache, set_catalog_cache
+from test_scheduler import BODY, PUBLISHED, synthetic
+
+# A chain 101 <- 102 <- 103 <- 104 plus a standalone 110, each taught every term
+REQUIRES = {"MATH|101": [], "MATH|102": ["MATH|101"], "MATH|103": ["MATH|102"],
+            "MATH|104": ["MATH|103"], "MATH|110": []}
+CATALOG = synthetic(REQUIRES, [(c, t, True, [("MWF", start, start[:2] + ":50")])
+                               for c, start in zip(REQUIRES, ["08:00", "10:00", "12:00", "14:00", "16:00"])
+                               for t in PUBLISHED])
+
+
+def run_batch(lines, workers=2):
+    """batch_plan.main over `lines` against CATALOG; the output records."""
+    scratch = tempfile.mkdtemp(prefix="test-batch-")
+    saved = (sys.argv, sys.stdin, sys.stdout, sys.stderr, batch_plan.get_supabase, scheduler.get_supabase)
+    previous = set_catalog_cache(CatalogCache(os.path.join(scratch, "catalog.sqlite3"), "test-batch"))
+    out = io.StringIO()
+    try:
+        # Forked pool workers inherit the patched clients and the cache path
+        batch_plan.get_supabase = scheduler.get_supabase = lambda url, key: CATALOG
+        sys.argv = ["batch_plan.py", "-", str(workers)]
+        sys.stdin, sys.stdout, sys.stderr = io.StringIO("\n".join(lines) + "\n"), out, io.StringIO()
+        batch_plan.main()
+    finally:
+        sys.argv, sys.stdin, sys.stdout, sys.stderr, batch_plan.get_supabase, scheduler.get_supabase = saved
+        set_catalog_cache(previous)
+        shutil.rmtree(scratch, ignore_errors=True)
+    return [json.loads(l) for l in out.getvalue().splitlines()]
+
+
+def test_replies_keep_input_order_across_the_pool():
+    # Bigger plans first, so later lines tend to finish before earlier ones
+    wants = [["MATH|104", "MATH|110"], ["MATH|104"], ["MATH|103"], ["MATH|102"], ["MATH|110"], []]
+    lines = [json.dumps({**BODY, 'id': f"s-{i}", 'courses_to_schedule': want}) for i, want in enumerate(wants)]
+    replies = run_batch(lines, workers=3)
+    assert [(r['line'], r['id']) for r in replies] == [(i + 1, f"s-{i}") for i in range(len(wants))]
+    assert all(r['ok'] for r in replies)
+    for want, reply in zip(wants, replies):
+        placed = {c for ent in reply['result']['schedule'].values() for c in ent}
+        assert set(want) <= placed
+
+
+def test_malformed_lines_fail_alone():
+    good = json.dumps({**BODY, 'id': "good", 'courses_to_schedule': ["MATH|103"]})
+    lines = [good, '{"id": "cut", "start_year": 20', "", json.dumps({'id': "no-term"}), good]
+    replies = run_batch(lines)
+    # The blank line is skipped but still counted
+    assert [r['line'] for r in replies] == [1, 2, 4, 5]
+    assert [r['ok'] for r in replies] == [True, False, False, True]
+    assert replies[1]['id'] is None and replies[1]['error'].startswith("JSONDecodeError")
+    assert replies[2]['id'] == "no-term" and replies[2]['error'] == "KeyError: 'start_year'"
+    assert replies[0]['result']['schedule'] == replies[3]['result']['schedule']
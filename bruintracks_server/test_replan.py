@@ -0,0 +1,98 @@
+import contextlib
+import io
+import re
+from collections import Counter
+
+import scheduler
+from catalog_cache import CatalogCache
+from csv_catalog import get_csv_catalog
+from scheduler import PlanRequest, apply_delta
+
+# Plan against the scrape CSVs (see csv_catalog) instead of Supabase
+scheduler.get_supabase = lambda url, key: get_csv_catalog()
+CACHE = CatalogCache(":memory:", version="test-replan")
+BODY = {"start_year": 2024, "start_quarter": "Fall", "end_year": 2026, "end_quarter": "Spring",
+        "transcript": {}}
+
+
+def plan(body):
+    with contextlib.redirect_stderr(io.StringIO()):
+        return scheduler.plan(PlanRequest(body), CACHE)
+
+
+PRIOR = plan(BODY)
+TERMS = list(PRIOR['schedule'])
+
+
+def replan(delta, prior=PRIOR):
+    return plan({**BODY, 'prior_plan': prior, 'delta': delta})
+
+
+def term_of(course):
+    return next(i for i, t in enumerate(TERMS) if course in PRIOR['schedule'][t])
+
+
+def assert_keeps_prior(result):
+    keep = result['replan']['terms_reused']
+    for term in TERMS[:keep]:
+        assert result['schedule'][term] == PRIOR['schedule'][term]
+    return keep
+
+
+def test_empty_delta_reproduces_prior_plan():
+    result = replan({})
+    assert result['replan']['terms_reused'] == len(TERMS)
+    assert result['schedule'] == PRIOR['schedule']
+    assert result['outcome'] == PRIOR['outcome']
+
+
+def test_removed_course_keeps_terms_before_its_slot():
+    result = replan({'remove_courses': ["COM SCI|118"]})
+    assert assert_keeps_prior(result) == term_of("COM SCI|118") > 0
+    assert all("COM SCI|118" not in ent for ent in result['schedule'].values())
+
+
+def test_added_course_keeps_terms_before_it_can_be_offered():
+    # Taught in Winter and Spring only; its prerequisites are already placed
+    result = replan({'add_courses': ["COM SCI|143"]})
+    assert assert_keeps_prior(result) == TERMS.index("Winter 2025")
+    assert any("COM SCI|143" in ent for ent in result['schedule'].values())
+
+
+def test_grade_without_dependents_keeps_terms_before_its_slot():
+    result = replan({'transcript': {"C&EE|110": "A"}})
+    assert assert_keeps_prior(result) == term_of("C&EE|110")
+
+
+def test_grade_replans_from_where_its_dependents_can_move():
+    # MATH|33A sits in Spring 2025, but courses waiting on it are offered in
+    # Fall: passing it lets a fresh plan use Fall 2024 differently
+    delta = {'transcript': {"MATH|33A": "A"}}
+    result = replan(delta)
+    assert result['replan']['terms_reused'] == 0
+    assert result['schedule'] == plan(apply_delta(BODY, delta))['schedule']
+
+
+def test_resolve_labels_stay_unique():
+    for delta in ({'remove_courses': ["COM SCI|118"]}, {'transcript': {"C&EE|110": "A"}},
+                  {'add_courses': ["RESOLVE: Computer Science Elective #4"]},
+                  {'remove_courses': ["COM SCI|181"], 'add_courses': ["RESOLVE: Technical Breadth #4"]}):
+        result = replan(delta)
+        labels = Counter(c for ent in result['schedule'].values() for c in ent
+                         if re.search(r' #\d+$', c))
+        assert labels and max(labels.values()) == 1
+
+
+def test_preference_delta_replans_everything():
+    result = replan({'preferences': {'pref_no_days': ["M"]}})
+    assert result['replan']['terms_reused'] == 0
+
+
+def test_memo_miss_matches_memo_hit():
+    delta = {'transcript': {"COM SCI|131": "B"}}
+    hit = replan(delta)
+    assert hit['replan']['closure_reused'] > 0
+    scheduler._closure_memo.clear()
+    miss = replan(delta)
+    assert miss['replan']['closure_reused'] == 0
+    assert miss['schedule'] == hit['schedule'] and miss.get('note') == hit.get('note')
@@ -0,0 +1,223 @@
+import contextlib
+import io
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+import scheduler
+from scheduler import PlanRequest
+# Shared modules, importable once scheduler has put them on the path
+import bulk_fetch
+import requisites
+from catalog_cache import CatalogCache, term_season, term_year
+from csv_catalog import CSVCatalog, get_csv_catalog
+
+BODY = {"start_year": 2024, "start_quarter": "Fall", "end_year": 2026, "end_quarter": "Spring",
+        "transcript": {}}
+SUBJECTS = {"MATH": "Mathematics", "COM SCI": "Computer Science"}
+PUBLISHED = ["Fall 2023", "Fall 2024", "Winter 2025", "Spring 2025"]
+
+
+def leaf(key):
+    code, num = key.split("|")
+    return {'course': f"{SUBJECTS[code]} {num}", 'relation': "prerequisite", 'min_grade': "D-", 'severity': "R"}
+
+
+def synthetic(requires, sections, offerings=None):
+    """A catalog of just `requires` ({SUBJ|NUM: [every prerequisite]}) and
+    `sections` ([(SUBJ|NUM, term, is_primary, [(days, "HH:MM", "HH:MM")])]).
+    The offering index is built from the sections unless given."""
+    subjects = [{'id': i, 'code': code, 'name': f"{name} ({code})"}
+                for i, (code, name) in enumerate(SUBJECTS.items(), 1)]
+    sub_id = {s['code']: s['id'] for s in subjects}
+    terms = [{'id': i, 'term_name': t} for i, t in enumerate(PUBLISHED, 1)]
+    term_id = {t['term_name']: t['id'] for t in terms}
+    course_id = {key: i for i, key in enumerate(requires, 1)}
+    courses = [{'id': course_id[key], 'subject_id': sub_id[key.split("|")[0]],
+                'catalog_number': key.split("|")[1], 'title': None,
+                'course_requisites': {'and': [leaf(p) for p in needs]} if needs else None}
+               for key, needs in requires.items()]
+    secs, meetings = [], []
+    for key, term, primary, times in sections:
+        sec = {'id': len(secs) + 1, 'course_id': course_id[key], 'term_id': term_id[term],
+               'section_code': f"{len(secs) + 1:03d}", 'is_primary': primary,
+               'activity': "Lecture" if primary else "Discussion",
+               'enrollment_cap': 100, 'enrollment_total': 0, 'waitlist_cap': 0, 'waitlist_total': 0}
+        secs.append(sec)
+        meetings += [{'section_id': sec['id'], 'days_of_week': days, 'start_time': f"{start}:00",
+                      'end_time': f"{end}:00", 'building': "MS", 'room': "1"} for days, start, end in times]
+    if offerings is None:
+        seasons = {(s['course_id'], term_season(PUBLISHED[s['term_id'] - 1])) for s in secs}
+        offerings = [{'course_id': cid, 'season': season, 'years_offered': 1,
+                      'last_year': term_year(PUBLISHED[-1])} for cid, season in sorted(seasons)]
+    return CSVCatalog({
+        'subjects': subjects, 'terms': terms, 'courses': courses, 'course_offerings': offerings,
+        'sections': secs, 'meeting_times': meetings, 'instructors': [], 'section_instructors': [],
+    })
+
+
+@contextlib.contextmanager
+def client(make):
+    """Plan against `make()` instead of Supabase for the block."""
+    get_supabase, scheduler.get_supabase = scheduler.get_supabase, lambda url, key: make()
+    try:
+        yield
+    finally:
+        scheduler.get_supabase = get_supabase
+
+
+def plan(body, version="test-scheduler", catalog=None):
+    """Plan `body` over `catalog`, by default the scrape CSVs (see csv_catalog)."""
+    with client(lambda: catalog or get_csv_catalog()), contextlib.redirect_stderr(io.StringIO()):
+        return scheduler.plan(PlanRequest({**BODY, **body}), CatalogCache(":memory:", version=version))
+
+
+def scheduled(result):
+    return {c for ent in result['schedule'].values() for c in ent if c != "FILLER"}
+
+
+class Unreachable:
+    """A client whose every read fails, as when Supabase is down."""
+
+    def table(self, name):
+        raise ConnectionError(f"cannot read {name}")
+
+
+def test_profiled_plan_that_raises_stops_tracing():
+    was_tracing = tracemalloc.is_tracing()
+    try:
+        with client(Unreachable):
+            scheduler.plan(PlanRequest({**BODY, 'profile': True}), CatalogCache(":memory:", version="unreachable"))
+    except ConnectionError:
+        pass
+    else:
+        raise AssertionError("expected ConnectionError")
+    assert tracemalloc.is_tracing() == was_tracing
+
+
+def test_truncated_requisites_are_checked_against_the_whole_tree():
+    # MATH|33A needs one of 31B, 32A or 3B; a cap of 1 keeps only 31B
+    cap, requisites.MAX_CLAUSES = requisites.MAX_CLAUSES, 1
+    requisites.clear_compiled()
+    try:
+        result = plan({'courses_to_schedule': ["MATH|33A"], 'transcript': {"MATH|3B": "A"}}, "truncated")
+        assert result['prereq_closure']['truncated_requisites'] == ["MATH|33A"]
+        assert scheduled(result) == {"MATH|33A"}
+        result = plan({'courses_to_schedule': ["MATH|33A"], 'transcript': {"MATH|31A": "A"}}, "truncated")
+        assert scheduled(result) == {"MATH|31B", "MATH|33A"}
+    finally:
+        requisites.MAX_CLAUSES = cap
+        requisites.clear_compiled()
+    assert 'truncated_requisites' not in plan({'courses_to_schedule': ["MATH|33A"]})['prereq_closure']
+
+
+def test_closure_takes_one_course_batch_per_prerequisite_level():
+    # 105 <- 104 <- (102, 103) <- 101: four levels, five courses
+    requires = {"MATH|101": [], "MATH|102": ["MATH|101"], "MATH|103": ["MATH|101"],
+                "MATH|104": ["MATH|102", "MATH|103"], "MATH|105": ["MATH|104"]}
+    times = ["08:00", "10:00", "12:00", "14:00", "16:00"]
+    catalog = synthetic(requires, [(c, t, True, [("MWF", start, start[:2] + ":50")])
+                                   for c, start in zip(requires, times) for t in PUBLISHED])
+    # What the per-course walk this BFS replaced finds: one read per course
+    baseline, stack = set(), ["MATH|105"]
+    while stack:
+        course = stack.pop()
+        if course not in baseline:
+            baseline.add(course)
+            stack += requires[course]
+    chunk, bulk_fetch.IN_CHUNK_SIZE = bulk_fetch.IN_CHUNK_SIZE, 1
+    try:
+        result = plan({'courses_to_schedule': ["MATH|105"]}, "bfs", catalog)
+    finally:
+        bulk_fetch.IN_CHUNK_SIZE = chunk
+    closure = result['prereq_closure']
+    assert closure['levels'] == closure['batches'] == 4
+    # One catalog number per chunk, so each batch is as many requests as courses
+    assert closure['round_trips'] == 5 and closure['courses'] == 5
+    assert scheduled(result) == baseline
+    term_of = {c: i for i, ent in enumerate(result['schedule'].values()) for c in ent}
+    assert all(term_of[p] < term_of[c] for c in requires for p in requires[c])
+
+
+def test_concurrent_plans_over_one_cache_match_sequential():
+    bodies = [{'courses_to_schedule': ["COM SCI|32", "MATH|33A"]},
+              {'courses_to_schedule': ["COM SCI|32", "MATH|33A"],
+               'preferences': {'pref_no_days': ["M", "W"], 'pref_earliest': "10:00"}}]
+
+    def run(body, cache):
+        # Elapsed times and, on a warm cache, round trips differ; nothing else may
+        result = scheduler.plan(PlanRequest({**BODY, **body}), cache)
+        for counter in ('round_trips', 'batches'):
+            result['prereq_closure'].pop(counter)
+        return {k: v for k, v in result.items() if k != 'search'}
+
+    with client(get_csv_catalog), contextlib.redirect_stderr(io.StringIO()):
+        sequential = [run(body, CatalogCache(":memory:", version="sequential")) for body in bodies]
+        assert sequential[0] != sequential[1]
+        shared = CatalogCache(":memory:", version="concurrent")
+        for _ in range(3):
+            with ThreadPoolExecutor(len(bodies)) as pool:
+                assert list(pool.map(run, bodies, [shared] * len(bodies))) == sequential
+
+
+def lecture_days(result, term, course):
+    return [t['days'] for t in result['schedule'][term][course]['lecture']['times']]
+
+
+def test_unpublished_terms_use_the_latest_published_term_of_their_season():
+    # Fall 2025 is not published yet: it takes Fall 2024's sections, not Fall 2023's
+    catalog = synthetic({"MATH|101": []}, [("MATH|101", "Fall 2023", True, [("MWF", "08:00", "08:50")]),
+                                           ("MATH|101", "Fall 2024", True, [("TR", "10:00", "11:50")])])
+    future = {'start_year': 2025, 'start_quarter': "Fall", 'courses_to_schedule': ["MATH|101"]}
+    result = plan(future, "season-map", catalog)
+    assert lecture_days(result, "Fall 2025", "MATH|101") == ["TR"]
+    assert scheduled(result) == {"MATH|101"}
+    # A published term still uses its own sections
+    result = plan({'courses_to_schedule': ["MATH|101"]}, "season-map", catalog)
+    assert lecture_days(result, "Fall 2024", "MATH|101") == ["TR"]
+
+
+def test_courses_missing_from_the_offering_index_fall_back_to_their_sections():
+    requires = {"MATH|101": [], "MATH|102": []}
+    sections = [("MATH|101", "Winter 2025", True, [("MWF", "08:00", "08:50")]),
+                ("MATH|102", "Spring 2025", True, [("TR", "10:00", "11:50")])]
+    # Only MATH|101 is indexed, as if MATH|102 was added after the last refresh
+    indexed = [{'course_id': 1, 'season': "Winter", 'years_offered': 1, 'last_year': 2025}]
+    result = plan({'courses_to_schedule': list(requires)}, "unindexed", synthetic(requires, sections, indexed))
+    assert "MATH|101" in result['schedule']["Winter 2025"]
+    assert "MATH|102" in result['schedule']["Spring 2025"]
+
+
+def test_first_term_picks_the_sections_that_fit_together():
+    # 101's better-scoring MW section clashes with 102's only one
+    requires = {"MATH|101": [], "MATH|102": []}
+    sections = [("MATH|101", "Fall 2024", True, [("MW", "09:00", "09:50")]),
+                ("MATH|101", "Fall 2024", True, [("TR", "09:00", "09:50")]),
+                ("MATH|102", "Fall 2024", True, [("MW", "09:30", "10:20")])]
+    one_term = {'end_year': 2024, 'end_quarter': "Fall", 'courses_to_schedule': list(requires),
+                'preferences': {'least_courses_per_term': 1, 'pref_no_days': ["T", "R"],
+                                'allow_primary_conflicts': False}}
+    result = plan(one_term, "first-term", synthetic(requires, sections))
+    assert lecture_days(result, "Fall 2024", "MATH|101") == ["TR"]
+    assert lecture_days(result, "Fall 2024", "MATH|102") == ["MW"]
+    search = result['search']
+    assert search['proven_optimal'] and 0 < search['explored'] <= 1
+    assert search['explored'] == round(search['nodes'] / search['space'], 6)
+
+
+def test_later_terms_favour_earlier_candidates_over_section_scores():
+    # After 100, Winter can take two of 101, 102 and 103; 101 and 102 clash,
+    # and 102 scores better (101 meets on Friday), but 101 comes first
+    requires = {"MATH|100": [], "MATH|101": ["MATH|100"], "MATH|102": ["MATH|100"], "MATH|103": ["MATH|100"]}
+    sections = [("MATH|100", "Fall 2024", True, [("MWF", "09:00", "09:50")]),
+                ("MATH|101", "Winter 2025", True, [("MWF", "09:00", "09:50")]),
+                ("MATH|102", "Winter 2025", True, [("MW", "09:00", "09:50")]),
+                ("MATH|103", "Winter 2025", True, [("TR", "09:00", "09:50")])]
+    two_terms = {'end_year': 2025, 'end_quarter': "Winter", 'courses_to_schedule': list(requires),
+                 'preferences': {'least_courses_per_term': 1, 'max_courses_per_term': 2,
+                                 'allow_primary_conflicts': False}}
+    result = plan(two_terms, "keep-order", synthetic(requires, sections))
+    assert set(result['schedule']["Winter 2025"]) == {"MATH|101", "MATH|103"}
+    # As the first term, searched by score alone, the same choice goes to 102
+    first = {**two_terms, 'start_year': 2025, 'start_quarter': "Winter", 'transcript': {"MATH|100": "A"}}
+    result = plan(first, "keep-order", synthetic(requires, sections))
+    assert set(result['schedule']["Winter 2025"]) == {"MATH|102", "MATH|103"}
@@ -0,0 +1,61 @@
+import what_if
+from what_if import apply_overrides, dominates, expand_variants, pareto_front
+
+
+def outcome(last_term, score, unscheduled):
+    return {'last_term': last_term, 'preference_score': score, 'unscheduled': unscheduled}
+
+
+def test_grid_times_variants():
+    spec = {
+        'grid': {'max_courses_per_term': [4, 5], 'pref_no_days': [[], ["F"]]},
+        'variants': [{'start_quarter': "Fall"}, {'start_quarter': "Winter"}],
+    }
+    out = expand_variants(spec)
+    assert len(out) == 8
+    assert out[0] == {'start_quarter': "Fall", 'max_courses_per_term': 4, 'pref_no_days': []}
+    assert out[-1] == {'start_quarter': "Winter", 'max_courses_per_term': 5, 'pref_no_days': ["F"]}
+    assert expand_variants({'grid': {'max_courses_per_term': [3]}}) == [{'max_courses_per_term': 3}]
+    assert expand_variants({}) == [{}]
+
+
+def test_too_many_variants():
+    limit, what_if.MAX_VARIANTS = what_if.MAX_VARIANTS, 3
+    try:
+        expand_variants({'grid': {'a': [1, 2], 'b': [1, 2]}})
+    except ValueError as e:
+        assert str(e) == "4 variants requested, at most 3 allowed"
+    else:
+        raise AssertionError("expected ValueError")
+    finally:
+        what_if.MAX_VARIANTS = limit
+
+
+def test_overrides_route_to_body_or_preferences():
+    base = {'start_year': 2024, 'preferences': {'allow_warnings': True}}
+    body = apply_overrides(base, {'start_year': 2025, 'transcript': {"MATH|31A": "A"},
+                                  'max_courses_per_term': 5})
+    assert body['start_year'] == 2025 and body['transcript'] == {"MATH|31A": "A"}
+    assert body['preferences'] == {'allow_warnings': True, 'max_courses_per_term': 5}
+    # The base body is left as it was
+    assert base == {'start_year': 2024, 'preferences': {'allow_warnings': True}}
+
+
+def test_pareto_front():
+    outcomes = [
+        outcome("Spring 2026", 40, 0),   # 0: latest finish, best score
+        outcome("Winter 2026", 30, 0),   # 1: earlier finish, lower score
+        outcome("Winter 2026", 25, 0),   # 2: dominated by 1
+        outcome("Fall 2025", 10, 2),     # 3: earliest finish, but unscheduled courses
+        outcome("Winter 2026", 30, 0),   # 4: ties 1, so neither dominates
+        outcome("Spring 2026", 40, 1),   # 5: dominated by 0
+    ]
+    assert pareto_front(outcomes) == [0, 1, 3, 4]
+    assert not dominates(outcomes[1], outcomes[4])
+
+
+def test_finish_compares_calendar_terms_not_term_counts():
+    assert dominates(outcome("Spring 2025", 10, 0), outcome("Fall 2025", 10, 0))
+    # Four terms from Fall 2024 end before four terms from Winter 2025
+    assert dominates(outcome("Fall 2025", 10, 0), outcome("Winter 2026", 10, 0))
+    assert dominates(outcome(None, 0, 0), outcome("Fall 2024", 0, 0))
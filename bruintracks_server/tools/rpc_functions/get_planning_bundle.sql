@@ -0,0 +1,61 @@
+-- Sections of the given courses in the given terms, with their meetings and
+-- instructor names, in one call. Columnar: each block is an object of equal-
+-- length arrays, and meetings/instructors point back at sections by section_id.
+CREATE OR REPLACE FUNCTION get_planning_bundle(course_ids INT[], term_ids INT[])
+RETURNS JSON
+LANGUAGE SQL
+STABLE
+AS $$
+  WITH sec AS (
+    SELECT s.*
+    FROM sections s
+    WHERE s.course_id = ANY(course_ids)
+      AND s.term_id = ANY(term_ids)
+  ),
+  mt AS (
+    SELECT m.*
+    FROM meeting_times m
+    JOIN sec ON sec.id = m.section_id
+  ),
+  ins AS (
+    SELECT si.section_id, si.instructor_id, i.name
+    FROM section_instructors si
+    JOIN sec ON sec.id = si.section_id
+    JOIN instructors i ON i.id = si.instructor_id
+  )
+  SELECT json_build_object(
+    'sections', (
+      SELECT json_build_object(
+        'id',               COALESCE(json_agg(id ORDER BY id), '[]'),
+        'course_id',        COALESCE(json_agg(course_id ORDER BY id), '[]'),
+        'term_id',          COALESCE(json_agg(term_id ORDER BY id), '[]'),
+        'section_code',     COALESCE(json_agg(section_code ORDER BY id), '[]'),
+        'is_primary',       COALESCE(json_agg(is_primary ORDER BY id), '[]'),
+        'activity',         COALESCE(json_agg(activity ORDER BY id), '[]'),
+        'enrollment_cap',   COALESCE(json_agg(enrollment_cap ORDER BY id), '[]'),
+        'enrollment_total', COALESCE(json_agg(enrollment_total ORDER BY id), '[]'),
+        'waitlist_cap',     COALESCE(json_agg(waitlist_cap ORDER BY id), '[]'),
+        'waitlist_total',   COALESCE(json_agg(waitlist_total ORDER BY id), '[]')
+      )
+      FROM sec
+    ),
+    'meetings', (
+      SELECT json_build_object(
+        'section_id',   COALESCE(json_agg(section_id ORDER BY id), '[]'),
+        'days_of_week', COALESCE(json_agg(days_of_week ORDER BY id), '[]'),
+        'start_time',   COALESCE(json_agg(start_time ORDER BY id), '[]'),
+        'end_time',     COALESCE(json_agg(end_time ORDER BY id), '[]'),
+        'building',     COALESCE(json_agg(building ORDER BY id), '[]'),
+        'room',         COALESCE(json_agg(room ORDER BY id), '[]')
+      )
+      FROM mt
+    ),
+    'instructors', (
+      SELECT json_build_object(
+        'section_id', COALESCE(json_agg(section_id ORDER BY section_id, instructor_id), '[]'),
+        'name',       COALESCE(json_agg(name ORDER BY section_id, instructor_id), '[]')
+      )
+      FROM ins
+    )
+  );
+$$;
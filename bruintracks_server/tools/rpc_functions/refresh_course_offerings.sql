@@ -0,0 +1,20 @@
+CREATE OR REPLACE FUNCTION refresh_course_offerings()
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  n INT;
+BEGIN
+  DELETE FROM course_offerings WHERE TRUE;
+  INSERT INTO course_offerings (course_id, season, years_offered, last_year)
+  SELECT s.course_id,
+         split_part(t.term_name, ' ', 1) AS season,
+         COUNT(DISTINCT substring(t.term_name FROM '\d{4}')) AS years_offered,
+         MAX(substring(t.term_name FROM '\d{4}')::INT) AS last_year
+  FROM sections s
+  JOIN terms t ON t.id = s.term_id
+  GROUP BY s.course_id, split_part(t.term_name, ' ', 1);
+  GET DIAGNOSTICS n = ROW_COUNT;
+  RETURN n;
+END;
+$$;
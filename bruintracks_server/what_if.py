@@ -0,0 +1,113 @@
+"""What-if exploration: plan a grid of request variants, keep the Pareto set.
+
+    -> {"base": {/schedule body},
+        "grid": {"max_courses_per_term": [4, 5],
+                 "pref_priority": [["time", "days", "building", "instructor"],
+                                   ["instructor", "time", "days", "building"]]},
+        "variants": [{"start_year": 2024, "start_quarter": "Fall"},
+                     {"start_year": 2025, "start_quarter": "Winter"}]}
+
+Every grid combination is applied on top of every explicit variant (either
+may be omitted). Keys are top-level body fields when PlanRequest reads them
+there, otherwise preferences. All variants are planned concurrently against
+one in-memory catalog, so the catalog is fetched once for the whole grid.
+
+Plans are compared on their `outcome`: an earlier last occupied term (by
+calendar, so variants with different start terms compare fairly), higher
+preference score, fewer unscheduled courses. Every variant's chosen sections
+are scored under the base request's preferences, whatever preferences the
+variant planned with, so scores share one scale. The reply lists every
+variant's outcome and the full plans of the Pareto-optimal ones.
+"""
+import os
+import sys
+import json
+from itertools import product
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from scheduler import PlanRequest, plan, term_position
+from catalog_cache import CatalogCache, CATALOG_CACHE_ENABLED, get_catalog_cache
+
+# ───── CONFIGURATION ─────
+MAX_VARIANTS = int(os.getenv("WHAT_IF_MAX_VARIANTS", 64))
+WORKERS = int(os.getenv("WHAT_IF_WORKERS", 4))
+
+# Body fields PlanRequest reads at the top level; anything else is a preference
+TOP_LEVEL = {
+    "start_year", "start_quarter", "end_year", "end_quarter",
+    "courses_to_schedule", "transcript", "time_budget_ms", "profile",
+}
+
+
+def apply_overrides(base: Dict, overrides: Dict) -> Dict:
+    body = {**base, 'preferences': dict(base.get('preferences', {}))}
+    for key, value in overrides.items():
+        if key in TOP_LEVEL:
+            body[key] = value
+        else:
+            body['preferences'][key] = value
+    return body
+
+
+def expand_variants(spec: Dict) -> List[Dict]:
+    """Override dicts for every explicit variant x grid combination."""
+    grid = spec.get('grid', {})
+    keys = sorted(grid)
+    out = []
+    for variant in spec.get('variants') or [{}]:
+        for values in product(*(grid[k] for k in keys)):
+            out.append({**variant, **dict(zip(keys, values))})
+    if len(out) > MAX_VARIANTS:
+        raise ValueError(f"{len(out)} variants requested, at most {MAX_VARIANTS} allowed")
+    return out
+
+
+def outcome_key(o: Dict) -> Tuple[int, float, int]:
+    """Smaller is better on every axis; a plan with no courses finishes first."""
+    finish = term_position(o['last_term']) if o['last_term'] else -1
+    return finish, -o['preference_score'], o['unscheduled']
+
+
+def dominates(a: Dict, b: Dict) -> bool:
+    """Whether outcome `a` is at least as good as `b` everywhere and better somewhere."""
+    ka, kb = outcome_key(a), outcome_key(b)
+    return all(x <= y for x, y in zip(ka, kb)) and ka != kb
+
+
+def pareto_front(outcomes: List[Dict]) -> List[int]:
+    return [i for i, o in enumerate(outcomes)
+            if not any(dominates(p, o) for j, p in enumerate(outcomes) if j != i)]
+
+
+def run(inp: Dict) -> Dict[str, object]:
+    base = inp['base']
+    variants = expand_variants(inp)
+    # The snapshot's memory layer already serves every thread; with it off,
+    # the grid still shares one catalog kept in memory for this call
+    cache = get_catalog_cache() if CATALOG_CACHE_ENABLED else CatalogCache(":memory:")
+
+    def evaluate(overrides: Dict) -> Tuple[Dict, Dict]:
+        body = apply_overrides(base, overrides)
+        # The variant's term range and courses, but the base preferences
+        score_as = PlanRequest({**body, 'preferences': base.get('preferences', {})})
+        return overrides, plan(PlanRequest(body), cache, score_as)
+
+    # The first plan warms the catalog so the rest do not race to fetch it
+    results = [evaluate(variants[0])] if variants else []
+    with ThreadPoolExecutor(max_workers=WORKERS) as pool:
+        results += pool.map(evaluate, variants[1:])
+
+    front = pareto_front([r['outcome'] for _, r in results])
+    return {
+        'evaluated': [
+            {'variant': overrides, 'outcome': r['outcome'], 'pareto': i in front}
+            for i, (overrides, r) in enumerate(results)
+        ],
+        'pareto': [{'variant': results[i][0], **results[i][1]} for i in front],
+    }
+
+
+# ─────  CLI entrypoint ─────
+if __name__ == "__main__":
+    print(json.dumps(run(json.load(sys.stdin)), default=str, indent=2))